@@ -10,8 +10,7 @@ from datetime import datetime
 import geopandas as gpd
 import folium
 from folium import GeoJsonTooltip
-import numpy as np
-from shapely.geometry import Point, LineString, Polygon, MultiLineString, MultiPolygon
+from quantizacao import reduzir_precisao
 import threading
 from flask import Flask, render_template, request, jsonify, send_file
 from flask_cors import CORS
@@ -84,56 +83,6 @@ def simplificar_geometrias(gdf, tolerance=0.0005):
     gdf['geometry'] = gdf['geometry'].simplify(tolerance, preserve_topology=True)
     return gdf
 
-def reduzir_precisao(gdf, decimals=5):
-    """Reduz precisão das coordenadas"""
-    if gdf.empty:
-        return gdf
-    
-    gdf = gdf.copy()
-    
-    def round_geom(geom):
-        if geom.is_empty:
-            return geom
-        
-        geom_type = geom.geom_type
-        
-        if geom_type == 'Polygon':
-            exterior = np.round(np.array(geom.exterior.coords), decimals)
-            interiors = []
-            for interior in geom.interiors:
-                interiors.append(np.round(np.array(interior.coords), decimals))
-            return Polygon(exterior, interiors)
-        
-        elif geom_type == 'MultiPolygon':
-            polygons = []
-            for poly in geom.geoms:
-                exterior = np.round(np.array(poly.exterior.coords), decimals)
-                interiors = []
-                for interior in poly.interiors:
-                    interiors.append(np.round(np.array(interior.coords), decimals))
-                polygons.append(Polygon(exterior, interiors))
-            return MultiPolygon(polygons)
-        
-        elif geom_type == 'LineString':
-            coords = np.round(np.array(geom.coords), decimals)
-            return LineString(coords)
-        
-        elif geom_type == 'MultiLineString':
-            lines = []
-            for line in geom.geoms:
-                lines.append(np.round(np.array(line.coords), decimals))
-            return MultiLineString(lines)
-        
-        elif geom_type == 'Point':
-            coords = np.round(np.array(geom.coords), decimals)
-            return Point(coords[0])
-        
-        else:
-            return geom
-    
-    gdf['geometry'] = gdf['geometry'].apply(round_geom)
-    return gdf
-
 def carregar_camada(layer_id):
     """Carrega uma camada do shapefile com cache"""
     
@@ -7,19 +7,39 @@ Permite selecionar camadas e exportar em PNG
 import os
 import sys
 import json
+import hashlib
 from pathlib import Path
 from datetime import datetime
-import geopandas as gpd
+import shapely
 import folium
-import numpy as np
-from shapely.geometry import Point, LineString, Polygon, MultiLineString, MultiPolygon
-from flask import Flask, render_template, request, jsonify
+from folium.plugins import VectorGridProtobuf
+from branca.element import MacroElement
+from jinja2 import Template
+from niveis_detalhe import simplificar_nivel, tolerancia_zoom
+import armazem_camadas
+from camadas_bc25 import (
+    CAMADAS_TOPOLOGIA, CASAS_DECIMAIS, ESSENTIAL_COLS, LAYER_MAPPING, SHAPEFILE_DIR, TOLERANCIA_SIMPLIFICACAO,
+    baixar_shapefiles, nivel_camada, parametros_camada, preparar_camada, tipo_camada, topologia_divisas,
+)
+from cache_compartilhado import CacheCompartilhado
+from cache_lru import CacheLRU
+from codificacao_compacta import GeoJsonCompacto
+from indice_espacial import IndiceCamadas
+import fluxo_geojson
+from respostas_http import CODIFICACOES, comprimir_fluxo, escolher_codificacao, etag_confere
+from precomprimir import gravar_variantes, variantes
+from coalescencia import SingleFlight
+from jobs import FilaJobs, FilaCheia, CONCLUIDO, ERRO
+from pool_navegador import PoolNavegadores
+from renderizador_png import renderizar_png
+from tiles_vetoriais import GeradorTiles, tile_valido
+from topologia import Topologia
+from flask import Flask, render_template, request, jsonify, Response, redirect, send_file
 from flask_cors import CORS
 from io import BytesIO
 from PIL import Image
+import threading
 import time
-import zipfile
-import urllib.request
 
 # Configurar encoding UTF-8
 import io
@@ -33,59 +53,49 @@ CORS(app)
 # Caminhos
 # Usa o diretório do arquivo para funcionar local e em servidores
 BASE_DIR = Path(__file__).resolve().parent
-SHAPEFILE_DIR = BASE_DIR / "bc25_sc_shapefile_2020-10-01"
 OUTPUT_DIR = BASE_DIR / "Mapas_prontos"
 TEMP_DIR = BASE_DIR / "temp_maps"
 
-# URL para download dos shapefiles (configurar após upload)
-SHAPEFILE_URL = os.environ.get("SHAPEFILE_URL", "")
-
 # Criar diretórios se não existirem
 OUTPUT_DIR.mkdir(exist_ok=True)
 TEMP_DIR.mkdir(exist_ok=True)
 
-# ==================== DOWNLOAD SHAPEFILES ====================
-
-def baixar_shapefiles():
-    """Baixa e extrai shapefiles se não existirem"""
-    if SHAPEFILE_DIR.exists() and any(SHAPEFILE_DIR.iterdir()):
-        print("[OK] Shapefiles já existem localmente")
-        return True
-    
-    if not SHAPEFILE_URL:
-        print("[WARN] SHAPEFILE_URL não configurada")
-        return False
-    
-    print(f"[DOWNLOAD] Baixando shapefiles de {SHAPEFILE_URL}...")
-    zip_path = BASE_DIR / "shapefiles_temp.zip"
-    
-    try:
-        # Download
-        urllib.request.urlretrieve(SHAPEFILE_URL, zip_path)
-        print(f"[OK] Download concluído: {zip_path.stat().st_size / (1024*1024):.1f} MB")
-        
-        # Extrair
-        print("[EXTRACT] Extraindo arquivos...")
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(BASE_DIR)
-        
-        # Remover zip temporário
-        zip_path.unlink()
-        
-        print(f"[OK] Shapefiles extraídos em {SHAPEFILE_DIR}")
-        return True
-    
-    except Exception as e:
-        print(f"[ERROR] Falha ao baixar shapefiles: {e}")
-        if zip_path.exists():
-            zip_path.unlink()
-        return False
-
 # Baixar shapefiles no startup
 baixar_shapefiles()
 
 # Cache de mapas HTML em memória (evita problemas com sistema de arquivos)
-MAPS_CACHE = {}
+# Limitado em bytes (LRU + TTL); itens removidos voltam a ser lidos do TEMP_DIR
+MAPS_CACHE_MB = int(os.environ.get("MAPS_CACHE_MB", "256"))
+MAPS_CACHE_TTL = int(os.environ.get("MAPS_CACHE_TTL", "3600"))
+MAPS_CACHE = CacheLRU(MAPS_CACHE_MB * 1024 * 1024, ttl=MAPS_CACHE_TTL or None)
+
+# Variantes .br/.gz gravadas junto de cada mapa gerado e servidas conforme o
+# Accept-Encoding; na geração usa níveis rápidos (brotli 11 fica para o build)
+MAP_PRECOMPRESS = os.environ.get("MAP_PRECOMPRESS", "1") == "1"
+PRECOMPRESS_BROTLI_QUALITY = int(os.environ.get("PRECOMPRESS_BROTLI_QUALITY", "9"))
+PRECOMPRESS_GZIP_LEVEL = 6
+
+# Arquivos estáticos servidos com as variantes pré-comprimidas (raiz e geojson_layers/)
+MIMETYPES_ESTATICOS = {
+    '.html': 'text/html',
+    '.geojson': 'application/geo+json',
+    '.topojson': 'application/json',
+    '.pmtiles': 'application/octet-stream',
+}
+DIRETORIOS_ESTATICOS = (BASE_DIR, BASE_DIR / "geojson_layers")
+
+# Cache compartilhado entre workers (gunicorn): defina SHARED_CACHE_DIR
+# (ex.: /dev/shm/infra_sc) para que camadas e mapas sejam carregados uma vez
+# e lidos por todos os processos em vez de ficarem nos dicts de cada worker
+SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR", "")
+SHARED_CACHE_MB = int(os.environ.get("SHARED_CACHE_MB", "1024"))
+CACHE_COMPARTILHADO = (
+    CacheCompartilhado(SHARED_CACHE_DIR, limite_bytes=SHARED_CACHE_MB * 1024 * 1024)
+    if SHARED_CACHE_DIR else None
+)
+# Camadas já decodificadas do cache compartilhado, por processo: evita reler o
+# Feather e decodificar o WKB a cada pedido (chave inclui versao_camada)
+LAYER_MEMO_MB = int(os.environ.get("LAYER_MEMO_MB", "256"))
 
 # Cores das camadas
 COLORS = {
@@ -104,132 +114,319 @@ COLORS = {
     'municipios': '#999999'
 }
 
-# Mapeamento de camadas para shapefiles (cores e pesos do mapa original)
-LAYER_MAPPING = {
-    'rodovias-federais': ('rod_via_deslocamento_l.shp', '#d73027', 2.2, 0.9, 'Federal'),
-    'rodovias-estaduais': ('rod_via_deslocamento_l.shp', '#4575b4', 2.0, 0.85, 'Estadual/Distrital'),
-    'ferrovias': ('fer_trecho_ferroviario_l.shp', '#7b3294', 2.3, 0.9, None),
-    'pontes': ('tra_ponte_l.shp', '#8073ac', 2, 0.9, None),
-    'tuneis': ('tra_tunel_l.shp', '#e08214', 2.2, 0.9, None),
-    'viadutos': ('tra_passagem_elevada_viaduto_l.shp', '#f781bf', 2.2, 0.9, None),
-    'hidrovias': ('hdv_trecho_hidroviario_l.shp', '#2c7fb8', 3.2, 0.85, None),
-    'dutos': ('dut_trecho_duto_l.shp', '#a6611a', 2.6, 0.9, None),
-    'terminais': ('hdv_atracadouro_terminal_p.shp', 'red', 5, 0.85, None),
-    'helipontos': ('aer_pista_ponto_pouso_p.shp', '#f46d43', 5, 0.85, None),
-    'construcoes-aero': ('edf_edif_constr_aeroportuaria_p.shp', '#3288bd', 5, 0.75, None),
-    'limite-uf': ('lml_unidade_federacao_a.shp', '#000000', 2.5, 1.0, None),
-    'municipios': ('lml_municipio_a.shp', '#2ca25f', 1.1, 0.18, None)
-}
+# Versão do layout gerado por criar_mapa_customizado; incrementar quando o
+# HTML mudar para não servir mapas antigos do cache endereçado por conteúdo
+MAP_RENDER_VERSION = 3
+
+# Camadas dos mapas gerados como tiles vetoriais (/tiles/...) em vez de GeoJSON embutido
+MAP_VECTOR_TILES = os.environ.get("MAP_VECTOR_TILES", "1") == "1"
+TILE_CACHE_DIR = Path(os.environ.get("TILE_CACHE_DIR", str(BASE_DIR / "tile_cache")))
+TILE_MAX_ZOOM = 16
+
+# GeoJSON embutido (MAP_VECTOR_TILES=0) no formato compacto: coordenadas inteiras
+# em delta e propriedades por coluna, decodificadas no navegador
+MAP_COMPACT_GEOJSON = os.environ.get("MAP_COMPACT_GEOJSON", "1") == "1"
 
 # Cache de dados carregados
 CACHE_LAYERS = {}
 CACHE_TIMESTAMP = {}
+LAYER_CACHE_TTL = 3600
+
+def tamanho_camada(gdf):
+    """Bytes aproximados da camada na memória: atributos + 16 bytes por vértice"""
+    atributos = gdf.drop(columns=gdf.geometry.name).memory_usage(deep=True).sum()
+    return int(atributos) + 16 * int(shapely.get_num_coordinates(gdf.geometry.values).sum())
+
+CAMADAS_PROCESSO = CacheLRU(LAYER_MEMO_MB * 1024 * 1024, ttl=LAYER_CACHE_TTL, tamanho=tamanho_camada)
+
+# Requisições idênticas simultâneas esperam pela mesma execução
+CARGAS_CAMADAS = SingleFlight()
+GERACOES_MAPAS = SingleFlight()
+
+# Pool de jobs assíncronos (geração e exportação PNG fora da thread da requisição)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", "8"))
+JOB_RETRY_AFTER = 5
+# Estado dos jobs em disco para que qualquer worker responda /api/jobs/<id>
+# (padrão: <SHARED_CACHE_DIR>/jobs; sem diretório, só o processo que recebeu o job)
+JOBS_DIR = os.environ.get("JOBS_DIR", os.path.join(SHARED_CACHE_DIR, "jobs") if SHARED_CACHE_DIR else "")
+JOBS = FilaJobs(max_workers=JOB_WORKERS, max_fila=JOB_QUEUE_MAX, diretorio=JOBS_DIR or None)
+# Streams SSE abertos ao mesmo tempo por processo (cada um ocupa uma thread);
+# acima disso /api/jobs/<id>/eventos responde 429 e o cliente faz polling
+JOB_SSE_MAX = int(os.environ.get("JOB_SSE_MAX", "16"))
+STREAMS_SSE = threading.BoundedSemaphore(JOB_SSE_MAX)
+
+# Chromiums persistentes para /api/exportar-png (reciclados a cada N capturas)
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_RENDERS = int(os.environ.get("BROWSER_MAX_RENDERS", "50"))
+RENDER_READY_TIMEOUT_MS = int(os.environ.get("RENDER_READY_TIMEOUT_MS", "15000"))
+POOL_NAVEGADORES = PoolNavegadores(
+    tamanho=BROWSER_POOL_SIZE,
+    max_renders=BROWSER_MAX_RENDERS,
+    espera_pronto_ms=RENDER_READY_TIMEOUT_MS
+)
+
+# Motor de exportação PNG: 'navegador' (Chromium, fiel ao HTML) ou 'estatico' (Pillow, sem navegador)
+MOTORES_PNG = ('navegador', 'estatico')
+PNG_ENGINE = os.environ.get("PNG_ENGINE", "navegador")
+BASEMAP_MBTILES = os.environ.get("BASEMAP_MBTILES", "")
+PNG_STATIC_ZOOM = 9  # 1920 px cobrindo SC ~ zoom 8; com superamostragem 2x, zoom 9
 
 # ==================== FUNÇÕES DE UTILIDADE ====================
 
-def simplificar_geometrias(gdf, tolerance=0.0005):
-    """Simplifica geometrias para melhor performance"""
-    if gdf.empty or gdf.geometry.iloc[0].geom_type in ['Point', 'MultiPoint']:
-        return gdf
-    
-    gdf = gdf.copy()
-    gdf['geometry'] = gdf['geometry'].simplify(tolerance, preserve_topology=True)
-    return gdf
+def sanitizar_nome(nome_arquivo):
+    """Mantém apenas caracteres seguros para nome de arquivo"""
+    nome_arquivo = "".join(c for c in nome_arquivo if c.isalnum() or c in (' ', '-', '_')).strip()
+    return nome_arquivo or 'mapa_customizado'
 
-def reduzir_precisao(gdf, decimals=5):
-    """Reduz precisão das coordenadas"""
-    if gdf.empty:
-        return gdf
+def normalizar_camadas(selected_layers):
+    """Camadas válidas, sem repetição, na ordem canônica do LAYER_MAPPING"""
+    selecionadas = set(selected_layers)
+    return [layer_id for layer_id in LAYER_MAPPING if layer_id in selecionadas]
+
+def ler_area(data):
+    """Área de interesse opcional do pedido: retorna ({'bbox': [...]} / {'geocodigo': '...'} / None, erro)"""
+    bbox = data.get('bbox')
+    geocodigo = data.get('geocodigo')
     
-    gdf = gdf.copy()
+    if bbox is not None and geocodigo is not None:
+        return None, ('Use bbox ou geocodigo, nao ambos', 400)
     
-    def round_geom(geom):
-        if geom.is_empty:
-            return geom
-        
-        geom_type = geom.geom_type
-        
-        if geom_type == 'Polygon':
-            exterior = np.round(np.array(geom.exterior.coords), decimals)
-            interiors = []
-            for interior in geom.interiors:
-                interiors.append(np.round(np.array(interior.coords), decimals))
-            return Polygon(exterior, interiors)
-        
-        elif geom_type == 'MultiPolygon':
-            polygons = []
-            for poly in geom.geoms:
-                exterior = np.round(np.array(poly.exterior.coords), decimals)
-                interiors = []
-                for interior in poly.interiors:
-                    interiors.append(np.round(np.array(interior.coords), decimals))
-                polygons.append(Polygon(exterior, interiors))
-            return MultiPolygon(polygons)
-        
-        elif geom_type == 'LineString':
-            coords = np.round(np.array(geom.coords), decimals)
-            return LineString(coords)
-        
-        elif geom_type == 'MultiLineString':
-            lines = []
-            for line in geom.geoms:
-                lines.append(np.round(np.array(line.coords), decimals))
-            return MultiLineString(lines)
-        
-        elif geom_type == 'Point':
-            coords = np.round(np.array(geom.coords), decimals)
-            return Point(coords[0])
-        
-        else:
-            return geom
+    if bbox is not None:
+        try:
+            bbox = [round(float(v), CASAS_DECIMAIS) for v in bbox]
+        except (TypeError, ValueError):
+            bbox = []
+        if len(bbox) != 4 or not (-180 <= bbox[0] < bbox[2] <= 180 and -90 <= bbox[1] < bbox[3] <= 90):
+            return None, ('bbox invalido: use [lon_min, lat_min, lon_max, lat_max]', 400)
+        return {'bbox': bbox}, None
     
-    gdf['geometry'] = gdf['geometry'].apply(round_geom)
-    return gdf
+    if geocodigo is not None:
+        geocodigo = str(geocodigo).strip()
+        if not geocodigo.isdigit():
+            return None, ('geocodigo invalido: use o codigo IBGE do municipio (7 digitos)', 400)
+        area = {'geocodigo': geocodigo}
+        if geometria_area(area) is None:
+            return None, ('Municipio nao encontrado: {}'.format(geocodigo), 404)
+        return area, None
+    
+    return None, None
 
-def carregar_camada(layer_id):
-    """Carrega uma camada do shapefile com cache"""
+def geometria_area(area):
+    """Recorte da área: tupla do bbox ou contorno do município (EPSG:4326); None = estado inteiro"""
+    if not area:
+        return None
+    if 'bbox' in area:
+        return tuple(area['bbox'])
     
-    # Verificar cache (atualizar a cada 1 hora)
-    if layer_id in CACHE_LAYERS:
-        if time.time() - CACHE_TIMESTAMP.get(layer_id, 0) < 3600:
-            return CACHE_LAYERS[layer_id]
+    municipios = carregar_camada('municipios')
+    if municipios is None or 'geocodigo' not in municipios.columns:
+        return None
+    selecionados = municipios[municipios['geocodigo'].astype(str) == area['geocodigo']]
+    if selecionados.empty:
+        return None
+    return shapely.make_valid(shapely.union_all(selecionados.geometry.values))
+
+def limites_area(recorte):
+    """(lon_min, lat_min, lon_max, lat_max) do recorte"""
+    return recorte if isinstance(recorte, tuple) else recorte.bounds
+
+def chave_mapa(camadas, area=None):
+    """Identificador do mapa: hash do conjunto de camadas, da área e dos parâmetros de renderização"""
+    conteudo = {
+        'camadas': camadas,
+        'estilos': [list(LAYER_MAPPING[layer_id][1:]) for layer_id in camadas],
+        'tolerancia': TOLERANCIA_SIMPLIFICACAO,
+        'decimais': CASAS_DECIMAIS,
+        'versao': MAP_RENDER_VERSION,
+        'tiles': MAP_VECTOR_TILES,
+        'compacto': MAP_COMPACT_GEOJSON,
+        'camadas_versao': [versao_camada(layer_id) for layer_id in camadas],
+    }
+    if area:
+        conteudo['area'] = area
+        if 'geocodigo' in area:
+            # O recorte usa o limite municipal: mudou o limite, muda o mapa
+            conteudo['municipios_versao'] = versao_camada('municipios')
+    digest = hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode('utf-8')).hexdigest()
+    return 'mapa_{}'.format(digest[:16])
+
+def registrar_alias(nome_arquivo, chave):
+    """Associa o nome escolhido pelo usuário ao mapa gerado (arquivo .alias no TEMP_DIR)"""
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    (TEMP_DIR / "{}.alias".format(nome_arquivo)).write_text(chave, encoding='utf-8')
+
+def registrar_camadas(chave, camadas, area=None):
+    """Guarda as camadas e a área do mapa (arquivo .json no TEMP_DIR) para a exportação estática"""
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    (TEMP_DIR / "{}.json".format(chave)).write_text(json.dumps({'camadas': camadas, 'area': area}), encoding='utf-8')
+
+def _meta_mapa(chave):
+    meta_path = TEMP_DIR / "{}.json".format(chave)
+    if not meta_path.exists():
+        return None
+    return json.loads(meta_path.read_text(encoding='utf-8'))
+
+def camadas_do_mapa(chave):
+    """Camadas registradas para a chave (ou None se o mapa não foi gerado)"""
+    meta = _meta_mapa(chave)
+    return meta['camadas'] if meta else None
+
+def area_do_mapa(chave):
+    """Área registrada para a chave (None = estado inteiro)"""
+    meta = _meta_mapa(chave)
+    return meta.get('area') if meta else None
+
+def resolver_mapa(nome_arquivo):
+    """Converte um alias (nome do usuário) na chave do mapa; chaves passam direto"""
+    alias_path = TEMP_DIR / "{}.alias".format(nome_arquivo)
+    if alias_path.exists():
+        return alias_path.read_text(encoding='utf-8').strip()
+    return nome_arquivo
+
+def obter_mapa_cache(nome_arquivo):
+    """Busca o HTML do mapa no cache (compartilhado ou do processo)"""
+    if CACHE_COMPARTILHADO is not None:
+        dados = CACHE_COMPARTILHADO.ler_bytes('mapa:' + nome_arquivo)
+        return dados.decode('utf-8') if dados is not None else None
+    return MAPS_CACHE.get(nome_arquivo)
+
+def guardar_mapa_cache(nome_arquivo, html_content):
+    """Armazena o HTML do mapa no cache (compartilhado ou do processo)"""
+    if CACHE_COMPARTILHADO is not None:
+        CACHE_COMPARTILHADO.gravar_bytes('mapa:' + nome_arquivo, html_content.encode('utf-8'), '.html')
+    else:
+        MAPS_CACHE[nome_arquivo] = html_content
+
+def servir_precomprimido(caminho, mimetype):
+    """Variante .br/.gz do arquivo aceita pelo cliente (com ETag/304); None se não houver"""
+    disponiveis = variantes(caminho)
+    codificacao = escolher_codificacao(request.headers.get('Accept-Encoding'),
+                                       tuple(c for c in CODIFICACOES if c in disponiveis))
+    if codificacao is None:
+        return None
     
+    resposta = send_file(str(disponiveis[codificacao]), mimetype=mimetype, conditional=True)
+    resposta.headers['Content-Encoding'] = codificacao
+    resposta.headers['Vary'] = 'Accept-Encoding'
+    return resposta
+
+def versao_camada(layer_id):
+    """Hash dos parâmetros da camada: separa os tiles em disco de cada pré-processamento"""
+    conteudo = json.dumps(parametros_camada(layer_id), sort_keys=True).encode('utf-8')
+    return hashlib.sha256(conteudo).hexdigest()[:12]
+
+def camada_disponivel(layer_id):
+    """Camada tem shapefile ou versão compilada (sem carregá-la)"""
+    shapefile_path = SHAPEFILE_DIR / LAYER_MAPPING[layer_id][0]
+    return shapefile_path.exists() or armazem_camadas.caminho_camada(layer_id).exists()
+
+def url_tiles(layer_id):
+    """Modelo da URL dos tiles vetoriais; a versão na URL invalida o cache do navegador e de proxies"""
+    return '/tiles/{}/{}/{{z}}/{{x}}/{{y}}.pbf'.format(layer_id, versao_camada(layer_id))
+
+def estilo_camada(layer_id):
+    """Estilo Leaflet da camada (o mesmo dos style_function do GeoJson)"""
+    shapefile, color, weight, opacity, filtro = LAYER_MAPPING[layer_id]
+    if tipo_camada(layer_id) == 'ponto':
+        return {'radius': weight, 'color': color, 'weight': 3, 'fill': True,
+                'fillColor': color, 'fillOpacity': opacity}
+    if layer_id == 'municipios':
+        return {'color': color, 'fillColor': color, 'weight': weight, 'fill': True,
+                'fillOpacity': opacity, 'opacity': 1.0}
+    if layer_id == 'limite-uf':
+        return {'color': color, 'weight': weight, 'fill': False, 'fillOpacity': 0}
+    estilo = {'color': color, 'weight': weight, 'opacity': opacity}
+    if layer_id == 'dutos':
+        estilo['dashArray'] = '6,4'
+    return estilo
+
+def _chave_memo(chave):
+    """Chave da camada (ou nível 'camada@zN') no memo do processo, com a versão do pré-processamento"""
+    return '{}:{}'.format(chave, versao_camada(chave.split('@')[0]))
+
+def _obter_camada_cache(chave):
+    """Camada (ou nível) do cache compartilhado ou do processo, se ainda válida"""
+    if CACHE_COMPARTILHADO is not None:
+        gdf = CAMADAS_PROCESSO.get(_chave_memo(chave))
+        if gdf is None:
+            gdf = CACHE_COMPARTILHADO.ler_camada('camada:' + chave, validade=LAYER_CACHE_TTL)
+            if gdf is not None:
+                CAMADAS_PROCESSO[_chave_memo(chave)] = gdf
+        return gdf
+    if chave in CACHE_LAYERS and time.time() - CACHE_TIMESTAMP.get(chave, 0) < LAYER_CACHE_TTL:
+        return CACHE_LAYERS[chave]
+    return None
+
+def _guardar_camada_cache(chave, gdf):
+    if CACHE_COMPARTILHADO is not None:
+        CACHE_COMPARTILHADO.gravar_camada('camada:' + chave, gdf)
+        CAMADAS_PROCESSO[_chave_memo(chave)] = gdf
+    else:
+        CACHE_LAYERS[chave] = gdf
+        CACHE_TIMESTAMP[chave] = time.time()
+
+def carregar_camada(layer_id, zoom=None):
+    """Carrega uma camada (armazém compilado ou shapefile) com cache
+
+    Com zoom, retorna o nível de detalhe adequado àquele zoom.
+    """
     if layer_id not in LAYER_MAPPING:
         return None
     
-    shapefile, _, _, _, filtro = LAYER_MAPPING[layer_id]
-    shapefile_path = SHAPEFILE_DIR / shapefile
+    nivel = nivel_camada(layer_id, zoom) if zoom is not None else None
+    chave = layer_id if nivel is None else '{}@z{}'.format(layer_id, nivel)
     
-    if not shapefile_path.exists():
-        print("[WARN] File not found: {}".format(shapefile_path))
-        return None
+    # Verificar cache (atualizar a cada 1 hora)
+    gdf = _obter_camada_cache(chave)
+    if gdf is not None:
+        return gdf
+    
+    # Cargas simultâneas da mesma camada leem o shapefile uma única vez
+    if nivel is None:
+        gdf, _ = CARGAS_CAMADAS.executar(chave, _carregar_camada_fonte, layer_id)
+    else:
+        gdf, _ = CARGAS_CAMADAS.executar(chave, _carregar_nivel_fonte, layer_id, nivel)
+    return gdf
+
+def _carregar_nivel_fonte(layer_id, nivel):
+    """Lê o nível compilado ou o deriva da camada base; popula o cache"""
+    shapefile_path = SHAPEFILE_DIR / LAYER_MAPPING[layer_id][0]
+    
+    gdf = armazem_camadas.ler_nivel(layer_id, nivel, shapefile_path, parametros_camada(layer_id))
+    if gdf is None:
+        base = carregar_camada(layer_id)
+        if base is None:
+            return None
+        if layer_id in CAMADAS_TOPOLOGIA:
+            gdf = topologia_divisas(layer_id, base, carregar_camada).simplificar(tolerancia_zoom(nivel))[0]
+        else:
+            gdf = simplificar_nivel(base, nivel)
+    
+    _guardar_camada_cache('{}@z{}'.format(layer_id, nivel), gdf)
+    return gdf
+
+def _carregar_camada_fonte(layer_id):
+    """Lê a camada do armazém compilado ou do shapefile e popula o cache"""
+    shapefile = LAYER_MAPPING[layer_id][0]
+    shapefile_path = SHAPEFILE_DIR / shapefile
     
     try:
-        print("[LOAD] Loading {}...".format(layer_id))
-        gdf = gpd.read_file(str(shapefile_path)).to_crs("EPSG:4326")
-        
-        # Aplicar filtro de jurisdicao se necessario (rodovias)
-        if filtro and 'jurisdicao' in gdf.columns:
-            gdf = gdf[gdf['jurisdicao'] == filtro]
-        
-        # Simplificar geometrias
-        if gdf.geometry.iloc[0].geom_type not in ['Point', 'MultiPoint']:
-            gdf = simplificar_geometrias(gdf, tolerance=0.0005)
+        # Camada pré-compilada (python compilar_camadas.py) evita reprocessar o shapefile
+        gdf = armazem_camadas.ler_camada(layer_id, shapefile_path, parametros_camada(layer_id))
         
-        # Reduzir precisão
-        gdf = reduzir_precisao(gdf, decimals=5)
-        
-        # Manter apenas colunas essenciais
-        essential_cols = ['nome', 'tipotrecho', 'bitola', 'categoria', 'tipo', 'jurisdicao', 'revestimen', 'operaciona']
-        existing_cols = [col for col in essential_cols if col in gdf.columns]
-        if existing_cols:
-            gdf = gdf[existing_cols + ['geometry']]
+        if gdf is not None:
+            print("[LOAD] Loading {} from compiled store...".format(layer_id))
         else:
-            gdf = gdf[['geometry']]
+            if not shapefile_path.exists():
+                print("[WARN] File not found: {}".format(shapefile_path))
+                return None
+            
+            print("[LOAD] Loading {}...".format(layer_id))
+            gdf = preparar_camada(layer_id)
         
         # Cache
-        CACHE_LAYERS[layer_id] = gdf
-        CACHE_TIMESTAMP[layer_id] = time.time()
+        _guardar_camada_cache(layer_id, gdf)
         
         print("[OK] {} loaded: {} features".format(layer_id, len(gdf)))
         return gdf
@@ -238,10 +435,56 @@ def carregar_camada(layer_id):
         print("[ERROR] Failed to load {}: {}".format(layer_id, str(e)))
         return None
 
-def criar_mapa_customizado(selected_layers, nome_arquivo="mapa_customizado"):
-    """Cria um mapa com as camadas selecionadas"""
+# Índice espacial por camada em cache: tiles vetoriais e recortes por área
+INDICE_CAMADAS = IndiceCamadas(
+    carregar_camada,
+    versao_camada,
+    validade=LAYER_CACHE_TTL,
+    nivel=nivel_camada
+)
+GERADOR_TILES = GeradorTiles(INDICE_CAMADAS, TILE_CACHE_DIR, colunas=ESSENTIAL_COLS)
+
+class SinalMapaPronto(MacroElement):
+    """Marca window.mapaPronto quando os tiles visíveis e as camadas terminaram de desenhar
+
+    Usado pela exportação PNG no lugar de uma espera fixa. O mapa é servido
+    dentro de um iframe (_repr_html_), então o exportador procura o sinal em
+    todos os frames da página.
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var mapa = {{ this._parent.get_name() }};
+            var pendentes = 0;
+            function marcarPronto() {
+                // Dois frames garantem que o canvas (prefer_canvas) já foi pintado
+                requestAnimationFrame(function() {
+                    requestAnimationFrame(function() {
+                        window.mapaPronto = true;
+                        document.documentElement.setAttribute('data-mapa-pronto', '1');
+                    });
+                });
+            }
+            function tileCarregado() {
+                pendentes -= 1;
+                if (pendentes === 0) { marcarPronto(); }
+            }
+            mapa.eachLayer(function(layer) {
+                if (layer instanceof L.GridLayer && layer.isLoading && layer.isLoading()) {
+                    pendentes += 1;
+                    layer.once('load', tileCarregado);
+                }
+            });
+            if (pendentes === 0) { marcarPronto(); }
+        })();
+        {% endmacro %}
+    """)
+
+def criar_mapa_customizado(selected_layers, nome_arquivo="mapa_customizado", area=None):
+    """Cria um mapa com as camadas selecionadas (recortadas na área, se houver)"""
     
     print("\n[MAP] Creating map with {} layers...".format(len(selected_layers)))
+    recorte = geometria_area(area)
     
     # Criar mapa base (igual ao mapa original)
     mapa = folium.Map(
@@ -282,11 +525,48 @@ def criar_mapa_customizado(selected_layers, nome_arquivo="mapa_customizado"):
         if layer_id not in LAYER_MAPPING:
             continue
         
-        gdf = carregar_camada(layer_id)
+        # Tiles só para o estado inteiro: a URL dos tiles não leva a área, então um
+        # mapa recortado embute as feições da área (poucas) no lugar dos tiles
+        if MAP_VECTOR_TILES and recorte is None:
+            if not camada_disponivel(layer_id):
+                print("[WARN] {} unavailable".format(layer_id))
+                continue
+            # Só a URL dos tiles vai no HTML; o navegador baixa os tiles visíveis
+            VectorGridProtobuf(
+                url_tiles(layer_id),
+                name=layer_id.replace('-', ' ').title(),
+                options={
+                    'vectorTileLayerStyles': {layer_id: estilo_camada(layer_id)},
+                    'maxNativeZoom': TILE_MAX_ZOOM
+                },
+                show=True
+            ).add_to(mapa)
+            camadas_adicionadas += 1
+            print("[OK] {} added (vector tiles)".format(layer_id))
+            continue
+        
+        if recorte is not None:
+            # Só as feições que cruzam a área, já recortadas (STRtree da camada)
+            gdf = INDICE_CAMADAS.recortar(layer_id, recorte)
+        else:
+            gdf = carregar_camada(layer_id)
         if gdf is None or gdf.empty:
             print("[WARN] {} empty or unavailable".format(layer_id))
             continue
         
+        if MAP_COMPACT_GEOJSON:
+            GeoJsonCompacto(
+                gdf,
+                estilo_camada(layer_id),
+                name=layer_id.replace('-', ' ').title(),
+                tooltip='nome' if tipo_camada(layer_id) == 'ponto' else None,
+                decimais=CASAS_DECIMAIS,
+                show=True
+            ).add_to(mapa)
+            camadas_adicionadas += 1
+            print("[OK] {} added (compact GeoJSON)".format(layer_id))
+            continue
+        
         shapefile, color, weight, opacity, filtro = LAYER_MAPPING[layer_id]
         geom_type = gdf.geometry.iloc[0].geom_type if len(gdf) > 0 else None
         
@@ -369,6 +649,14 @@ def criar_mapa_customizado(selected_layers, nome_arquivo="mapa_customizado"):
     # Adicionar controle de camadas
     folium.LayerControl(position="topright", collapsed=False).add_to(mapa)
     
+    # Enquadrar a área do pedido
+    if recorte is not None:
+        lon_min, lat_min, lon_max, lat_max = limites_area(recorte)
+        mapa.fit_bounds([[lat_min, lon_min], [lat_max, lon_max]])
+    
+    # Sinal de renderização concluída (último elemento: roda após todas as camadas)
+    SinalMapaPronto().add_to(mapa)
+    
     # Salvar HTML em string (para cache em memória)
     html_str = mapa._repr_html_()
     
@@ -382,6 +670,36 @@ def criar_mapa_customizado(selected_layers, nome_arquivo="mapa_customizado"):
     
     return nome_arquivo, html_str
 
+def gerar_ou_reutilizar_mapa(camadas, chave, area=None):
+    """Gera o mapa da chave se ainda não existir; retorna True se reutilizou"""
+    
+    html_path = TEMP_DIR / "{}.html".format(chave)
+    
+    # Reutilizar mapa idêntico já gerado (cache ou arquivo)
+    if obter_mapa_cache(chave) is not None or html_path.exists():
+        print("[GEN] Reusing existing map: {}".format(chave))
+        if MAP_PRECOMPRESS and html_path.exists():
+            gravar_variantes(html_path, qualidade_brotli=PRECOMPRESS_BROTLI_QUALITY,
+                             nivel_gzip=PRECOMPRESS_GZIP_LEVEL)
+        return True
+    
+    # Criar mapa
+    chave, html_content = criar_mapa_customizado(camadas, chave, area)
+    
+    # Armazenar HTML em cache
+    guardar_mapa_cache(chave, html_content)
+    
+    # Comprimir uma vez aqui em vez de a cada visualização
+    if MAP_PRECOMPRESS:
+        inicio = time.time()
+        gravadas = gravar_variantes(html_path, qualidade_brotli=PRECOMPRESS_BROTLI_QUALITY,
+                                    nivel_gzip=PRECOMPRESS_GZIP_LEVEL)
+        print("[GEN] Precompressed variants: {} ({:.2f}s)".format(
+            ', '.join('{} {:.0f} KB'.format(c, n / 1024) for c, n in gravadas.items()), time.time() - inicio))
+    
+    print("[GEN] Map cached with key: {}".format(chave))
+    return False
+
 # ==================== ROTAS FLASK ====================
 
 @app.route('/', methods=['GET'])
@@ -417,43 +735,73 @@ def get_layers():
             {'id': 'municipios', 'name': 'Municipios', 'color': COLORS['municipios']}
         ]
     }
+    
+    # Estilo e URL dos tiles vetoriais (pré-visualização no mapa da página)
+    for camadas in layers.values():
+        for layer in camadas:
+            layer['estilo'] = estilo_camada(layer['id'])
+            layer['tiles'] = url_tiles(layer['id'])
+    
     return jsonify(layers)
 
+def preparar_pedido_mapa(data):
+    """Valida o corpo de /api/gerar-mapa; retorna ((nome, camadas, chave, area), None) ou (None, (erro, status))"""
+    selected_layers = data.get('layers', [])
+    nome_arquivo = data.get('nome', 'mapa_customizado')
+    
+    if not selected_layers:
+        return None, ('No layers selected', 400)
+    
+    # Sanitizar nome
+    nome_arquivo = sanitizar_nome(nome_arquivo)
+    
+    # O mapa é identificado pelo conjunto de camadas; o nome é só um alias
+    camadas = normalizar_camadas(selected_layers)
+    if not camadas:
+        return None, ('No valid layers selected', 400)
+    
+    # Recorte opcional por bbox ou município
+    area, erro = ler_area(data)
+    if erro:
+        return None, erro
+    
+    return (nome_arquivo, camadas, chave_mapa(camadas, area), area), None
+
+def executar_geracao(nome_arquivo, camadas, chave, area=None):
+    """Gera (ou reutiliza) o mapa e registra o alias; retorna o corpo da resposta"""
+    print("\n[GEN] Generating: {} ({})".format(nome_arquivo, chave))
+    print("[LAYERS] {}".format(camadas))
+    if area:
+        print("[AREA] {}".format(area))
+    
+    # Pedidos idênticos simultâneos aguardam a mesma geração
+    reutilizado, compartilhado = GERACOES_MAPAS.executar(chave, gerar_ou_reutilizar_mapa, camadas, chave, area)
+    reutilizado = reutilizado or compartilhado
+    
+    registrar_alias(nome_arquivo, chave)
+    registrar_camadas(chave, camadas, area)
+    
+    return {
+        'success': True,
+        'message': 'Map generated successfully!',
+        'url': '/visualizar/{}'.format(chave),
+        'map_id': chave,
+        'cached': reutilizado,
+        'layers_count': len(camadas),
+        'area': area
+    }
+
 @app.route('/api/gerar-mapa', methods=['POST'])
 def gerar_mapa():
-    """Gera mapa com camadas selecionadas"""
+    """Gera mapa com camadas selecionadas (síncrono; prefira /api/jobs/gerar-mapa)"""
     
     try:
-        data = request.json
-        selected_layers = data.get('layers', [])
-        nome_arquivo = data.get('nome', 'mapa_customizado')
-        
-        if not selected_layers:
-            return jsonify({'error': 'No layers selected'}), 400
-        
-        # Sanitizar nome
-        nome_arquivo = "".join(c for c in nome_arquivo if c.isalnum() or c in (' ', '-', '_')).strip()
-        if not nome_arquivo:
-            nome_arquivo = 'mapa_customizado'
-        
-        print("\n[GEN] Generating: {}".format(nome_arquivo))
-        print("[LAYERS] {}".format(selected_layers))
-        
-        # Criar mapa
-        nome_arquivo, html_content = criar_mapa_customizado(selected_layers, nome_arquivo)
-        
-        # Armazenar HTML em cache
-        MAPS_CACHE[nome_arquivo] = html_content
-        
-        print("[GEN] Map cached with key: {}".format(nome_arquivo))
+        pedido, erro = preparar_pedido_mapa(request.json)
+        if erro:
+            return jsonify({'error': erro[0]}), erro[1]
         
         # Retornar URL do mapa
-        return jsonify({
-            'success': True,
-            'message': 'Map generated successfully!',
-            'url': '/visualizar/{}'.format(nome_arquivo),
-            'layers_count': len(selected_layers)
-        })
+        return jsonify(executar_geracao(*pedido))
     
     except Exception as e:
         print("[ERROR] {}".format(str(e)))
@@ -463,14 +811,22 @@ def gerar_mapa():
 def visualizar_mapa(nome_arquivo):
     """Visualiza o mapa gerado"""
     
+    nome_arquivo = resolver_mapa(nome_arquivo)
+    html_path = TEMP_DIR / "{}.html".format(nome_arquivo)
+    
+    # Variante pré-comprimida gravada na geração (bytes prontos, sem recomprimir)
+    resposta = servir_precomprimido(html_path, 'text/html')
+    if resposta is not None:
+        print(f"[VIEW] Serving precompressed map ({resposta.headers['Content-Encoding']}): {nome_arquivo}")
+        return resposta
+    
     # Primeiro tenta buscar do cache em memória
-    if nome_arquivo in MAPS_CACHE:
+    html_content = obter_mapa_cache(nome_arquivo)
+    if html_content is not None:
         print(f"[VIEW] Serving map from cache: {nome_arquivo}")
-        return MAPS_CACHE[nome_arquivo]
+        return html_content
     
     # Fallback: tenta buscar do arquivo
-    html_path = TEMP_DIR / "{}.html".format(nome_arquivo)
-    
     print(f"[VIEW] Cache miss, looking for file: {html_path}")
     
     if html_path.exists():
@@ -478,73 +834,199 @@ def visualizar_mapa(nome_arquivo):
         with open(str(html_path), 'r', encoding='utf-8') as f:
             content = f.read()
             # Adiciona ao cache para próximas requisições
-            MAPS_CACHE[nome_arquivo] = content
+            guardar_mapa_cache(nome_arquivo, content)
             return content
     
     print(f"[VIEW] Map not found: {nome_arquivo}")
     return "Map not found. Please generate a map first.", 404
 
-@app.route('/api/exportar-png', methods=['POST'])
-def exportar_png():
-    """Exporta mapa como PNG usando Playwright"""
+@app.route('/tiles/<layer_id>/<versao>/<int:z>/<int:x>/<int:y>.pbf', methods=['GET'])
+def tile_vetorial(layer_id, versao, z, x, y):
+    """Tile vetorial (MVT) da camada, recortado sob demanda e cacheado em disco
+
+    A URL leva a versão da camada (url_tiles): o conteúdo de uma URL nunca muda,
+    e uma página antiga é redirecionada para a versão atual.
+    """
+    if layer_id not in LAYER_MAPPING:
+        return jsonify({'error': 'Layer not found'}), 404
+    if not tile_valido(z, x, y, TILE_MAX_ZOOM):
+        return jsonify({'error': 'Invalid tile'}), 400
+    if versao != versao_camada(layer_id):
+        resposta = redirect(url_tiles(layer_id).format(z=z, x=x, y=y))
+        resposta.headers['Cache-Control'] = 'no-cache'
+        return resposta
     
-    try:
-        data = request.json
-        nome_arquivo = data.get('nome', 'mapa_customizado')
-        
-        # Sanitizar nome
-        nome_arquivo = "".join(c for c in nome_arquivo if c.isalnum() or c in (' ', '-', '_')).strip()
-        if not nome_arquivo:
-            nome_arquivo = 'mapa_customizado'
-        
-        print("\n[EXPORT] Exporting PNG: {}".format(nome_arquivo))
-        
-        # Procurar arquivo HTML no temp_maps
-        html_filename = "{}.html".format(nome_arquivo)
-        temp_path = TEMP_DIR / html_filename
-        
-        if not temp_path.exists():
-            return jsonify({'error': 'Mapa nao encontrado. Gere o mapa primeiro!'}), 404
-        
-        # Criar timestamp para PNG
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        png_filename = "{}_{}.png".format(nome_arquivo, timestamp)
-        png_path = OUTPUT_DIR / png_filename
-        
+    resposta = Response(GERADOR_TILES.obter(layer_id, z, x, y), mimetype='application/vnd.mapbox-vector-tile')
+    resposta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resposta
+
+@app.route('/api/layers/<layer_id>/topojson', methods=['GET'])
+def camada_topojson(layer_id):
+    """Municípios/limite estadual em TopoJSON: cada divisa é enviada uma única vez"""
+    if layer_id not in CAMADAS_TOPOLOGIA:
+        return jsonify({'error': 'TopoJSON disponivel apenas para: {}'.format(', '.join(CAMADAS_TOPOLOGIA))}), 404
+    
+    versao = versao_camada(layer_id)
+    etag = '"{}"'.format(versao)
+    if etag_confere(request.headers.get('If-None-Match'), etag):
+        resposta = Response(status=304)
+        resposta.headers['ETag'] = etag
+        return resposta
+    
+    # Mesmo cache do HTML dos mapas (compartilhado entre workers, se configurado)
+    chave = 'topojson:{}:{}'.format(layer_id, versao)
+    if CACHE_COMPARTILHADO is not None:
+        corpo = CACHE_COMPARTILHADO.ler_bytes(chave)
+    else:
+        corpo = MAPS_CACHE.get(chave)
+    if corpo is None:
+        gdf = carregar_camada(layer_id)
+        if gdf is None or gdf.empty:
+            return jsonify({'error': 'Layer unavailable'}), 404
+        documento = Topologia([gdf]).topojson([layer_id])
+        corpo = json.dumps(documento, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if CACHE_COMPARTILHADO is not None:
+            CACHE_COMPARTILHADO.gravar_bytes(chave, corpo, '.json')
+        else:
+            MAPS_CACHE[chave] = corpo
+    
+    resposta = Response(corpo, mimetype='application/json')
+    resposta.headers['ETag'] = etag
+    resposta.headers['Cache-Control'] = 'public, max-age=86400'
+    return resposta
+
+@app.route('/api/layers/<layer_id>/features', methods=['GET'])
+def camada_feicoes(layer_id):
+    """Feições da camada em fluxo (NDJSON ou FeatureCollection), comprimidas conforme o Accept-Encoding
+
+    Query: formato=ndjson|geojson, bbox=lon_min,lat_min,lon_max,lat_max ou geocodigo=...
+    """
+    if layer_id not in LAYER_MAPPING:
+        return jsonify({'error': 'Layer not found'}), 404
+    
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in fluxo_geojson.FORMATOS:
+        return jsonify({'error': 'Formato invalido: use {}'.format(' ou '.join(fluxo_geojson.FORMATOS))}), 400
+    
+    bbox = request.args.get('bbox')
+    area, erro = ler_area({'bbox': bbox.split(',') if bbox else None, 'geocodigo': request.args.get('geocodigo')})
+    if erro:
+        return jsonify({'error': erro[0]}), erro[1]
+    
+    # Fraco: o mesmo conteúdo vale para qualquer Content-Encoding
+    versoes = [versao_camada(layer_id)]
+    if area and 'geocodigo' in area:
+        versoes.append(versao_camada('municipios'))  # recorte pelo limite municipal
+    identidade = json.dumps([versoes, formato, area], sort_keys=True).encode('utf-8')
+    etag = 'W/"{}"'.format(hashlib.sha256(identidade).hexdigest()[:16])
+    if etag_confere(request.headers.get('If-None-Match'), etag):
+        resposta = Response(status=304)
+        resposta.headers['ETag'] = etag
+        return resposta
+    
+    recorte = geometria_area(area)
+    gdf = INDICE_CAMADAS.recortar(layer_id, recorte) if recorte is not None else carregar_camada(layer_id)
+    if gdf is None:
+        return jsonify({'error': 'Layer unavailable'}), 404
+    
+    gerador, mimetype = fluxo_geojson.FORMATOS[formato]
+    codificacao = escolher_codificacao(request.headers.get('Accept-Encoding'))
+    
+    # Sem Content-Length: o corpo sai em chunked transfer, lote por lote
+    resposta = Response(comprimir_fluxo(gerador(gdf), codificacao), mimetype=mimetype)
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+    resposta.headers['Vary'] = 'Accept-Encoding'
+    resposta.headers['ETag'] = etag
+    resposta.headers['Cache-Control'] = 'public, max-age=3600'
+    return resposta
+
+def preparar_pedido_png(data):
+    """Valida o corpo de /api/exportar-png; retorna ((nome, chave, motor, camadas), None) ou (None, (erro, status))"""
+    nome_arquivo = data.get('nome', 'mapa_customizado')
+    motor = data.get('motor', PNG_ENGINE)
+    
+    if motor not in MOTORES_PNG:
+        return None, ('Motor invalido: {} (use {})'.format(motor, ' ou '.join(MOTORES_PNG)), 400)
+    
+    # Sanitizar nome
+    nome_arquivo = sanitizar_nome(nome_arquivo)
+    chave = resolver_mapa(nome_arquivo)
+    
+    if motor == 'estatico':
+        # Camadas do pedido ou as registradas na geração do mapa
+        camadas = normalizar_camadas(data['layers']) if data.get('layers') else camadas_do_mapa(chave)
+        if not camadas:
+            return None, ('Mapa nao encontrado. Gere o mapa primeiro!', 404)
+        return (nome_arquivo, chave, motor, camadas), None
+    
+    # Procurar arquivo HTML no temp_maps
+    if not (TEMP_DIR / "{}.html".format(chave)).exists():
+        return None, ('Mapa nao encontrado. Gere o mapa primeiro!', 404)
+    
+    return (nome_arquivo, chave, motor, None), None
+
+def renderizar_png_estatico(camadas, png_path, area=None):
+    """Desenha as camadas direto em PNG (Pillow), sem navegador nem servidor HTTP"""
+    recorte = geometria_area(area)
+    desenho = []
+    for layer_id in camadas:
+        if recorte is not None:
+            gdf = INDICE_CAMADAS.recortar(layer_id, recorte)
+        else:
+            gdf = carregar_camada(layer_id, PNG_STATIC_ZOOM)
+        if gdf is None or gdf.empty:
+            print("[WARN] {} empty or unavailable".format(layer_id))
+            continue
+        shapefile, color, weight, opacity, filtro = LAYER_MAPPING[layer_id]
+        desenho.append((layer_id, gdf, color, weight, opacity))
+    
+    bbox = limites_area(recorte) if recorte is not None else None
+    renderizar_png(desenho, png_path, bbox=bbox, mbtiles_path=BASEMAP_MBTILES or None)
+
+def executar_exportacao_png(nome_arquivo, chave, motor='navegador', camadas=None):
+    """Renderiza o mapa (Chromium ou Pillow) e salva o PNG; retorna o corpo da resposta"""
+    print("\n[EXPORT] Exporting PNG: {} ({}, {})".format(nome_arquivo, chave, motor))
+    
+    # Criar timestamp para PNG
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    png_filename = "{}_{}.png".format(nome_arquivo, timestamp)
+    png_path = OUTPUT_DIR / png_filename
+    
+    if motor == 'estatico':
+        print("[INFO] Rendering static PNG: {}".format(camadas))
+        renderizar_png_estatico(camadas, png_path, area_do_mapa(chave))
+    else:
         print("[INFO] Converting HTML to PNG...")
         
-        # Usar Playwright para converter HTML em PNG
-        from playwright.sync_api import sync_playwright
-        
         # URL interna do próprio servidor (evita problemas de permissões com file://)
         server_port = os.environ.get("PORT", "5000")
-        view_url = f"http://localhost:{server_port}/visualizar/{nome_arquivo}"
+        view_url = f"http://localhost:{server_port}/visualizar/{chave}"
         print(f"[INFO] Loading page for screenshot: {view_url}")
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page(viewport={'width': 1920, 'height': 1080})
-            page.set_default_timeout(60000)  # aumenta timeout para redes lentas
-
-            # Abrir página servida pelo Flask (garante acesso a tiles remotos)
-            page.goto(view_url, wait_until="networkidle")
-
-            # Aguardar tiles/folium renderizarem
-            page.wait_for_timeout(4000)
-            
-            # Tirar screenshot
-            page.screenshot(path=str(png_path), full_page=True)
-            
-            browser.close()
         
-        print("[OK] PNG exported: {}".format(png_path))
+        # Chromium já aquecido do pool (Playwright); aguarda o sinal window.mapaPronto
+        POOL_NAVEGADORES.renderizar(view_url, png_path)
+    
+    print("[OK] PNG exported: {}".format(png_path))
+    
+    return {
+        'success': True,
+        'message': 'PNG exportado: {}'.format(png_filename),
+        'filename': png_filename,
+        'motor': motor,
+        'download_url': '/download-png/{}'.format(png_filename)
+    }
+
+@app.route('/api/exportar-png', methods=['POST'])
+def exportar_png():
+    """Exporta mapa como PNG (Playwright ou motor estático; síncrono, prefira /api/jobs/exportar-png)"""
+    
+    try:
+        pedido, erro = preparar_pedido_png(request.json)
+        if erro:
+            return jsonify({'error': erro[0]}), erro[1]
         
-        return jsonify({
-            'success': True,
-            'message': 'PNG exportado: {}'.format(png_filename),
-            'filename': png_filename,
-            'download_url': '/download-png/{}'.format(png_filename)
-        })
+        return jsonify(executar_exportacao_png(*pedido))
     
     except Exception as e:
         print("[ERROR] {}".format(str(e)))
@@ -552,11 +1034,103 @@ def exportar_png():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+# ==================== JOBS ASSÍNCRONOS ====================
+
+def resposta_job(job_id, status_code=200):
+    """Estado do job em JSON, com URLs de acompanhamento"""
+    job = JOBS.obter(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    job['posicao_fila'] = JOBS.posicao(job_id)
+    job['status_url'] = '/api/jobs/{}'.format(job_id)
+    job['eventos_url'] = '/api/jobs/{}/eventos'.format(job_id)
+    job['resultado_url'] = '/api/jobs/{}/resultado'.format(job_id)
+    return jsonify(job), status_code
+
+def submeter_job(tipo, funcao, *args):
+    """Enfileira o job; 202 com o id ou 429 quando o pool está saturado"""
+    try:
+        job_id = JOBS.submeter(tipo, funcao, *args)
+    except FilaCheia:
+        resposta = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'})
+        resposta.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+        return resposta, 429
+    
+    print("[JOB] {} queued: {}".format(tipo, job_id))
+    return resposta_job(job_id, 202)
+
+@app.route('/api/jobs/gerar-mapa', methods=['POST'])
+def job_gerar_mapa():
+    """Enfileira a geração de mapa e retorna o id do job"""
+    pedido, erro = preparar_pedido_mapa(request.json or {})
+    if erro:
+        return jsonify({'error': erro[0]}), erro[1]
+    return submeter_job('gerar-mapa', executar_geracao, *pedido)
+
+@app.route('/api/jobs/exportar-png', methods=['POST'])
+def job_exportar_png():
+    """Enfileira a exportação PNG e retorna o id do job"""
+    pedido, erro = preparar_pedido_png(request.json or {})
+    if erro:
+        return jsonify({'error': erro[0]}), erro[1]
+    return submeter_job('exportar-png', executar_exportacao_png, *pedido)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def status_job(job_id):
+    """Estado atual do job (para polling)"""
+    return resposta_job(job_id)
+
+@app.route('/api/jobs/<job_id>/eventos', methods=['GET'])
+def eventos_job(job_id):
+    """Stream (Server-Sent Events) com as mudanças de estado do job"""
+    job = JOBS.obter(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if not STREAMS_SSE.acquire(blocking=False):
+        resposta = jsonify({
+            'error': 'Muitos streams abertos, acompanhe pelo status_url',
+            'status_url': '/api/jobs/{}'.format(job_id),
+        })
+        resposta.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+        return resposta, 429
+    
+    def gerar():
+        atual = job
+        while True:
+            yield "data: {}\n\n".format(json.dumps(atual))
+            if atual['status'] in (CONCLUIDO, ERRO):
+                return
+            proximo = JOBS.aguardar_mudanca(job_id, atual['versao'])
+            if proximo is None:
+                return
+            if proximo['versao'] == atual['versao']:
+                yield ": keep-alive\n\n"
+            atual = proximo
+    
+    resposta = Response(gerar(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    # Libera a vaga quando o servidor fecha a resposta (fim do job ou cliente desconectado)
+    resposta.call_on_close(STREAMS_SSE.release)
+    return resposta
+
+@app.route('/api/jobs/<job_id>/resultado', methods=['GET'])
+def resultado_job(job_id):
+    """Redireciona para o artefato do job concluído (mapa ou PNG)"""
+    job = JOBS.obter(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == ERRO:
+        return jsonify({'error': job['erro']}), 500
+    if job['status'] != CONCLUIDO:
+        return resposta_job(job_id, 409)
+    
+    resultado = job['resultado']
+    return redirect(resultado.get('download_url') or resultado['url'])
+
 @app.route('/download-png/<filename>', methods=['GET'])
 def download_png(filename):
     """Baixa o PNG gerado"""
-    from flask import send_file
-    
     png_path = OUTPUT_DIR / filename
     
     if not png_path.exists():
@@ -569,13 +1143,38 @@ def download_png(filename):
         download_name=filename
     )
 
+@app.route('/<path:caminho>', methods=['GET'])
+def arquivo_estatico(caminho):
+    """Páginas, relatórios e camadas (raiz e geojson_layers/), pré-comprimidos quando possível"""
+    arquivo = (BASE_DIR / caminho).resolve()
+    if (arquivo.parent not in DIRETORIOS_ESTATICOS or arquivo.suffix not in MIMETYPES_ESTATICOS
+            or not arquivo.is_file()):
+        return "Not found", 404
+    
+    mimetype = MIMETYPES_ESTATICOS[arquivo.suffix]
+    resposta = servir_precomprimido(arquivo, mimetype)
+    if resposta is None:
+        resposta = send_file(str(arquivo), mimetype=mimetype, conditional=True)
+        resposta.headers['Vary'] = 'Accept-Encoding'
+    return resposta
+
 @app.route('/api/status', methods=['GET'])
 def status():
     """Status da aplicação"""
     return jsonify({
         'status': 'online',
         'output_dir': str(OUTPUT_DIR),
-        'total_mapas': len(list(OUTPUT_DIR.glob('*.png')))
+        'total_mapas': len(list(OUTPUT_DIR.glob('*.png'))),
+        'cache_mapas': MAPS_CACHE.estatisticas(),
+        'cache_camadas_processo': CAMADAS_PROCESSO.estatisticas(),
+        'coalescencia': {
+            'camadas': CARGAS_CAMADAS.estatisticas(),
+            'mapas': GERACOES_MAPAS.estatisticas()
+        },
+        'jobs': JOBS.estatisticas(),
+        'navegadores': POOL_NAVEGADORES.estatisticas(),
+        'tiles': GERADOR_TILES.estatisticas(),
+        'cache_compartilhado': CACHE_COMPARTILHADO.estatisticas() if CACHE_COMPARTILHADO else None
     })
 
 # ==================== MAIN ====================
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Armazém de camadas compiladas (GeoParquet)
+Guarda cada camada já reprojetada, filtrada, simplificada, quantizada e com
+colunas podadas, junto com a impressão digital do shapefile de origem
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import geopandas as gpd
+
+BASE_DIR = Path(__file__).resolve().parent
+STORE_DIR = Path(os.environ.get("LAYER_STORE_DIR", BASE_DIR / "camadas_compiladas"))
+
+# Arquivos que compõem um shapefile e influenciam o resultado
+SHAPEFILE_SIDECARS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+
+def caminho_camada(layer_id):
+    """Caminho do GeoParquet compilado da camada"""
+    return STORE_DIR / "{}.parquet".format(layer_id)
+
+
+def caminho_nivel(layer_id, zoom):
+    """Caminho do GeoParquet de um nível de detalhe da camada"""
+    return STORE_DIR / "{}.z{}.parquet".format(layer_id, zoom)
+
+
+def caminho_metadados(layer_id):
+    """Caminho do JSON com a origem e os parâmetros da compilação"""
+    return STORE_DIR / "{}.json".format(layer_id)
+
+
+def _arquivos_fonte(shapefile_path):
+    shapefile_path = Path(shapefile_path)
+    return [shapefile_path.with_suffix(ext) for ext in SHAPEFILE_SIDECARS
+            if shapefile_path.with_suffix(ext).exists()]
+
+
+def assinatura_fonte(shapefile_path):
+    """Tamanho e mtime de cada arquivo do shapefile (verificação barata)"""
+    return {
+        arquivo.name: [arquivo.stat().st_size, arquivo.stat().st_mtime_ns]
+        for arquivo in _arquivos_fonte(shapefile_path)
+    }
+
+
+def hash_fonte(shapefile_path):
+    """SHA-256 do conteúdo de todos os arquivos do shapefile"""
+    sha = hashlib.sha256()
+    for arquivo in _arquivos_fonte(shapefile_path):
+        sha.update(arquivo.name.encode('utf-8'))
+        with open(arquivo, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _ler_metadados(layer_id):
+    try:
+        with open(caminho_metadados(layer_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def camada_atualizada(layer_id, shapefile_path, parametros):
+    """Indica se a camada compilada pode ser usada no lugar do shapefile
+
+    A camada é descartada quando os parâmetros de processamento mudaram ou
+    quando o shapefile de origem mudou (tamanho/mtime e, se diferirem, hash).
+    Sem o shapefile local (ex.: container só com o armazém) vale o compilado.
+    """
+    if not caminho_camada(layer_id).exists():
+        return False
+
+    meta = _ler_metadados(layer_id)
+    if meta is None or meta.get('parametros') != parametros:
+        return False
+
+    if not Path(shapefile_path).exists():
+        return True
+
+    if meta.get('assinatura') == assinatura_fonte(shapefile_path):
+        return True
+
+    # mtime muda em checkouts/cópias; o conteúdo decide
+    return meta.get('hash') == hash_fonte(shapefile_path)
+
+
+def ler_camada(layer_id, shapefile_path, parametros):
+    """Lê a camada compilada ou retorna None se ausente/desatualizada"""
+    if not camada_atualizada(layer_id, shapefile_path, parametros):
+        return None
+
+    try:
+        return gpd.read_parquet(caminho_camada(layer_id))
+    except Exception as e:
+        print("[WARN] Failed to read compiled layer {}: {}".format(layer_id, e))
+        return None
+
+
+def ler_nivel(layer_id, zoom, shapefile_path, parametros):
+    """Lê um nível de detalhe compilado ou retorna None se ausente/desatualizado"""
+    if not caminho_nivel(layer_id, zoom).exists():
+        return None
+    if not camada_atualizada(layer_id, shapefile_path, parametros):
+        return None
+
+    try:
+        return gpd.read_parquet(caminho_nivel(layer_id, zoom))
+    except Exception as e:
+        print("[WARN] Failed to read compiled level {} z{}: {}".format(layer_id, zoom, e))
+        return None
+
+
+def _gravar_parquet(gdf, destino):
+    temporario = destino.with_suffix('.parquet.tmp')
+    gdf.to_parquet(temporario, index=False)
+    os.replace(temporario, destino)
+
+
+def gravar_camada(layer_id, gdf, shapefile_path, parametros, niveis=None):
+    """Grava a camada processada, seus níveis de detalhe ({zoom: gdf}) e os metadados"""
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Níveis antes da base: o metadado (gravado por último) só valida arquivos completos
+    for antigo in STORE_DIR.glob("{}.z*.parquet".format(layer_id)):
+        antigo.unlink()
+    for zoom, nivel in (niveis or {}).items():
+        _gravar_parquet(nivel, caminho_nivel(layer_id, zoom))
+
+    destino = caminho_camada(layer_id)
+    _gravar_parquet(gdf, destino)
+
+    meta = {
+        'layer_id': layer_id,
+        'fonte': Path(shapefile_path).name,
+        'parametros': parametros,
+        'assinatura': assinatura_fonte(shapefile_path),
+        'hash': hash_fonte(shapefile_path),
+        'features': len(gdf),
+        'niveis': {str(zoom): len(nivel) for zoom, nivel in (niveis or {}).items()},
+    }
+    caminho = caminho_metadados(layer_id)
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+    return destino
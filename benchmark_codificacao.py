@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da codificação compacta das camadas embutidas
+Compara o GeoJSON que o folium embute (folium.GeoJson) com o formato compacto
+de codificacao_compacta.py em cada geojson_layers/*.geojson e em um mapa
+completo do criar_mapa_customizado: tamanho bruto, tamanho gzip e tempo de
+parse no navegador (JSON.parse x JSON.parse + decodificarCamada, medido no
+Node.js quando disponível). O decodificado é conferido contra o original.
+
+Uso: python benchmark_codificacao.py [repeticoes]
+"""
+
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import folium
+import geopandas as gpd
+from jinja2.utils import htmlsafe_json_dumps
+
+import app_gerador_mapas_final as app
+from codificacao_compacta import DECODIFICADOR_JS, codificar_camada, serializar
+from quantizacao import reduzir_precisao
+
+GEOJSON_DIR = Path(__file__).resolve().parent / "geojson_layers"
+
+# Roda no Node: melhor tempo de parse de cada par e maior diferença de coordenada
+MEDIDOR_JS = DECODIFICADOR_JS + """
+const fs = require('fs');
+const [dir, nomes, repeticoes] = [process.argv[2], process.argv[3].split(','), Number(process.argv[4])];
+function melhor(f) {
+    let t = Infinity, r;
+    for (let i = 0; i < repeticoes; i++) {
+        const inicio = process.hrtime.bigint();
+        r = f();
+        t = Math.min(t, Number(process.hrtime.bigint() - inicio) / 1e6);
+    }
+    return [t, r];
+}
+function coordenadas(g, saida) {
+    if (!g) return saida;
+    if (g.type === 'GeometryCollection') { g.geometries.forEach(p => coordenadas(p, saida)); return saida; }
+    (function plano(c) { typeof c[0] === 'number' ? saida.push(c[0], c[1]) : c.forEach(plano); })(g.coordinates);
+    return saida;
+}
+const resultado = {};
+for (const nome of nomes) {
+    const original = fs.readFileSync(dir + '/' + nome + '.geojson', 'utf8');
+    const compacto = fs.readFileSync(dir + '/' + nome + '.compacto', 'utf8');
+    const [tOriginal, a] = melhor(() => JSON.parse(original));
+    const [tCompacto, b] = melhor(() => decodificarCamada(JSON.parse(compacto)));
+    let erro = 0, propriedades = a.features.length === b.features.length;
+    a.features.forEach((f, i) => {
+        const ca = coordenadas(f.geometry, []), cb = coordenadas(b.features[i].geometry, []);
+        if (ca.length !== cb.length) erro = Infinity;
+        ca.forEach((v, j) => { erro = Math.max(erro, Math.abs(v - cb[j])); });
+        for (const k in f.properties) {
+            if (f.properties[k] !== null && f.properties[k] !== b.features[i].properties[k]) propriedades = false;
+        }
+    });
+    resultado[nome] = [tOriginal, tCompacto, erro, propriedades];
+}
+console.log(JSON.stringify(resultado));
+"""
+
+
+def medir_parse(pares, repeticoes):
+    """{nome: [ms original, ms compacto, erro máximo, propriedades iguais]} pelo Node, ou None"""
+    node = shutil.which('node') or shutil.which('nodejs')
+    if node is None:
+        return None
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, (original, compacto) in pares.items():
+            Path(pasta, nome + '.geojson').write_text(original, encoding='utf-8')
+            Path(pasta, nome + '.compacto').write_text(compacto, encoding='utf-8')
+        script = Path(pasta, 'medidor.js')
+        script.write_text(MEDIDOR_JS, encoding='utf-8')
+        saida = subprocess.run([node, str(script), pasta, ','.join(pares), str(repeticoes)],
+                               capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout)
+
+
+def tamanhos(texto):
+    dados = texto.encode('utf-8')
+    return len(dados), len(gzip.compress(dados, 6))
+
+
+def gerar_mapa(compacto):
+    """HTML do criar_mapa_customizado com todas as camadas embutidas; retorna (html, segundos)"""
+    app.MAP_VECTOR_TILES = False
+    app.MAP_COMPACT_GEOJSON = compacto
+    inicio = time.perf_counter()
+    _, html = app.criar_mapa_customizado(list(app.LAYER_MAPPING), 'benchmark_codificacao')
+    return html, time.perf_counter() - inicio
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 96)
+    print("[BENCH] GeoJSON embutido (folium) x formato compacto")
+    print("=" * 96)
+
+    pares = {}
+    for arquivo in sorted(GEOJSON_DIR.glob('*.geojson')):
+        gdf = reduzir_precisao(gpd.read_file(arquivo).to_crs("EPSG:4326"), decimals=app.CASAS_DECIMAIS)
+        original = htmlsafe_json_dumps(folium.GeoJson(gdf).data)
+        compacto = serializar(codificar_camada(gdf, app.CASAS_DECIMAIS))
+        pares[arquivo.stem] = (original, compacto)
+
+    parse = medir_parse(pares, repeticoes)
+    if parse is None:
+        print("[WARN] Node.js não encontrado: tempos de parse omitidos")
+
+    print("{:<20} {:>11} {:>11} {:>7} {:>10} {:>10} {:>7} {:>9} {:>9} {:>7} {:>6}".format(
+        'camada', 'geojson KB', 'compact KB', 'razão', 'gz geo KB', 'gz cmp KB', 'razão',
+        'parse ms', 'cmp ms', 'ganho', 'igual'))
+
+    totais = [0, 0, 0, 0]
+    for nome, (original, compacto) in pares.items():
+        bruto_o, gz_o = tamanhos(original)
+        bruto_c, gz_c = tamanhos(compacto)
+        for i, valor in enumerate((bruto_o, bruto_c, gz_o, gz_c)):
+            totais[i] += valor
+
+        tempos = "{:>9} {:>9} {:>7} {:>6}".format('-', '-', '-', '-')
+        if parse is not None:
+            t_o, t_c, erro, propriedades = parse[nome]
+            iguais = erro is not None and erro < 1e-9 and propriedades
+            tempos = "{:>9.2f} {:>9.2f} {:>6.1f}x {:>6}".format(
+                t_o, t_c, t_o / t_c if t_c else float('inf'), 'sim' if iguais else 'NAO')
+
+        print("{:<20} {:>11.1f} {:>11.1f} {:>6.1f}x {:>10.1f} {:>10.1f} {:>6.1f}x {}".format(
+            nome, bruto_o / 1024, bruto_c / 1024, bruto_o / bruto_c,
+            gz_o / 1024, gz_c / 1024, gz_o / gz_c, tempos))
+
+    print("-" * 96)
+    print("[STAT] Total: {:.0f} KB -> {:.0f} KB ({:.1f}x) | gzip {:.0f} KB -> {:.0f} KB ({:.1f}x)".format(
+        totais[0] / 1024, totais[1] / 1024, totais[0] / totais[1],
+        totais[2] / 1024, totais[3] / 1024, totais[2] / totais[3]))
+
+    # Mapa completo (todas as camadas do LAYER_MAPPING disponíveis)
+    if not app.SHAPEFILE_DIR.exists():
+        print("[WARN] Shapefiles ausentes: mapa completo omitido")
+        return
+
+    html_o, t_o = gerar_mapa(compacto=False)
+    html_c, t_c = gerar_mapa(compacto=True)
+    bruto_o, gz_o = tamanhos(html_o)
+    bruto_c, gz_c = tamanhos(html_c)
+    print("=" * 96)
+    print("[STAT] criar_mapa_customizado (todas as camadas):")
+    print("       folium   {:>9.1f} KB | gzip {:>8.1f} KB | geração {:.2f} s".format(bruto_o / 1024, gz_o / 1024, t_o))
+    print("       compacto {:>9.1f} KB | gzip {:>8.1f} KB | geração {:.2f} s".format(bruto_c / 1024, gz_c / 1024, t_c))
+    print("       razão    {:>9.1f}x    | gzip {:>8.1f}x".format(bruto_o / bruto_c, gz_o / gz_c))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark da quantização de coordenadas
+Compara o closure antigo (round_geom via GeoSeries.apply) com a quantização
+vetorizada de quantizacao.py em todas as camadas do LAYER_MAPPING
+
+Uso: python benchmark_quantizacao.py [repeticoes] [decimals]
+"""
+
+import sys
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from shapely.geometry import Point, LineString, Polygon, MultiLineString, MultiPolygon
+
+from camadas_bc25 import LAYER_MAPPING, SHAPEFILE_DIR, simplificar_geometrias
+from quantizacao import reduzir_precisao
+
+
+def reduzir_precisao_legado(gdf, decimals=5):
+    """Implementação original (uma geometria por vez), mantida como referência"""
+    if gdf.empty:
+        return gdf
+
+    gdf = gdf.copy()
+
+    def round_geom(geom):
+        if geom.is_empty:
+            return geom
+
+        geom_type = geom.geom_type
+
+        if geom_type == 'Polygon':
+            exterior = np.round(np.array(geom.exterior.coords), decimals)
+            interiors = []
+            for interior in geom.interiors:
+                interiors.append(np.round(np.array(interior.coords), decimals))
+            return Polygon(exterior, interiors)
+
+        elif geom_type == 'MultiPolygon':
+            polygons = []
+            for poly in geom.geoms:
+                exterior = np.round(np.array(poly.exterior.coords), decimals)
+                interiors = []
+                for interior in poly.interiors:
+                    interiors.append(np.round(np.array(interior.coords), decimals))
+                polygons.append(Polygon(exterior, interiors))
+            return MultiPolygon(polygons)
+
+        elif geom_type == 'LineString':
+            coords = np.round(np.array(geom.coords), decimals)
+            return LineString(coords)
+
+        elif geom_type == 'MultiLineString':
+            lines = []
+            for line in geom.geoms:
+                lines.append(np.round(np.array(line.coords), decimals))
+            return MultiLineString(lines)
+
+        elif geom_type == 'Point':
+            coords = np.round(np.array(geom.coords), decimals)
+            return Point(coords[0])
+
+        else:
+            return geom
+
+    gdf['geometry'] = gdf['geometry'].apply(round_geom)
+    return gdf
+
+
+def cronometrar(func, gdf, decimals, repeticoes):
+    """Retorna (melhor tempo em segundos, resultado da última execução)"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(gdf, decimals)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    decimals = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("=" * 78)
+    print("[BENCH] Quantização de coordenadas - legado x vetorizado")
+    print("=" * 78)
+    print("{:<20} {:>9} {:>10} {:>12} {:>12} {:>8} {:>6}".format(
+        'camada', 'features', 'vertices', 'legado (s)', 'vetor. (s)', 'ganho', 'igual'))
+
+    total_legado = total_vetorizado = 0.0
+
+    for layer_id, (shapefile, _, _, _, filtro) in LAYER_MAPPING.items():
+        shapefile_path = SHAPEFILE_DIR / shapefile
+        if not shapefile_path.exists():
+            print("{:<20} [WARN] arquivo não encontrado: {}".format(layer_id, shapefile))
+            continue
+
+        gdf = gpd.read_file(str(shapefile_path)).to_crs("EPSG:4326")
+        if filtro and 'jurisdicao' in gdf.columns:
+            gdf = gdf[gdf['jurisdicao'] == filtro]
+        if gdf.empty:
+            continue
+        gdf = simplificar_geometrias(gdf, tolerance=0.0005)
+
+        t_legado, r_legado = cronometrar(reduzir_precisao_legado, gdf, decimals, repeticoes)
+        t_vetor, r_vetor = cronometrar(reduzir_precisao, gdf, decimals, repeticoes)
+
+        # O legado não arredonda MultiPoint/GeometryCollection; compara só os tipos que ele trata
+        tratados = ~r_legado.geometry.geom_type.isin(['MultiPoint', 'GeometryCollection']).values
+        iguais = shapely.equals_exact(
+            r_legado.geometry.values[tratados], r_vetor.geometry.values[tratados], tolerance=0
+        ).all()
+
+        total_legado += t_legado
+        total_vetorizado += t_vetor
+        print("{:<20} {:>9} {:>10} {:>12.4f} {:>12.4f} {:>7.1f}x {:>6}".format(
+            layer_id,
+            len(gdf),
+            len(shapely.get_coordinates(gdf.geometry.values)),
+            t_legado,
+            t_vetor,
+            t_legado / t_vetor if t_vetor else float('inf'),
+            'sim' if iguais else 'NAO',
+        ))
+
+    print("-" * 78)
+    if total_vetorizado:
+        print("[STAT] Total: legado {:.3f} s | vetorizado {:.3f} s | ganho {:.1f}x".format(
+            total_legado, total_vetorizado, total_legado / total_vetorizado))
+
+
+if __name__ == '__main__':
+    main()
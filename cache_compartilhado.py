@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Cache compartilhado entre processos (workers do gunicorn)
+Guarda camadas pré-processadas (Feather/Arrow) e mapas HTML gerados em
+arquivos de um diretório local, com um índice SQLite (LRU por bytes).
+Os workers leem os arquivos por memory-map, então uma única carga serve
+todo o pool e o conteúdo fica no page cache do SO, não no RSS de cada worker.
+Usar um diretório em /dev/shm mantém tudo em memória compartilhada.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import geopandas as gpd
+
+
+class CacheCompartilhado:
+    """Armazém chave -> arquivo com índice LRU compartilhado entre processos"""
+
+    def __init__(self, diretorio, limite_bytes=1024 * 1024 * 1024):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.limite_bytes = limite_bytes
+        self._local = threading.local()
+
+        # Conexão só para criar a tabela, fechada em seguida: criado no import (antes
+        # do fork do gunicorn --preload), o objeto não pode deixar conexão aberta
+        con = self._conectar()
+        try:
+            with con:
+                con.execute(
+                    "CREATE TABLE IF NOT EXISTS entradas ("
+                    " chave TEXT PRIMARY KEY, arquivo TEXT NOT NULL, tamanho INTEGER NOT NULL,"
+                    " criado REAL NOT NULL, acesso REAL NOT NULL)"
+                )
+        finally:
+            con.close()
+
+    def _conectar(self):
+        con = sqlite3.connect(str(self.diretorio / "indice.sqlite3"), timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def _conexao(self):
+        # sqlite3 não compartilha conexões entre threads nem entre processos: uma por
+        # (processo, thread), aberta no primeiro uso. Após um fork a conexão herdada
+        # é abandonada (fechá-la no filho também não é seguro)
+        pid, con = getattr(self._local, 'conexao', (None, None))
+        if pid != os.getpid():
+            con = self._conectar()
+            self._local.conexao = (os.getpid(), con)
+        return con
+
+    def _arquivo(self, chave, sufixo):
+        nome = hashlib.sha1(chave.encode('utf-8')).hexdigest()
+        return self.diretorio / "{}{}".format(nome, sufixo)
+
+    def caminho(self, chave, validade=None):
+        """Caminho do arquivo da chave (ou None se ausente/expirado); marca o acesso"""
+        with self._conexao() as con:
+            linha = con.execute(
+                "SELECT arquivo, criado FROM entradas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+
+            arquivo, criado = linha
+            caminho = self.diretorio / arquivo
+            if (validade is not None and time.time() - criado >= validade) or not caminho.exists():
+                self._remover(con, chave, arquivo)
+                return None
+
+            con.execute("UPDATE entradas SET acesso = ? WHERE chave = ?", (time.time(), chave))
+            return caminho
+
+    def gravar(self, chave, escrever, sufixo=''):
+        """Grava a chave chamando escrever(caminho_temporario) e registra no índice"""
+        destino = self._arquivo(chave, sufixo)
+        temporario = destino.with_name("{}.{}.{}.tmp".format(destino.name, os.getpid(), threading.get_ident()))
+        escrever(temporario)
+        os.replace(temporario, destino)
+
+        agora = time.time()
+        with self._conexao() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO entradas (chave, arquivo, tamanho, criado, acesso)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (chave, destino.name, destino.stat().st_size, agora, agora),
+            )
+            self._despejar(con)
+        return destino
+
+    def remover(self, chave):
+        with self._conexao() as con:
+            linha = con.execute("SELECT arquivo FROM entradas WHERE chave = ?", (chave,)).fetchone()
+            if linha is not None:
+                self._remover(con, chave, linha[0])
+
+    def _remover(self, con, chave, arquivo):
+        con.execute("DELETE FROM entradas WHERE chave = ?", (chave,))
+        try:
+            # Leitores com o arquivo mapeado continuam válidos após o unlink
+            (self.diretorio / arquivo).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _despejar(self, con):
+        """Remove as entradas menos usadas até caber no limite de bytes"""
+        total = con.execute("SELECT COALESCE(SUM(tamanho), 0) FROM entradas").fetchone()[0]
+        if total <= self.limite_bytes:
+            return
+
+        for chave, arquivo, tamanho in con.execute(
+            "SELECT chave, arquivo, tamanho FROM entradas ORDER BY acesso"
+        ).fetchall():
+            if total <= self.limite_bytes:
+                break
+            self._remover(con, chave, arquivo)
+            total -= tamanho
+
+    # ---------- bytes (mapas HTML) ----------
+
+    def ler_bytes(self, chave, validade=None):
+        caminho = self.caminho(chave, validade)
+        if caminho is None:
+            return None
+        try:
+            return caminho.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def gravar_bytes(self, chave, dados, sufixo=''):
+        return self.gravar(chave, lambda caminho: caminho.write_bytes(dados), sufixo)
+
+    # ---------- GeoDataFrames (camadas) ----------
+
+    def ler_camada(self, chave, validade=None):
+        caminho = self.caminho(chave, validade)
+        if caminho is None:
+            return None
+        try:
+            return gpd.read_feather(caminho, memory_map=True)
+        except (FileNotFoundError, OSError):
+            return None
+
+    def gravar_camada(self, chave, gdf):
+        return self.gravar(chave, lambda caminho: gdf.to_feather(caminho), '.arrow')
+
+    def estatisticas(self):
+        with self._conexao() as con:
+            entradas, total = con.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas"
+            ).fetchone()
+        return {
+            'diretorio': str(self.diretorio),
+            'entradas': entradas,
+            'bytes': total,
+            'limite_bytes': self.limite_bytes,
+        }
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU em memória com limite de bytes e validade (TTL)
+Usado para os mapas HTML gerados, que podem ter dezenas de MB cada
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Dicionário LRU limitado pelo tamanho total dos valores em bytes"""
+
+    def __init__(self, limite_bytes, ttl=None, tamanho=None):
+        self.limite_bytes = limite_bytes
+        self.ttl = ttl
+        if tamanho is not None:
+            self._tamanho = tamanho  # valor -> bytes (ex.: GeoDataFrame, que o getsizeof subestima)
+        self._dados = OrderedDict()  # chave -> (valor, tamanho, criado)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejeitados = 0
+
+    @staticmethod
+    def _tamanho(valor):
+        return sys.getsizeof(valor)
+
+    def _remover(self, chave):
+        _, tamanho, _ = self._dados.pop(chave)
+        self._bytes -= tamanho
+
+    def get(self, chave, default=None):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.misses += 1
+                return default
+
+            valor, _, criado = item
+            if self.ttl and time.time() - criado >= self.ttl:
+                self._remover(chave)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def __setitem__(self, chave, valor):
+        tamanho = self._tamanho(valor)
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+
+            # Um item maior que o limite inteiro não entra (quem chamou tem o arquivo)
+            if tamanho > self.limite_bytes:
+                self.rejeitados += 1
+                return
+
+            self._dados[chave] = (valor, tamanho, time.time())
+            self._bytes += tamanho
+
+            while self._bytes > self.limite_bytes:
+                self._remover(next(iter(self._dados)))
+                self.evictions += 1
+
+    def __contains__(self, chave):
+        with self._lock:
+            return chave in self._dados
+
+    def __len__(self):
+        return len(self._dados)
+
+    def pop(self, chave, default=None):
+        with self._lock:
+            if chave not in self._dados:
+                return default
+            valor = self._dados[chave][0]
+            self._remover(chave)
+            return valor
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._dados),
+                'bytes': self._bytes,
+                'limite_bytes': self.limite_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejeitados': self.rejeitados,
+            }
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Camadas do gerador de mapas: mapeamento para os shapefiles BC25 e pré-processamento
+Compartilhado pelo app Flask e pelo compilar_camadas.py (build da imagem), sem
+importar o app: nada aqui abre pools, caches ou navegadores no import.
+"""
+
+import os
+import zipfile
+import urllib.request
+from pathlib import Path
+
+import geopandas as gpd
+
+import armazem_camadas
+from niveis_detalhe import nivel_para_zoom, simplificar_nivel, tolerancia_zoom, zooms_com_ganho
+from quantizacao import reduzir_precisao
+from topologia import Topologia
+
+BASE_DIR = Path(__file__).resolve().parent
+SHAPEFILE_DIR = BASE_DIR / "bc25_sc_shapefile_2020-10-01"
+
+# URL para download dos shapefiles (configurar após upload)
+SHAPEFILE_URL = os.environ.get("SHAPEFILE_URL", "")
+
+# Mapeamento de camadas para shapefiles (cores e pesos do mapa original)
+LAYER_MAPPING = {
+    'rodovias-federais': ('rod_via_deslocamento_l.shp', '#d73027', 2.2, 0.9, 'Federal'),
+    'rodovias-estaduais': ('rod_via_deslocamento_l.shp', '#4575b4', 2.0, 0.85, 'Estadual/Distrital'),
+    'ferrovias': ('fer_trecho_ferroviario_l.shp', '#7b3294', 2.3, 0.9, None),
+    'pontes': ('tra_ponte_l.shp', '#8073ac', 2, 0.9, None),
+    'tuneis': ('tra_tunel_l.shp', '#e08214', 2.2, 0.9, None),
+    'viadutos': ('tra_passagem_elevada_viaduto_l.shp', '#f781bf', 2.2, 0.9, None),
+    'hidrovias': ('hdv_trecho_hidroviario_l.shp', '#2c7fb8', 3.2, 0.85, None),
+    'dutos': ('dut_trecho_duto_l.shp', '#a6611a', 2.6, 0.9, None),
+    'terminais': ('hdv_atracadouro_terminal_p.shp', 'red', 5, 0.85, None),
+    'helipontos': ('aer_pista_ponto_pouso_p.shp', '#f46d43', 5, 0.85, None),
+    'construcoes-aero': ('edf_edif_constr_aeroportuaria_p.shp', '#3288bd', 5, 0.75, None),
+    'limite-uf': ('lml_unidade_federacao_a.shp', '#000000', 2.5, 1.0, None),
+    'municipios': ('lml_municipio_a.shp', '#2ca25f', 1.1, 0.18, None)
+}
+
+# Parâmetros do pré-processamento das camadas
+TOLERANCIA_SIMPLIFICACAO = 0.0005
+CASAS_DECIMAIS = 5
+ESSENTIAL_COLS = ['nome', 'geocodigo', 'tipotrecho', 'bitola', 'categoria', 'tipo', 'jurisdicao', 'revestimen', 'operaciona']
+
+# Camadas de divisas simplificadas em conjunto (arcos compartilhados): as
+# divisas entre municípios e o contorno estadual coincidem em qualquer nível
+CAMADAS_TOPOLOGIA = ('municipios', 'limite-uf')
+
+# Níveis de detalhe por zoom (linhas e polígonos): só os zooms em que a
+# tolerância da resolução no solo é maior que a da camada base
+ZOOMS_LOD = zooms_com_ganho(TOLERANCIA_SIMPLIFICACAO)
+
+# ==================== DOWNLOAD SHAPEFILES ====================
+
+def baixar_shapefiles():
+    """Baixa e extrai shapefiles se não existirem"""
+    if SHAPEFILE_DIR.exists() and any(SHAPEFILE_DIR.iterdir()):
+        print("[OK] Shapefiles já existem localmente")
+        return True
+
+    if not SHAPEFILE_URL:
+        print("[WARN] SHAPEFILE_URL não configurada")
+        return False
+
+    print(f"[DOWNLOAD] Baixando shapefiles de {SHAPEFILE_URL}...")
+    zip_path = BASE_DIR / "shapefiles_temp.zip"
+
+    try:
+        # Download
+        urllib.request.urlretrieve(SHAPEFILE_URL, zip_path)
+        print(f"[OK] Download concluído: {zip_path.stat().st_size / (1024*1024):.1f} MB")
+
+        # Extrair
+        print("[EXTRACT] Extraindo arquivos...")
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            zip_ref.extractall(BASE_DIR)
+
+        # Remover zip temporário
+        zip_path.unlink()
+
+        print(f"[OK] Shapefiles extraídos em {SHAPEFILE_DIR}")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Falha ao baixar shapefiles: {e}")
+        if zip_path.exists():
+            zip_path.unlink()
+        return False
+
+# ==================== PRÉ-PROCESSAMENTO ====================
+
+def simplificar_geometrias(gdf, tolerance=0.0005):
+    """Simplifica geometrias para melhor performance"""
+    if gdf.empty or gdf.geometry.iloc[0].geom_type in ['Point', 'MultiPoint']:
+        return gdf
+
+    gdf = gdf.copy()
+    gdf['geometry'] = gdf['geometry'].simplify(tolerance, preserve_topology=True)
+    return gdf
+
+def parametros_camada(layer_id):
+    """Parâmetros do pré-processamento (gravados junto da camada compilada)"""
+    shapefile, _, _, _, filtro = LAYER_MAPPING[layer_id]
+    return {
+        'shapefile': shapefile,
+        'filtro': filtro,
+        'crs': 'EPSG:4326',
+        'tolerancia': TOLERANCIA_SIMPLIFICACAO,
+        'decimais': CASAS_DECIMAIS,
+        'colunas': ESSENTIAL_COLS,
+        'niveis': list(niveis_camada(layer_id)),
+        'topologia': list(CAMADAS_TOPOLOGIA) if layer_id in CAMADAS_TOPOLOGIA else None,
+    }
+
+def tipo_camada(layer_id):
+    """'ponto', 'linha' ou 'area' pelo sufixo do shapefile BC25 (_p, _l, _a)"""
+    sufixo = LAYER_MAPPING[layer_id][0].rsplit('.', 1)[0][-2:]
+    return {'_p': 'ponto', '_a': 'area'}.get(sufixo, 'linha')
+
+def niveis_camada(layer_id):
+    """Zooms com nível de detalhe próprio (pontos não são simplificados)"""
+    return () if tipo_camada(layer_id) == 'ponto' else ZOOMS_LOD
+
+def nivel_camada(layer_id, zoom):
+    """Nível de detalhe usado no zoom (None = camada base)"""
+    return nivel_para_zoom(niveis_camada(layer_id), zoom)
+
+def camada_processada(layer_id):
+    """Camada base do armazém compilado ou, se desatualizada, do shapefile (None se não houver)"""
+    shapefile_path = SHAPEFILE_DIR / LAYER_MAPPING[layer_id][0]
+    gdf = armazem_camadas.ler_camada(layer_id, shapefile_path, parametros_camada(layer_id))
+    if gdf is None and shapefile_path.exists():
+        gdf = preparar_camada(layer_id)
+    return gdf
+
+def topologia_divisas(layer_id, gdf, carregar=camada_processada):
+    """Topologia da camada de divisas junto com a(s) parceira(s) de CAMADAS_TOPOLOGIA
+
+    carregar(layer_id) obtém a parceira já pré-processada (no app, o carregar_camada com cache).
+    """
+    camadas = [gdf]
+    for parceira in CAMADAS_TOPOLOGIA:
+        if parceira != layer_id:
+            outra = carregar(parceira)
+            if outra is not None and not outra.empty:
+                camadas.append(outra)
+    return Topologia(camadas)
+
+def preparar_niveis(layer_id, gdf, carregar=camada_processada):
+    """Pirâmide {zoom: gdf} da camada já pré-processada"""
+    if layer_id in CAMADAS_TOPOLOGIA and niveis_camada(layer_id):
+        topologia = topologia_divisas(layer_id, gdf, carregar)
+        return {zoom: topologia.simplificar(tolerancia_zoom(zoom))[0] for zoom in niveis_camada(layer_id)}
+    return {zoom: simplificar_nivel(gdf, zoom) for zoom in niveis_camada(layer_id)}
+
+def ler_shapefile(layer_id):
+    """Shapefile bruto da camada, reprojetado e com o filtro de jurisdição"""
+    shapefile, _, _, _, filtro = LAYER_MAPPING[layer_id]
+    gdf = gpd.read_file(str(SHAPEFILE_DIR / shapefile)).to_crs("EPSG:4326")
+
+    # Aplicar filtro de jurisdicao se necessario (rodovias)
+    if filtro and 'jurisdicao' in gdf.columns:
+        gdf = gdf[gdf['jurisdicao'] == filtro]
+
+    return gdf
+
+def simplificar_divisas(layer_id, gdf):
+    """Simplifica municípios e limite estadual sobre os mesmos arcos (sem frestas entre vizinhos)"""
+    camadas = [gdf]
+    for parceira in CAMADAS_TOPOLOGIA:
+        if parceira != layer_id and (SHAPEFILE_DIR / LAYER_MAPPING[parceira][0]).exists():
+            camadas.append(ler_shapefile(parceira))
+    return Topologia(camadas).simplificar(TOLERANCIA_SIMPLIFICACAO)[0]
+
+def preparar_camada(layer_id):
+    """Lê o shapefile bruto e aplica reprojeção, filtro, simplificação, precisão e poda de colunas"""
+    gdf = ler_shapefile(layer_id)
+
+    # Simplificar geometrias
+    if layer_id in CAMADAS_TOPOLOGIA and not gdf.empty:
+        gdf = simplificar_divisas(layer_id, gdf)
+    elif not gdf.empty and gdf.geometry.iloc[0].geom_type not in ['Point', 'MultiPoint']:
+        gdf = simplificar_geometrias(gdf, tolerance=TOLERANCIA_SIMPLIFICACAO)
+
+    # Reduzir precisão
+    gdf = reduzir_precisao(gdf, decimals=CASAS_DECIMAIS)
+
+    # Manter apenas colunas essenciais
+    existing_cols = [col for col in ESSENTIAL_COLS if col in gdf.columns]
+    if existing_cols:
+        gdf = gdf[existing_cols + ['geometry']]
+    else:
+        gdf = gdf[['geometry']]
+
+    return gdf
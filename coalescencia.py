@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescência de requisições concorrentes (single-flight)
+Quando várias threads pedem o mesmo trabalho ao mesmo tempo, só a primeira
+executa; as demais esperam e recebem o mesmo resultado (ou a mesma exceção)
+"""
+
+import threading
+
+
+class _Chamada:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class SingleFlight:
+    """Executa no máximo uma chamada por chave ao mesmo tempo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self.execucoes = 0
+        self.compartilhadas = 0
+
+    def executar(self, chave, funcao, *args, **kwargs):
+        """Retorna (resultado, compartilhado); compartilhado=True se veio de outra thread"""
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._em_andamento[chave] = chamada
+            else:
+                self.compartilhadas += 1
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado, True
+
+        try:
+            chamada.resultado = funcao(*args, **kwargs)
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+                self.execucoes += 1
+            chamada.evento.set()
+
+        return chamada.resultado, False
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'em_andamento': len(self._em_andamento),
+                'execucoes': self.execucoes,
+                'compartilhadas': self.compartilhadas,
+            }
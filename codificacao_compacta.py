@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Codificação compacta de camadas GeoJSON embutidas nos mapas
+As coordenadas viram inteiros na grade de `decimais` casas (a mesma do
+reduzir_precisao, então não há perda), codificados em delta ao longo de toda
+a camada, com um cabeçalho de transformação. As propriedades vão por coluna:
+cada chave aparece uma vez e textos repetidos viram índices de um dicionário.
+O navegador reconstrói o GeoJSON com decodificarCamada (DECODIFICADOR_JS);
+propriedades nulas são omitidas.
+
+Formato: {"t": [escala, translado_x, translado_y], "y": [tipos], "k": [chaves],
+          "d": [dicionário ou null por chave], "p": [valores por chave],
+          "g": [[tipo, coordenadas] ou null por feição]}
+"""
+
+import json
+
+import folium
+import numpy as np
+import shapely
+from branca.element import Element
+from jinja2 import Template
+
+# Sequências planas [dx0, dy0, dx1, dy1, ...]; aninhamento igual ao do GeoJSON
+_PROFUNDIDADE = {
+    'Point': 0, 'MultiPoint': 0, 'LineString': 0,
+    'MultiLineString': 1, 'Polygon': 1, 'MultiPolygon': 2,
+}
+
+DECODIFICADOR_JS = """
+function decodificarCamada(c) {
+    var s = c.t[0], tx = c.t[1], ty = c.t[2], x = 0, y = 0;
+    function seq(d) {
+        var pts = [];
+        for (var i = 0; i < d.length; i += 2) {
+            x += d[i]; y += d[i + 1];
+            pts.push([tx + x * s, ty + y * s]);
+        }
+        return pts;
+    }
+    function nivel(d, n) { return n ? d.map(function(p) { return nivel(p, n - 1); }) : seq(d); }
+    function geometria(g) {
+        if (g === null) return null;
+        var tipo = c.y[g[0]];
+        if (tipo === 'GeometryCollection') return {type: tipo, geometries: g[1].map(geometria)};
+        var coords = nivel(g[1], {MultiLineString: 1, Polygon: 1, MultiPolygon: 2}[tipo] || 0);
+        return {type: tipo, coordinates: tipo === 'Point' ? coords[0] : coords};
+    }
+    return {type: 'FeatureCollection', features: c.g.map(function(g, i) {
+        var props = {};
+        c.k.forEach(function(k, j) {
+            var v = c.p[j][i];
+            if (v !== null) props[k] = c.d[j] ? c.d[j][v] : v;
+        });
+        return {type: 'Feature', properties: props, geometry: geometria(g)};
+    })};
+}
+"""
+
+
+def _colunas(gdf):
+    """Chaves, dicionários e valores por coluna (textos repetidos viram índices)"""
+    chaves, dicionarios, valores = [], [], []
+    for coluna in gdf.columns:
+        if coluna == gdf.geometry.name:
+            continue
+        lista = json.loads(gdf[coluna].to_json(orient='values'))
+        if all(v is None for v in lista):
+            continue
+
+        dicionario = None
+        textos = [v for v in lista if v is not None]
+        distintos = list(dict.fromkeys(textos))
+        if all(isinstance(v, str) for v in textos) and 2 * len(distintos) <= len(textos):
+            dicionario = distintos
+            indice = {v: i for i, v in enumerate(distintos)}
+            lista = [None if v is None else indice[v] for v in lista]
+
+        chaves.append(str(coluna))
+        dicionarios.append(dicionario)
+        valores.append(lista)
+    return chaves, dicionarios, valores
+
+
+def codificar_camada(gdf, decimais=5):
+    """Documento compacto (dict) da camada em EPSG:4326 já quantizada em `decimais` casas"""
+    escala = 10.0 ** -decimais
+    geometrias = np.asarray(gdf.geometry.values, dtype=object)
+    coords = shapely.get_coordinates(geometrias)
+
+    translado = np.floor(coords.min(axis=0) / escala) * escala if len(coords) else np.zeros(2)
+    inteiros = np.rint((coords - translado) / escala).astype(np.int64)
+    # Delta contínuo pela camada inteira: a primeira posição de cada anel é relativa ao anterior
+    deltas = np.diff(inteiros, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel().tolist()
+
+    tipos = []
+    posicao = 0
+
+    def sequencia(geom):
+        nonlocal posicao
+        n = 2 * int(shapely.get_num_coordinates(geom))
+        trecho = deltas[posicao:posicao + n]
+        posicao += n
+        return trecho
+
+    def partes(geom, profundidade):
+        if profundidade == 0:
+            return sequencia(geom)
+        if geom.geom_type == 'Polygon':
+            return [sequencia(anel) for anel in (geom.exterior, *geom.interiors)]
+        return [partes(parte, profundidade - 1) for parte in geom.geoms]
+
+    def codificar(geom):
+        if geom is None or geom.is_empty:
+            # Vazias não têm coordenadas em get_coordinates (não consomem deltas)
+            return None
+        tipo = geom.geom_type
+        if tipo not in tipos:
+            tipos.append(tipo)
+        if tipo == 'GeometryCollection':
+            return [tipos.index(tipo), [codificar(parte) for parte in geom.geoms]]
+        return [tipos.index(tipo), partes(geom, _PROFUNDIDADE[tipo])]
+
+    g = [codificar(geom) for geom in geometrias]
+    chaves, dicionarios, valores = _colunas(gdf)
+
+    return {
+        't': [escala, round(float(translado[0]), decimais), round(float(translado[1]), decimais)],
+        'y': tipos,
+        'k': chaves,
+        'd': dicionarios,
+        'p': valores,
+        'g': g,
+    }
+
+
+def serializar(documento):
+    """JSON sem espaços, seguro para embutir em <script>"""
+    texto = json.dumps(documento, ensure_ascii=False, separators=(',', ':'))
+    return texto.replace('</', '<\\/')
+
+
+class GeoJsonCompacto(folium.map.Layer):
+    """Camada GeoJSON embutida no formato compacto, com estilo fixo
+
+    Pontos viram CircleMarker com o campo `tooltip` como dica. O decodificador
+    é incluído uma única vez por página.
+    """
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.geoJson(decodificarCamada({{ this.dados }}), {
+            style: function() { return {{ this.estilo|tojson }}; },
+            pointToLayer: function(feature, latlng) {
+                var marcador = L.circleMarker(latlng, {{ this.estilo|tojson }});
+                {%- if this.tooltip %}
+                var dica = feature.properties[{{ this.tooltip|tojson }}];
+                marcador.bindTooltip(String(dica === undefined ? {{ this.layer_name|tojson }} : dica));
+                {%- endif %}
+                return marcador;
+            }
+        });
+        {% endmacro %}
+    """)
+
+    def __init__(self, gdf, estilo, name=None, show=True, tooltip=None, decimais=5):
+        super().__init__(name=name, overlay=True, control=True, show=show)
+        self._name = 'GeoJsonCompacto'
+        self.dados = serializar(codificar_camada(gdf, decimais))
+        self.estilo = estilo
+        self.tooltip = tooltip
+
+    def render(self, **kwargs):
+        # Mesmo nome em todas as camadas: o Figure guarda um único decodificador
+        self.get_root().script.add_child(Element(DECODIFICADOR_JS), name='decodificar_camada')
+        super().render(**kwargs)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Compila as camadas do LAYER_MAPPING para o armazém GeoParquet
+Executa offline (build da imagem/deploy) todo o pré-processamento que o
+carregar_camada faria no primeiro acesso: reprojeção, filtro de jurisdição,
+simplificação, quantização e poda de colunas, mais os níveis de detalhe por
+zoom das camadas de linhas e polígonos
+
+Importa só camadas_bc25 (não o app Flask): roda no build da imagem sem
+abrir os pools de jobs e navegadores nem o cache compartilhado.
+
+Uso: python compilar_camadas.py [--forcar] [camada ...]
+"""
+
+import sys
+import time
+
+import armazem_camadas
+from camadas_bc25 import (
+    LAYER_MAPPING, SHAPEFILE_DIR, baixar_shapefiles, parametros_camada, preparar_camada, preparar_niveis,
+)
+
+
+def compilar(layer_ids, forcar=False):
+    """Compila as camadas indicadas; retorna o número de falhas"""
+    falhas = 0
+
+    for layer_id in layer_ids:
+        if layer_id not in LAYER_MAPPING:
+            print("[WARN] Unknown layer: {}".format(layer_id))
+            falhas += 1
+            continue
+
+        shapefile_path = SHAPEFILE_DIR / LAYER_MAPPING[layer_id][0]
+        parametros = parametros_camada(layer_id)
+
+        if not shapefile_path.exists():
+            if armazem_camadas.caminho_camada(layer_id).exists():
+                print("[SKIP] {}: shapefile ausente, mantendo versão compilada".format(layer_id))
+            else:
+                print("[WARN] {}: file not found: {}".format(layer_id, shapefile_path))
+                falhas += 1
+            continue
+
+        if not forcar and armazem_camadas.camada_atualizada(layer_id, shapefile_path, parametros):
+            print("[SKIP] {}: already up to date".format(layer_id))
+            continue
+
+        try:
+            inicio = time.perf_counter()
+            gdf = preparar_camada(layer_id)
+            niveis = preparar_niveis(layer_id, gdf)
+            destino = armazem_camadas.gravar_camada(layer_id, gdf, shapefile_path, parametros, niveis)
+            print("[OK] {}: {} features -> {} ({:.1f} KB, {} níveis, {:.2f} s)".format(
+                layer_id, len(gdf), destino.name,
+                destino.stat().st_size / 1024, len(niveis), time.perf_counter() - inicio))
+        except Exception as e:
+            print("[ERROR] Failed to compile {}: {}".format(layer_id, e))
+            falhas += 1
+
+    return falhas
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    forcar = '--forcar' in args
+    layer_ids = [a for a in args if not a.startswith('--')] or list(LAYER_MAPPING)
+
+    print("=" * 60)
+    print("[BUILD] Compilando camadas em {}".format(armazem_camadas.STORE_DIR))
+    print("=" * 60)
+
+    baixar_shapefiles()
+    falhas = compilar(layer_ids, forcar=forcar)
+    print("[STAT] {} camada(s), {} falha(s)".format(len(layer_ids), falhas))
+    sys.exit(1 if falhas and SHAPEFILE_DIR.exists() else 0)
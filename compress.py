@@ -1,113 +1,231 @@
 """
 Compressor Prático de Mapas HTML
-Remove dados desnecessários e minifica o HTML
+Minifica o HTML (minificador_html: scripts, estilos e atributos preservados,
+GeoJSON embutido compactado) e grava as variantes .gz, .br e .zst numa única
+leitura em fluxo (só o maior <script> fica inteiro na memória), um processo
+por arquivo, pulando os arquivos cujo conteúdo não mudou desde a última execução.
+
+Uso: python compress.py [--forcar] [--processos N] [padrão ...]
 """
 
-import re
+import codecs
 import gzip
 import json
 import os
+import sys
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
 from pathlib import Path
 
-def minify_html(html_content):
-    """Minifica HTML removendo espaços e comentários"""
-    # Remove comentários HTML
-    html_content = re.sub(r'<!--.*?-->', '', html_content, flags=re.DOTALL)
-    
-    # Remove espaços múltiplos (mantém 1)
-    html_content = re.sub(r'\s+', ' ', html_content)
-    
-    # Remove espaços antes de >
-    html_content = re.sub(r'\s+>', '>', html_content)
-    
-    # Remove espaços depois de <
-    html_content = re.sub(r'<\s+', '<', html_content)
-    
-    return html_content
-
-def remove_redundant_data(html_content):
-    """Remove dados redundantes do HTML"""
-    # Remove atributos de estilo inline redundantes
-    html_content = re.sub(r'\s+style="[^"]*"', '', html_content)
-    
-    # Remove data attributes desnecessários
-    html_content = re.sub(r'\s+data-[^=]*="[^"]*"', '', html_content)
-    
-    return html_content
-
-def compress_html_file(input_file, output_file=None):
+import brotli
+import zstandard
+
+from minificador_html import MinificadorHTML
+
+# Entradas padrão (padrões glob, relativos ao diretório do script)
+ENTRADAS_PADRAO = (
+    "mapa_infraestrutura_bc25_sc.html",
+    "relatorio_infraestrutura.html",
+    "chart*_*.html",
+)
+
+NIVEL_GZIP = 9
+QUALIDADE_BROTLI = 9   # 11 custa ~30x mais tempo no mapa de 136 MB
+NIVEL_ZSTD = 19        # usa todos os núcleos (threads=-1) no arquivo grande
+CASAS_COORDENADAS = 6  # coordenadas do GeoJSON embutido (~0,1 m)
+TAMANHO_PEDACO = 4 * 1024 * 1024  # bytes lidos por vez
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Tamanho, mtime e sha256 de cada entrada já comprimida
+MANIFESTO = BASE_DIR / ".compress_manifest.json"
+CONFIGURACAO = [NIVEL_GZIP, QUALIDADE_BROTLI, NIVEL_ZSTD, CASAS_COORDENADAS, 2]  # último: versão do minificador
+
+
+def minificar_fluxo(pedacos):
+    """Minifica o HTML pedaço a pedaço"""
+    minificador = MinificadorHTML(CASAS_COORDENADAS)
+    for pedaco in pedacos:
+        texto = minificador.alimentar(pedaco)
+        if texto:
+            yield texto
+    yield minificador.finalizar()
+
+def ler_pedacos(caminho, hash_conteudo, tamanho=TAMANHO_PEDACO):
+    """Texto do arquivo em pedaços; os bytes lidos alimentam hash_conteudo na mesma leitura"""
+    decodificador = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho), b''):
+            hash_conteudo.update(bloco)
+            yield decodificador.decode(bloco)
+    yield decodificador.decode(b'', final=True)
+
+def sha256_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def saidas(entrada):
+    """Arquivos gerados para a entrada: .min.html e suas variantes .gz, .br e .zst"""
+    entrada = Path(entrada)
+    minificado = entrada.with_name(entrada.stem + '.min.html')
+    return [minificado] + [minificado.with_name(minificado.name + s) for s in ('.gz', '.br', '.zst')]
+
+def compress_html_file(input_file):
     """
-    Comprime arquivo HTML
+    Minifica o HTML e grava .min.html, .gz, .br e .zst numa única leitura
+    Retorna os tamanhos (bytes) e tempos (s) de cada etapa.
     """
-    if not os.path.exists(input_file):
-        print(f"❌ Arquivo não encontrado: {input_file}")
+    destinos = saidas(input_file)
+    estado = os.stat(input_file)
+    hash_conteudo = hashlib.sha256()
+    temporarios = [d.with_name('{}.{}.tmp'.format(d.name, os.getpid())) for d in destinos]
+    tempos = {'ler+minificar': 0.0, 'gzip': 0.0, 'brotli': 0.0, 'zstd': 0.0}
+    inicio = time.perf_counter()
+
+    f_min, f_gz, f_br, f_zst = [open(t, 'wb') for t in temporarios]
+    try:
+        gz = gzip.GzipFile(fileobj=f_gz, mode='wb', compresslevel=NIVEL_GZIP, mtime=0)
+        br = brotli.Compressor(quality=QUALIDADE_BROTLI)
+        zst = zstandard.ZstdCompressor(level=NIVEL_ZSTD, threads=-1).stream_writer(f_zst, closefd=False)
+
+        marca = time.perf_counter()
+        for texto in minificar_fluxo(ler_pedacos(input_file, hash_conteudo)):
+            dados = texto.encode('utf-8')
+            f_min.write(dados)
+            agora = time.perf_counter()
+            tempos['ler+minificar'] += agora - marca
+
+            marca = agora
+            gz.write(dados)
+            agora = time.perf_counter()
+            tempos['gzip'] += agora - marca
+
+            marca = agora
+            f_br.write(br.process(dados))
+            agora = time.perf_counter()
+            tempos['brotli'] += agora - marca
+
+            marca = agora
+            zst.write(dados)
+            agora = time.perf_counter()
+            tempos['zstd'] += agora - marca
+            marca = agora
+
+        gz.close()
+        f_br.write(br.finish())
+        marca = time.perf_counter()
+        zst.close()  # com threads, boa parte da compressão termina aqui
+        tempos['zstd'] += time.perf_counter() - marca
+    finally:
+        for f in (f_min, f_gz, f_br, f_zst):
+            f.close()
+
+    for temporario, destino in zip(temporarios, destinos):
+        os.replace(temporario, destino)
+
+    return {
+        'arquivo': str(input_file),
+        'tamanhos': [estado.st_size] + [os.path.getsize(d) for d in destinos],
+        'tempos': tempos,
+        'total': time.perf_counter() - inicio,
+        'registro': {
+            'tamanho': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns,
+            'sha256': hash_conteudo.hexdigest(),
+            'configuracao': CONFIGURACAO,
+        },
+    }
+
+def descobrir_entradas(padroes):
+    """Arquivos .html que casam com os padrões (sem as saídas .min.html)"""
+    entradas = []
+    for padrao in padroes:
+        caminhos = sorted(glob(padrao if os.path.isabs(padrao) else str(BASE_DIR / padrao)))
+        if not caminhos:
+            print(f"⚠️  Nenhum arquivo para: {padrao}")
+        for caminho in caminhos:
+            if not caminho.endswith('.min.html') and caminho not in entradas:
+                entradas.append(caminho)
+    return entradas
+
+def chave_manifesto(caminho):
+    return os.path.relpath(caminho, BASE_DIR)
+
+def ler_manifesto():
+    try:
+        return json.loads(MANIFESTO.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def inalterado(caminho, registro):
+    """True se o conteúdo e a configuração são os da última compressão e as saídas existem"""
+    if not registro or registro.get('configuracao') != CONFIGURACAO:
+        return False
+    if not all(d.exists() for d in saidas(caminho)):
+        return False
+    estado = os.stat(caminho)
+    if registro.get('tamanho') != estado.st_size:
+        return False
+    if registro.get('mtime_ns') == estado.st_mtime_ns:
+        return True
+    # mtime mudou (checkout, cópia): confere o conteúdo
+    if registro.get('sha256') != sha256_arquivo(caminho):
         return False
-    
-    if output_file is None:
-        output_file = input_file.replace('.html', '.min.html')
-    
-    # Obter tamanho original
-    original_size = os.path.getsize(input_file) / (1024 * 1024)
-    print(f"\n📦 Comprimindo: {input_file}")
-    print(f"   Tamanho original: {original_size:.2f} MB")
-    
-    # Ler arquivo
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    print("   🔧 Minificando HTML...")
-    content = minify_html(content)
-    
-    print("   🔧 Removendo dados redundantes...")
-    content = remove_redundant_data(content)
-    
-    # Salvar versão minificada
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    minified_size = os.path.getsize(output_file) / (1024 * 1024)
-    minify_ratio = (1 - minified_size / original_size) * 100
-    
-    print(f"   ✅ Minificado: {minified_size:.2f} MB ({minify_ratio:.1f}% redução)")
-    
-    # Comprimir com gzip
-    gzip_file = output_file + '.gz'
-    print(f"   🔧 Aplicando Gzip...")
-    
-    with open(output_file, 'rb') as f_in:
-        with gzip.open(gzip_file, 'wb', compresslevel=9) as f_out:
-            f_out.write(f_in.read())
-    
-    gzip_size = os.path.getsize(gzip_file) / (1024 * 1024)
-    gzip_ratio = (1 - gzip_size / original_size) * 100
-    
-    print(f"   ✅ Gzip comprimido: {gzip_size:.2f} MB ({gzip_ratio:.1f}% redução)")
-    
-    print(f"\n📊 RESULTADOS:")
-    print(f"   Original:        {original_size:.2f} MB")
-    print(f"   Minificado:      {minified_size:.2f} MB ({minify_ratio:.1f}%)")
-    print(f"   Gzip:            {gzip_size:.2f} MB ({gzip_ratio:.1f}%)")
-    print(f"\n✅ Arquivos gerados:")
-    print(f"   {output_file}")
-    print(f"   {gzip_file}")
-    
+    registro['mtime_ns'] = estado.st_mtime_ns
     return True
 
+def imprimir_tabela(resultados):
+    mb = 1024 * 1024
+    print(f"\n{'arquivo':<36} {'orig MB':>8} {'min MB':>8} {'gz MB':>14} {'br MB':>14} {'zst MB':>14} {'tempo':>7}")
+    for r in resultados:
+        original, minificado, gz, br, zst = r['tamanhos']
+        colunas = ['{:>6.2f} ({:>4.1f}x)'.format(t / mb, original / t if t else 0) for t in (gz, br, zst)]
+        print(f"{Path(r['arquivo']).name[:36]:<36} {original / mb:>8.2f} {minificado / mb:>8.2f} "
+              f"{colunas[0]} {colunas[1]} {colunas[2]} {r['total']:>6.1f}s")
+        print("   " + " | ".join(f"{etapa} {t:.2f}s" for etapa, t in r['tempos'].items()))
+
 if __name__ == "__main__":
+    args = sys.argv[1:]
+    forcar = '--forcar' in args
+    processos = os.cpu_count() or 1
+    if '--processos' in args:
+        processos = int(args[args.index('--processos') + 1])
+        del args[args.index('--processos'):args.index('--processos') + 2]
+    padroes = [a for a in args if not a.startswith('--')] or list(ENTRADAS_PADRAO)
+
     print("=" * 70)
     print("🗜️  COMPRESSOR DE MAPAS HTML")
     print("=" * 70)
-    
-    # Comprimir o mapa principal
-    compress_html_file("mapa_infraestrutura_bc25_sc.html")
-    
-    # Comprimir os relatórios
-    compress_html_file("relatorio_infraestrutura.html")
-    
-    # Comprimir os gráficos
-    for chart in range(1, 6):
-        compress_html_file(f"chart{chart}_*.html" if chart == 1 else f"chart{chart}_*.html")
-    
+
+    manifesto = ler_manifesto()
+    pendentes = []
+    for entrada in descobrir_entradas(padroes):
+        if not forcar and inalterado(entrada, manifesto.get(chave_manifesto(entrada))):
+            print(f"⏭️  Inalterado: {Path(entrada).name}")
+        else:
+            pendentes.append(entrada)
+
+    if pendentes:
+        print(f"\n📦 Comprimindo {len(pendentes)} arquivo(s) em até {processos} processo(s)...")
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(processos, len(pendentes))) as executor:
+            resultados = list(executor.map(compress_html_file, pendentes))
+
+        for resultado in resultados:
+            manifesto[chave_manifesto(resultado['arquivo'])] = resultado['registro']
+
+        imprimir_tabela(resultados)
+        print(f"\n✅ {len(resultados)} arquivo(s) em {time.perf_counter() - inicio:.1f}s")
+
+    temporario = MANIFESTO.with_name(MANIFESTO.name + '.tmp')
+    temporario.write_text(json.dumps(manifesto, indent=1, sort_keys=True), encoding='utf-8')
+    os.replace(temporario, MANIFESTO)
+
     print("\n" + "=" * 70)
     print("✨ PRÓXIMOS PASSOS")
     print("=" * 70)
@@ -115,7 +233,7 @@ if __name__ == "__main__":
 1. Verifique os arquivos .min.html gerados
 2. Teste-os no navegador
 3. Se tudo funcionar, suba para GitHub:
-   
+
    git add *.min.html*
    git commit -m "Add: Versões comprimidas dos mapas e relatórios"
    git push origin main
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Acesso aos shapefiles BC25 compartilhado pelos scripts de mapa e relatório
+Cada script declara as camadas de que precisa (arquivo, colunas, filtro de
+atributos e CRS) e carregar_camadas lê todas em paralelo: o pyogrio lê pelo
+caminho rápido Arrow, aplica o filtro (WHERE do OGR SQL) e lê só as colunas
+pedidas, em vez de carregar o shapefile inteiro para filtrar no pandas.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import geopandas as gpd
+
+BASE_DIR = Path(__file__).resolve().parent
+SHAPEFILE_DIR = Path(os.environ.get("BC25_DIR", str(BASE_DIR / "bc25_sc_shapefile_2020-10-01")))
+
+# Leituras simultâneas: o GDAL libera o GIL durante a leitura
+MAX_LEITURAS = 8
+
+# CRS métrico para comprimentos e áreas: Albers equivalente (áreas exatas) no
+# SIRGAS 2000, com paralelos-padrão que cortam SC (-25,9° a -29,4°), onde a
+# escala linear erra menos de 0,03%. No Web Mercator (EPSG:3857) o erro em SC
+# é de 11-15% nos comprimentos e 24-32% nas áreas.
+CRS_SC = "+proj=aea +lat_0=-27.6 +lon_0=-51 +lat_1=-26.5 +lat_2=-28.8 +x_0=0 +y_0=0 +ellps=GRS80 +units=m +no_defs"
+
+
+def camada(arquivo, colunas=None, filtro=None, crs="EPSG:4326"):
+    """Declaração de uma camada a carregar
+
+    colunas: lista de campos a ler (None = todos); campos ausentes no arquivo são ignorados
+    filtro: cláusula WHERE do OGR SQL, ex. "jurisdicao IN ('Federal', 'Estadual/Distrital')";
+            os campos do filtro precisam estar em colunas (o OGR não lê os demais)
+    crs: CRS de saída (None mantém o do arquivo)
+    """
+    return {'arquivo': arquivo, 'colunas': colunas, 'filtro': filtro, 'crs': crs}
+
+
+CAMPOS_TERMINAL = ["nome", "tipoatraca", "administra", "operaciona", "aptidaoope", "situacaofi"]
+CAMPOS_OBRA_ARTE = ["nome", "modaluso", "operaciona", "situacaofi"]
+
+# Camadas BC25 usadas pelo mapa e pelo relatório, com os campos que algum deles
+# exibe. Declarações iguais têm a mesma chave no cache (etapas_bc25): cada
+# shapefile é lido uma vez para todos os scripts.
+CAMADAS = {
+    "uf": camada("lml_unidade_federacao_a.shp", ["nome", "sigla"]),
+    "municipios": camada("lml_municipio_a.shp", ["nome", "geocodigo"]),
+    "roads": camada("rod_via_deslocamento_l.shp", ["jurisdicao", "revestimen", "operaciona"],
+                    filtro="jurisdicao IN ('Federal', 'Estadual/Distrital')"),
+    "ferrovias": camada("fer_trecho_ferroviario_l.shp", ["nome", "tipotrecho", "bitola", "eletrifica"]),
+    "helipontos": camada("aer_pista_ponto_pouso_p.shp", ["nome", "tipopista", "usopista", "operaciona"],
+                         filtro="tipopista ILIKE '%Heliponto%'"),
+    # Construções aeroportuárias (terminais, hangares, etc.)
+    "construcoes_aero": camada("edf_edif_constr_aeroportuaria_p.shp", ["nome", "municipio", "operaciona", "situacaofi"]),
+    "terminais": camada("hdv_atracadouro_terminal_p.shp", CAMPOS_TERMINAL),
+    # Portos em áreas (maiores)
+    "terminais_area": camada("hdv_atracadouro_terminal_a.shp", CAMPOS_TERMINAL),
+    # Portos em linhas (cais, molhes)
+    "terminais_linha": camada("hdv_atracadouro_terminal_l.shp", CAMPOS_TERMINAL),
+    # Infra adicional para escoamento
+    "dutos": camada("dut_trecho_duto_l.shp", ["nome", "mattransp", "setor", "operaciona", "tipotrecho"]),
+    "hidrovias": camada("hdv_trecho_hidroviario_l.shp", ["operaciona", "situacaofi", "regime", "caladomaxs"]),
+    "pontes": camada("tra_ponte_l.shp", CAMPOS_OBRA_ARTE),
+    "tuneis": camada("tra_tunel_l.shp", CAMPOS_OBRA_ARTE),
+    "viadutos": camada("tra_passagem_elevada_viaduto_l.shp", CAMPOS_OBRA_ARTE),
+}
+
+
+def ler_camada(declaracao, diretorio=None):
+    """Lê uma camada declarada: filtro e colunas aplicados pelo leitor, já reprojetada"""
+    caminho = Path(diretorio or SHAPEFILE_DIR) / declaracao['arquivo']
+    opcoes = {}
+    if declaracao['colunas'] is not None:
+        opcoes['columns'] = list(declaracao['colunas'])
+    if declaracao['filtro']:
+        opcoes['where'] = declaracao['filtro']
+
+    gdf = gpd.read_file(caminho, engine="pyogrio", use_arrow=True, **opcoes)
+    if declaracao['crs'] is not None:
+        gdf = gdf.to_crs(declaracao['crs'])
+    return gdf
+
+
+def carregar_camadas(declaracoes, diretorio=None, max_leituras=MAX_LEITURAS):
+    """{nome: camada(...)} -> {nome: GeoDataFrame}, lidas em paralelo
+
+    A ordem do dicionário de saída é a da declaração. Erros de leitura
+    (arquivo ausente, filtro inválido) são propagados com o nome da camada.
+    """
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_leituras, len(declaracoes)))) as executor:
+        futuros = {nome: executor.submit(ler_camada, d, diretorio) for nome, d in declaracoes.items()}
+        resultado = {}
+        for nome, futuro in futuros.items():
+            try:
+                resultado[nome] = futuro.result()
+            except Exception as e:
+                raise RuntimeError("Falha ao ler a camada '{}' ({}): {}".format(
+                    nome, declaracoes[nome]['arquivo'], e)) from e
+
+    print("   ⏱️ {} camada(s) lida(s) em {:.2f}s".format(len(resultado), time.perf_counter() - inicio))
+    return resultado
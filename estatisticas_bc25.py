@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Estatísticas das camadas BC25 citadas no relatório
+Contagens, quilometragens e porte dos municípios calculados numa única
+passada vetorizada sobre as geometrias de todas as camadas, e guardados em
+JSON com a chave do conteúdo das camadas (hashes do cache de etapas_bc25):
+com os dados inalterados, as estatísticas vêm do JSON sem carregar nenhuma
+camada.
+"""
+
+import json
+import os
+
+import numpy as np
+import shapely
+
+from dados_bc25 import CAMADAS
+from etapas_bc25 import Pipeline, projetada, sha256_json
+
+VERSAO = 2  # mude ao alterar o cálculo: invalida os JSON já gravados
+
+# Medidas em km no CRS métrico de SC; as demais camadas só são contadas
+LINEARES = ["roads", "ferrovias", "hidrovias", "dutos"]
+CONTADAS = ["uf", "helipontos", "construcoes_aero", "terminais", "terminais_area", "terminais_linha",
+            "pontes", "tuneis", "viadutos"]
+PORTES = ["Pequeno", "Médio", "Grande"]
+
+
+def cadeias():
+    """Cadeias do cache usadas nas estatísticas (as lineares e os municípios já projetados)"""
+    return {
+        **{nome: CAMADAS[nome] for nome in LINEARES + CONTADAS + ["municipios"]},
+        **{nome + "_sc": projetada(nome) for nome in LINEARES + ["municipios"]},
+    }
+
+
+NOMES = [nome + "_sc" for nome in LINEARES + ["municipios"]] + CONTADAS
+
+
+def calcular(camadas):
+    """Estatísticas a partir de {nome: GeoDataFrame} (nomes de NOMES)"""
+    roads = camadas["roads_sc"]
+    grupos = {
+        "rodovias_federais": roads[roads["jurisdicao"] == "Federal"],
+        "rodovias_estaduais": roads[roads["jurisdicao"] == "Estadual/Distrital"],
+        **{nome: camadas[nome + "_sc"] for nome in LINEARES[1:]},
+        **{nome: camadas[nome] for nome in CONTADAS},
+        "municipios": camadas["municipios_sc"],
+    }
+    medidos = ["rodovias_federais", "rodovias_estaduais"] + LINEARES[1:]
+
+    # Uma passada: todas as geometrias num só vetor, somadas por grupo
+    nomes = list(grupos)
+    geometrias = np.concatenate([np.asarray(g.geometry.values, dtype=object) for g in grupos.values()])
+    codigos = np.repeat(np.arange(len(nomes)), [len(g) for g in grupos.values()])
+    contagens = np.bincount(codigos, minlength=len(nomes))
+    medido = np.isin(codigos, [nomes.index(n) for n in medidos])
+    # Geometria nula (válida no shapefile) tem comprimento NaN: conta, mas não soma km
+    comprimentos = np.bincount(codigos, weights=np.where(medido, np.nan_to_num(shapely.length(geometrias)), 0),
+                               minlength=len(nomes))
+
+    # Porte dos municípios por tercis de área (<= q1 pequeno, <= q2 médio); área nula
+    # fica fora dos tercis e, como NaN, vai para o fim (grande)
+    areas = shapely.area(np.asarray(grupos["municipios"].geometry.values, dtype=object)) / 1e6
+    tercis = np.nanquantile(areas, [0.33, 0.66]) if np.isfinite(areas).any() else np.zeros(2)
+    porte = np.bincount(np.searchsorted(tercis, areas, side='left'), minlength=3)
+
+    n = {nome: int(c) for nome, c in zip(nomes, contagens)}
+    km = {nome: float(comprimentos[nomes.index(nome)]) / 1000 for nome in medidos}
+    return {
+        "camadas": len(CAMADAS),
+        "contagens": n,
+        "km": km,
+        "porte": {p: int(c) for p, c in zip(PORTES, porte)},
+        "porte_pct": {p: (100.0 * int(c) / len(areas) if len(areas) else 0.0) for p, c in zip(PORTES, porte)},
+        "area_km2": float(np.nansum(areas)),
+        "totais": {
+            "elementos": sum(n.values()),
+            "rodovias": n["rodovias_federais"] + n["rodovias_estaduais"],
+            "aereo": n["helipontos"] + n["construcoes_aero"],
+            "maritimo": n["terminais"] + n["terminais_area"] + n["terminais_linha"],
+            "obras_arte": n["pontes"] + n["tuneis"] + n["viadutos"],
+            "km_rodovias": km["rodovias_federais"] + km["rodovias_estaduais"],
+            "km": sum(km.values()),
+        },
+    }
+
+
+def obter(forcar=False, diretorio=None, cache_dir=None):
+    """Estatísticas do JSON em cache ou, se as camadas mudaram, recalculadas e gravadas"""
+    pipeline = Pipeline(cadeias(), diretorio, cache_dir)
+    chave = sha256_json('estatisticas', VERSAO, pipeline.hashes(NOMES))
+    arquivo = pipeline.cache_dir / "estatisticas_{}.json".format(chave[:32])
+
+    if not forcar:
+        try:
+            estatisticas = json.loads(arquivo.read_text(encoding='utf-8'))
+            print("   ♻️ Estatísticas do cache ({})".format(arquivo.name))
+            return estatisticas
+        except (FileNotFoundError, ValueError):
+            pass
+
+    estatisticas = calcular(pipeline.executar(NOMES))
+    estatisticas["chave"] = chave
+    temporario = arquivo.with_name("{}.{}.tmp".format(arquivo.name, os.getpid()))
+    temporario.write_text(json.dumps(estatisticas, indent=1, ensure_ascii=False), encoding='utf-8')
+    os.replace(temporario, arquivo)
+    return estatisticas
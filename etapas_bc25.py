@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Pré-processamento das camadas BC25 com resultados intermediários em cache
+Cada camada é uma cadeia declarada: a leitura (camada(...) de dados_bc25) ou
+o resultado de outra cadeia, seguida de etapas (função, parâmetros). Cada nó
+é gravado em GeoParquet com o nome do sha256 do seu conteúdo; a chave de um
+nó é o hash da etapa (código-fonte e parâmetros) e do conteúdo da entrada.
+Numa nova execução só são recalculados os nós cuja entrada, parâmetros ou
+código mudaram, e se um nó recalculado sair igual ao anterior, os seguintes
+continuam vindo do cache.
+"""
+
+import hashlib
+import inspect
+import io
+import json
+import os
+import time
+from pathlib import Path
+
+import geopandas as gpd
+
+from dados_bc25 import CRS_SC, SHAPEFILE_DIR, carregar_camadas
+
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.environ.get("BC25_CACHE_DIR", str(BASE_DIR / ".cache_bc25")))
+
+
+def sha256_json(*partes):
+    h = hashlib.sha256()
+    h.update(json.dumps(partes, sort_keys=True, default=str).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _nomes_usados(codigo):
+    """Nomes globais lidos pelo código, incluindo funções internas e lambdas"""
+    nomes = set(codigo.co_names)
+    for constante in codigo.co_consts:
+        if inspect.iscode(constante):
+            nomes |= _nomes_usados(constante)
+    return nomes
+
+
+def _do_projeto(objeto):
+    """True para funções definidas nos módulos deste repositório (não em bibliotecas)"""
+    try:
+        return Path(inspect.getsourcefile(objeto)).resolve().parent == BASE_DIR
+    except (TypeError, OSError):
+        return False
+
+
+def _codigo(funcao, vistos=None):
+    """Identifica a etapa pelo nome e pelo código-fonte, seu e das funções e constantes
+    do projeto que ela usa: editar a função, um auxiliar (ex.: quantizar_geometrias) ou
+    uma constante de módulo invalida o cache dela
+    """
+    vistos = set() if vistos is None else vistos
+    vistos.add(funcao)
+    try:
+        fonte = inspect.getsource(funcao)
+    except (OSError, TypeError):
+        fonte = ''
+
+    dependencias = []
+    codigo = getattr(funcao, '__code__', None)
+    for nome in sorted(_nomes_usados(codigo)) if codigo is not None else []:
+        valor = funcao.__globals__.get(nome)
+        if inspect.isfunction(valor) and valor not in vistos and _do_projeto(valor):
+            dependencias.append(_codigo(valor, vistos))
+        elif isinstance(valor, (bool, int, float, str, tuple, frozenset)):
+            dependencias.append([nome, repr(valor)])
+    return "{}.{}".format(funcao.__module__, funcao.__qualname__), fonte, dependencias
+
+
+def projetar(gdf, crs):
+    return gdf.to_crs(crs)
+
+
+def projetada(origem, crs=CRS_SC):
+    """Cadeia com a camada `origem` reprojetada (por padrão no CRS métrico de SC)
+
+    Projetada uma vez e guardada no cache, serve ao mapa e ao relatório.
+    """
+    return [origem, (projetar, {"crs": crs})]
+
+
+class Pipeline:
+    """Executa as cadeias de {nome: [origem, (função, {parâmetros}), ...]}
+
+    origem: camada(...) (leitura do shapefile) ou o nome de outra cadeia;
+            uma camada(...) sozinha é uma cadeia só de leitura
+    função: função de módulo gdf -> gdf, chamada como função(gdf, **parâmetros)
+    """
+
+    def __init__(self, cadeias, diretorio=None, cache_dir=None):
+        self.cadeias = {nome: c if isinstance(c, list) else [c] for nome, c in cadeias.items()}
+        self.diretorio = Path(diretorio or SHAPEFILE_DIR)
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.manifesto_caminho = self.cache_dir / "manifesto.json"
+        self._saidas = {}   # nó -> sha256 do conteúdo
+        self._dados = {}    # nó -> GeoDataFrame já na memória
+        self._lidas = {}    # nó de origem -> GeoDataFrame lido do shapefile
+        self.manifesto = None
+        self.reaproveitados = 0
+        self.calculados = 0
+
+    # ---------- manifesto ----------
+
+    def _ler_manifesto(self):
+        try:
+            manifesto = json.loads(self.manifesto_caminho.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            manifesto = {}
+        manifesto.setdefault('fontes', {})
+        manifesto.setdefault('nos', {})
+        return manifesto
+
+    def _gravar_manifesto(self):
+        temporario = self.manifesto_caminho.with_name("manifesto.json.{}.tmp".format(os.getpid()))
+        temporario.write_text(json.dumps(self.manifesto, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(temporario, self.manifesto_caminho)
+
+    def _impressao_digital(self, arquivo):
+        """sha256 dos arquivos do shapefile (.shp, .dbf, .prj...), refeito só se tamanho/mtime mudarem"""
+        caminho = self.diretorio / arquivo
+        componentes = sorted(caminho.parent.glob(caminho.stem + '.*'))
+        if not componentes:
+            raise FileNotFoundError("Shapefile não encontrado: {}".format(caminho))
+        estado = [[c.name, c.stat().st_size, c.stat().st_mtime_ns] for c in componentes]
+        registro = self.manifesto['fontes'].get(str(caminho))
+        if registro and registro['estado'] == estado:
+            return registro['sha256']
+
+        h = hashlib.sha256()
+        for componente in componentes:
+            h.update(componente.name.encode('utf-8'))
+            with open(componente, 'rb') as f:
+                for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(bloco)
+        self.manifesto['fontes'][str(caminho)] = {'estado': estado, 'sha256': h.hexdigest()}
+        return h.hexdigest()
+
+    # ---------- grafo ----------
+
+    def _anterior(self, no):
+        """Nó de entrada da etapa `no` (None para a leitura)"""
+        nome, i = no
+        if i == 0:
+            return None
+        if i == 1 and isinstance(self.cadeias[nome][0], str):
+            origem = self.cadeias[nome][0]
+            return (origem, len(self.cadeias[origem]) - 1)
+        return (nome, i - 1)
+
+    def _chave(self, no):
+        nome, i = no
+        passo = self.cadeias[nome][i]
+        if i == 0:
+            return sha256_json('leitura', passo, self._impressao_digital(passo['arquivo']))
+        funcao, parametros = passo
+        return sha256_json('etapa', _codigo(funcao), parametros, self._saida(self._anterior(no)))
+
+    def _artefato(self, sha):
+        return self.cache_dir / "{}.parquet".format(sha)
+
+    def _saida(self, no):
+        """sha256 do conteúdo do nó; calcula (e grava) se não estiver no cache"""
+        if no in self._saidas:
+            return self._saidas[no]
+
+        chave = self._chave(no)
+        sha = self.manifesto['nos'].get(chave)
+        if sha and self._artefato(sha).exists():
+            self.reaproveitados += 1
+        else:
+            gdf = self._calcular(no)
+            buffer = io.BytesIO()
+            gdf.to_parquet(buffer)
+            conteudo = buffer.getvalue()
+            sha = hashlib.sha256(conteudo).hexdigest()
+            artefato = self._artefato(sha)
+            if not artefato.exists():
+                temporario = artefato.with_name("{}.{}.tmp".format(artefato.name, os.getpid()))
+                temporario.write_bytes(conteudo)
+                os.replace(temporario, artefato)
+            self.manifesto['nos'][chave] = sha
+            self._dados[no] = gdf
+            self.calculados += 1
+
+        self._saidas[no] = sha
+        return sha
+
+    def _calcular(self, no):
+        nome, i = no
+        if i == 0:
+            return self._lidas.pop(no)
+        funcao, parametros = self.cadeias[nome][i]
+        return funcao(self.dados(self._anterior(no)), **parametros)
+
+    def dados(self, no):
+        if no not in self._dados:
+            sha = self._saida(no)
+            if no not in self._dados:
+                self._dados[no] = gpd.read_parquet(self._artefato(sha))
+        return self._dados[no]
+
+    # ---------- execução ----------
+
+    def _preparar(self):
+        """Lê o manifesto e faz de uma vez, em paralelo, as leituras que não estão no cache"""
+        if self.manifesto is not None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.manifesto = self._ler_manifesto()
+
+        pendentes = {}
+        for nome, cadeia in self.cadeias.items():
+            if isinstance(cadeia[0], str):
+                continue
+            sha = self.manifesto['nos'].get(self._chave((nome, 0)))
+            if not (sha and self._artefato(sha).exists()):
+                pendentes[nome] = cadeia[0]
+        if pendentes:
+            for nome, gdf in carregar_camadas(pendentes, self.diretorio).items():
+                self._lidas[(nome, 0)] = gdf
+
+    def _final(self, nome):
+        return (nome, len(self.cadeias[nome]) - 1)
+
+    def hashes(self, nomes=None):
+        """{nome: sha256 do conteúdo} das cadeias; as que estão no cache não são carregadas"""
+        self._preparar()
+        try:
+            return {nome: self._saida(self._final(nome)) for nome in (nomes or self.cadeias)}
+        finally:
+            self._gravar_manifesto()
+
+    def executar(self, nomes=None):
+        """{nome: GeoDataFrame} com o resultado final de cada cadeia pedida"""
+        inicio = time.perf_counter()
+        self._preparar()
+        try:
+            resultado = {nome: self.dados(self._final(nome)) for nome in (nomes or self.cadeias)}
+        finally:
+            self._gravar_manifesto()
+
+        print("   ♻️ {} etapa(s) do cache | ⚙️ {} calculada(s) em {:.2f}s".format(
+            self.reaproveitados, self.calculados, time.perf_counter() - inicio))
+        return resultado
+
+
+def executar(cadeias, nomes=None, diretorio=None, cache_dir=None):
+    """Atalho: Pipeline(cadeias).executar(nomes); nomes=None devolve todas as cadeias"""
+    return Pipeline(cadeias, diretorio, cache_dir).executar(nomes)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Exporta a pirâmide de tiles vetoriais das camadas BC25 em um único arquivo
+PMTiles (ou MBTiles) para hospedagem estática (GitHub Pages)
+O visualizador (visualizador_tiles.html) lê o PMTiles com HTTP Range, então
+só os tiles visíveis são baixados e nenhum arquivo passa do limite de 100 MB
+do GitHub como acontece com o HTML monolítico.
+
+Uso: python exportar_tiles.py [--zoom 5-12] [--saida infra_sc.pmtiles] [camada ...]
+     (extensão .mbtiles gera MBTiles)
+"""
+
+import gzip
+import json
+import math
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from pmtiles.tile import Compression, TileType, zxy_to_tileid
+from pmtiles.writer import Writer
+
+from app_gerador_mapas_final import (
+    ESSENTIAL_COLS, GERADOR_TILES, LAYER_MAPPING, carregar_camada, estilo_camada, tipo_camada,
+)
+
+ZOOM_PADRAO = (5, 12)
+SAIDA_PADRAO = 'infra_sc.pmtiles'
+ATRIBUICAO = 'IBGE BC25 2020 | Ronan A. Caetano'
+
+
+def tiles_da_area(bbox, z):
+    """(x, y) dos tiles do zoom z que cobrem a bbox (lon_min, lat_min, lon_max, lat_max)"""
+    n = 2 ** z
+
+    def coluna(lon):
+        return min(n - 1, max(0, int((lon + 180.0) / 360.0 * n)))
+
+    def linha(lat):
+        rad = math.radians(max(-85.05112878, min(85.05112878, lat)))
+        return min(n - 1, max(0, int((1 - math.asinh(math.tan(rad)) / math.pi) / 2 * n)))
+
+    for x in range(coluna(bbox[0]), coluna(bbox[2]) + 1):
+        for y in range(linha(bbox[3]), linha(bbox[1]) + 1):
+            yield x, y
+
+
+def gerar_piramide(layer_ids, zoom_min, zoom_max):
+    """Gera (z, x, y, bytes gzip) dos tiles não vazios; cada tile traz todas as camadas"""
+    bboxes = [carregar_camada(layer_id).total_bounds for layer_id in layer_ids]
+    bbox = (min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+            max(b[2] for b in bboxes), max(b[3] for b in bboxes))
+
+    for z in range(zoom_min, zoom_max + 1):
+        inicio = time.perf_counter()
+        gerados = vazios = 0
+        for x, y in tiles_da_area(bbox, z):
+            # Mensagens MVT concatenadas = um tile com várias camadas (campo repetido)
+            dados = b''.join(GERADOR_TILES.gerar(layer_id, z, x, y) for layer_id in layer_ids)
+            if not dados:
+                vazios += 1
+                continue
+            gerados += 1
+            yield z, x, y, gzip.compress(dados, mtime=0)
+        print("[TILES] z{}: {} tiles ({} vazios) em {:.1f} s".format(
+            z, gerados, vazios, time.perf_counter() - inicio))
+
+
+def metadados(layer_ids, zoom_min, zoom_max):
+    """vector_layers (padrão TileJSON) + estilos para o visualizador montar as camadas"""
+    return {
+        'name': 'Infraestrutura Logistica - Santa Catarina',
+        'attribution': ATRIBUICAO,
+        'vector_layers': [
+            {
+                'id': layer_id,
+                'fields': {c: 'String' for c in ESSENTIAL_COLS if c in carregar_camada(layer_id).columns},
+                'minzoom': zoom_min,
+                'maxzoom': zoom_max,
+            }
+            for layer_id in layer_ids
+        ],
+        'camadas': [
+            {'id': layer_id, 'tipo': tipo_camada(layer_id), 'estilo': estilo_camada(layer_id)}
+            for layer_id in layer_ids
+        ],
+    }
+
+
+def exportar_pmtiles(saida, layer_ids, zoom_min, zoom_max):
+    # O PMTiles exige os tiles em ordem crescente de tile_id (curva de Hilbert)
+    tiles = sorted(gerar_piramide(layer_ids, zoom_min, zoom_max),
+                   key=lambda t: zxy_to_tileid(t[0], t[1], t[2]))
+    if not tiles:
+        raise RuntimeError("Nenhum tile gerado")
+
+    bboxes = [carregar_camada(layer_id).total_bounds for layer_id in layer_ids]
+    lon_min, lat_min = min(b[0] for b in bboxes), min(b[1] for b in bboxes)
+    lon_max, lat_max = max(b[2] for b in bboxes), max(b[3] for b in bboxes)
+
+    with open(saida, 'wb') as f:
+        writer = Writer(f)
+        for z, x, y, dados in tiles:
+            writer.write_tile(zxy_to_tileid(z, x, y), dados)
+        writer.finalize(
+            {
+                'tile_type': TileType.MVT,
+                'tile_compression': Compression.GZIP,
+                'min_lon_e7': int(lon_min * 1e7),
+                'min_lat_e7': int(lat_min * 1e7),
+                'max_lon_e7': int(lon_max * 1e7),
+                'max_lat_e7': int(lat_max * 1e7),
+                'center_zoom': zoom_min + 2,
+                'center_lon_e7': int((lon_min + lon_max) / 2 * 1e7),
+                'center_lat_e7': int((lat_min + lat_max) / 2 * 1e7),
+            },
+            metadados(layer_ids, zoom_min, zoom_max),
+        )
+    return len(tiles)
+
+
+def exportar_mbtiles(saida, layer_ids, zoom_min, zoom_max):
+    Path(saida).unlink(missing_ok=True)
+    con = sqlite3.connect(str(saida))
+    try:
+        con.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+        con.execute("CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB)")
+        con.execute("CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)")
+
+        total = 0
+        for z, x, y, dados in gerar_piramide(layer_ids, zoom_min, zoom_max):
+            # MBTiles usa esquema TMS (linha invertida)
+            con.execute("INSERT INTO tiles VALUES (?, ?, ?, ?)", (z, x, 2 ** z - 1 - y, dados))
+            total += 1
+
+        meta = metadados(layer_ids, zoom_min, zoom_max)
+        con.executemany("INSERT INTO metadata VALUES (?, ?)", [
+            ('name', meta['name']),
+            ('format', 'pbf'),
+            ('minzoom', str(zoom_min)),
+            ('maxzoom', str(zoom_max)),
+            ('attribution', ATRIBUICAO),
+            ('json', json.dumps({'vector_layers': meta['vector_layers'], 'camadas': meta['camadas']})),
+        ])
+        con.commit()
+    finally:
+        con.close()
+    return total
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    zoom_min, zoom_max = ZOOM_PADRAO
+    saida = SAIDA_PADRAO
+    layer_ids = []
+
+    i = 0
+    while i < len(args):
+        if args[i] == '--zoom':
+            zoom_min, zoom_max = (int(v) for v in args[i + 1].split('-'))
+            i += 2
+        elif args[i] == '--saida':
+            saida = args[i + 1]
+            i += 2
+        else:
+            layer_ids.append(args[i])
+            i += 1
+
+    desconhecidas = [l for l in layer_ids if l not in LAYER_MAPPING]
+    if desconhecidas:
+        print("[ERROR] Unknown layer(s): {}".format(', '.join(desconhecidas)))
+        sys.exit(1)
+
+    # Só camadas disponíveis (shapefile ou armazém compilado) e com feições
+    camadas = {l: carregar_camada(l) for l in (layer_ids or LAYER_MAPPING)}
+    layer_ids = [l for l, gdf in camadas.items() if gdf is not None and not gdf.empty]
+    if not layer_ids:
+        print("[ERROR] Nenhuma camada disponível")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("[BUILD] {} camada(s), zoom {}-{} -> {}".format(len(layer_ids), zoom_min, zoom_max, saida))
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    if saida.endswith('.mbtiles'):
+        total = exportar_mbtiles(saida, layer_ids, zoom_min, zoom_max)
+    else:
+        total = exportar_pmtiles(saida, layer_ids, zoom_min, zoom_max)
+
+    print("[OK] {}: {} tiles, {:.1f} MB em {:.1f} s".format(
+        saida, total, Path(saida).stat().st_size / 1024 / 1024, time.perf_counter() - inicio))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+GeoJSON em fluxo a partir do GeoDataFrame em cache
+As feições são serializadas em lotes (geometria pelo GEOS, propriedades pelo
+pandas) e entregues uma a uma: a string JSON da camada inteira nunca existe
+na memória do servidor e o cliente pode desenhar enquanto recebe.
+"""
+
+import numpy as np
+import shapely
+
+LOTE_PADRAO = 500
+
+
+def feicoes(gdf, lote=LOTE_PADRAO):
+    """Listas de Features (strings JSON), `lote` por vez"""
+    colunas = [c for c in gdf.columns if c != gdf.geometry.name]
+
+    for inicio in range(0, len(gdf), lote):
+        parte = gdf.iloc[inicio:inicio + lote]
+        geometrias = shapely.to_geojson(np.asarray(parte.geometry.values, dtype=object))
+        if colunas:
+            propriedades = parte[colunas].to_json(orient='records', lines=True, force_ascii=False)
+            propriedades = propriedades.rstrip('\n').split('\n')
+        else:
+            propriedades = ['{}'] * len(parte)
+
+        yield [
+            '{{"type":"Feature","properties":{},"geometry":{}}}'.format(p, g if g is not None else 'null')
+            for p, g in zip(propriedades, geometrias)
+        ]
+
+
+def ndjson(gdf, lote=LOTE_PADRAO):
+    """Uma Feature por linha (newline-delimited GeoJSON)"""
+    for linhas in feicoes(gdf, lote):
+        yield '\n'.join(linhas) + '\n'
+
+
+def feature_collection(gdf, lote=LOTE_PADRAO):
+    """FeatureCollection completa, emitida em pedaços"""
+    yield '{"type":"FeatureCollection","features":['
+    separador = ''
+    for linhas in feicoes(gdf, lote):
+        yield separador + ','.join(linhas)
+        separador = ','
+    yield ']}'
+
+
+# formato do pedido -> (gerador, mimetype)
+FORMATOS = {
+    'ndjson': (ndjson, 'application/x-ndjson'),
+    'geojson': (feature_collection, 'application/geo+json'),
+}
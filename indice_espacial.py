@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Índice espacial (STRtree) das camadas em cache
+Um índice por camada e nível de detalhe, construído uma vez e compartilhado
+pelos tiles vetoriais e pelos recortes por área do /api/gerar-mapa: um mapa
+do porto de Itajaí recebe só as feições da região, já recortadas.
+"""
+
+import threading
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+# Construtor do tipo Multi* por dimensão (partes de uma GeometryCollection recortada)
+_MULTI = {0: shapely.multipoints, 1: shapely.multilinestrings, 2: shapely.multipolygons}
+
+
+class IndiceCamadas:
+    """STRtree por (camada, nível), reconstruído quando expira ou a versão muda
+
+    carregar: (layer_id, zoom) -> GeoDataFrame (EPSG:4326), normalmente carregar_camada
+    versao: layer_id -> str; muda quando o pré-processamento da camada muda
+    validade: segundos até reconstruir o índice da camada (acompanha o cache de camadas)
+    nivel: (layer_id, zoom) -> nível de detalhe usado no zoom; zooms do mesmo
+        nível compartilham o índice
+    """
+
+    def __init__(self, carregar, versao, validade=3600, nivel=None):
+        self.carregar = carregar
+        self.versao = versao
+        self.nivel = nivel or (lambda layer_id, z: None)
+        self.validade = validade
+        self._indices = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._indices)
+
+    def obter(self, layer_id, z=None):
+        """(gdf, STRtree, geometrias) do nível da camada para o zoom (None = camada base)"""
+        versao = self.versao(layer_id)
+        chave = (layer_id, self.nivel(layer_id, z) if z is not None else None)
+        with self._lock:
+            atual = self._indices.get(chave)
+        if atual is not None and atual[0] == versao and time.time() - atual[1] < self.validade:
+            return atual[2], atual[3], atual[4]
+
+        gdf = self.carregar(layer_id, z)
+        if gdf is None:
+            return None, None, None
+
+        # Anéis degenerados (simplificação + quantização) quebram clip_by_rect/intersection
+        geometrias = np.array(gdf.geometry.values, dtype=object)
+        invalidas = ~shapely.is_valid(geometrias)
+        if invalidas.any():
+            geometrias[invalidas] = shapely.make_valid(geometrias[invalidas])
+
+        arvore = shapely.STRtree(geometrias)
+        with self._lock:
+            self._indices[chave] = (versao, time.time(), gdf, arvore, geometrias)
+        return gdf, arvore, geometrias
+
+    def recortar(self, layer_id, area, z=None):
+        """Feições da camada que cruzam a área, recortadas nela
+
+        area: (lon_min, lat_min, lon_max, lat_max) ou geometria em EPSG:4326.
+        Retorna None se a camada não está disponível.
+        """
+        gdf, arvore, geometrias = self.obter(layer_id, z)
+        if gdf is None:
+            return None
+
+        retangulo = isinstance(area, (tuple, list))
+        indices = np.sort(arvore.query(shapely.box(*area) if retangulo else area, predicate='intersects'))
+        originais = geometrias[indices]
+        if retangulo:
+            recortadas = shapely.clip_by_rect(originais, *area)
+        else:
+            recortadas = shapely.intersection(originais, area)
+
+        # Feições que só encostam na borda sobram como pontos/linhas soltos: mantém a dimensão original
+        dimensoes = shapely.get_dimensions(originais)
+        for i in np.flatnonzero(shapely.get_type_id(recortadas) == 7):
+            partes = shapely.get_parts(recortadas[i])
+            partes = partes[shapely.get_dimensions(partes) == dimensoes[i]]
+            recortadas[i] = partes[0] if len(partes) == 1 else _MULTI[dimensoes[i]](partes)
+        manter = ~shapely.is_empty(recortadas) & (shapely.get_dimensions(recortadas) == dimensoes)
+
+        resultado = gdf.iloc[indices[manter]].copy()
+        resultado[gdf.geometry.name] = gpd.GeoSeries(recortadas[manter], index=resultado.index, crs=gdf.crs)
+        return resultado.reset_index(drop=True)
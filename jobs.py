@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de jobs assíncronos (geração de mapas e exportação PNG)
+Os jobs rodam num pool limitado de threads; quando o pool e a fila estão
+cheios a submissão é recusada (FilaCheia -> HTTP 429 nas rotas)
+
+Com um diretório compartilhado (vários workers do gunicorn), cada mudança de
+estado é gravada em <diretorio>/<id>.json: o job roda no processo que o
+recebeu, mas qualquer worker responde o status e o stream de eventos.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+NA_FILA = 'na_fila'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+
+# Intervalo de leitura do arquivo de jobs de outros processos
+INTERVALO_ARQUIVO = 0.5
+
+
+class FilaCheia(Exception):
+    """Pool e fila de espera ocupados; o cliente deve tentar mais tarde"""
+
+
+class FilaJobs:
+    """Pool de workers com limite de fila e registro de status por job"""
+
+    def __init__(self, max_workers=2, max_fila=8, retencao=3600, diretorio=None):
+        self.max_workers = max_workers
+        self.max_fila = max_fila
+        self.retencao = retencao
+        self.diretorio = Path(diretorio) if diretorio else None
+        if self.diretorio:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._pendentes = 0
+        self._sequencia = itertools.count(1)
+        self.recusados = 0
+
+    def submeter(self, tipo, funcao, *args, **kwargs):
+        """Enfileira funcao(*args) e retorna o id do job; levanta FilaCheia se lotado"""
+        with self._cond:
+            self._limpar()
+            if self._pendentes >= self.max_workers + self.max_fila:
+                self.recusados += 1
+                raise FilaCheia()
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'id': job_id,
+                'tipo': tipo,
+                'pid': os.getpid(),
+                'status': NA_FILA,
+                'versao': next(self._sequencia),
+                'criado': time.time(),
+                'iniciado': None,
+                'concluido': None,
+                'resultado': None,
+                'erro': None,
+            }
+            self._pendentes += 1
+            self._gravar(self._jobs[job_id])
+
+        self._executor.submit(self._executar, job_id, funcao, args, kwargs)
+        return job_id
+
+    def _atualizar(self, job_id, **campos):
+        with self._cond:
+            job = self._jobs[job_id]
+            job.update(campos)
+            job['versao'] = next(self._sequencia)
+            self._gravar(job)
+            self._cond.notify_all()
+
+    def _executar(self, job_id, funcao, args, kwargs):
+        self._atualizar(job_id, status=EXECUTANDO, iniciado=time.time())
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self._atualizar(job_id, status=ERRO, erro=str(e), concluido=time.time())
+        else:
+            self._atualizar(job_id, status=CONCLUIDO, resultado=resultado, concluido=time.time())
+        finally:
+            with self._cond:
+                self._pendentes -= 1
+
+    def _caminho(self, job_id):
+        return self.diretorio / '{}.json'.format(job_id)
+
+    def _gravar(self, job):
+        """Grava o estado do job no diretório compartilhado (temporário + os.replace)"""
+        if not self.diretorio:
+            return
+        caminho = self._caminho(job['id'])
+        temporario = caminho.with_name('{}.{}.{}.tmp'.format(caminho.name, os.getpid(), threading.get_ident()))
+        try:
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False)
+            os.replace(temporario, caminho)
+        except (OSError, TypeError, ValueError) as e:
+            print("[WARN] Falha ao gravar o job {}: {}".format(job['id'], e))
+            if temporario.exists():
+                temporario.unlink()
+
+    def _ler(self, job_id):
+        """Estado gravado por outro processo (ou None)"""
+        if not self.diretorio or not job_id.isalnum():
+            return None
+        try:
+            with open(self._caminho(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _limpar(self):
+        """Descarta jobs finalizados há mais tempo que a retenção"""
+        limite = time.time() - self.retencao
+        for job_id in [j for j, job in self._jobs.items()
+                       if job['concluido'] is not None and job['concluido'] < limite]:
+            del self._jobs[job_id]
+        if not self.diretorio:
+            return
+        # Arquivos sem atualização há mais que a retenção: jobs expirados ou de processos encerrados
+        for caminho in self.diretorio.glob('*.json'):
+            try:
+                if caminho.stem not in self._jobs and caminho.stat().st_mtime < limite:
+                    caminho.unlink()
+            except OSError:
+                pass
+
+    def obter(self, job_id):
+        """Cópia do estado do job (ou None); procura no diretório compartilhado se não for deste processo"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        return self._ler(job_id)
+
+    def aguardar_mudanca(self, job_id, versao, timeout=15):
+        """Bloqueia até o job mudar de versão (ou timeout); retorna o estado atual"""
+        with self._cond:
+            if job_id in self._jobs:
+                self._cond.wait_for(
+                    lambda: job_id not in self._jobs or self._jobs[job_id]['versao'] != versao,
+                    timeout=timeout,
+                )
+                job = self._jobs.get(job_id)
+                return dict(job) if job is not None else None
+
+        # Job de outro worker: relê o arquivo até a versão mudar
+        limite = time.monotonic() + timeout
+        job = self._ler(job_id)
+        while job is not None and job['versao'] == versao and time.monotonic() < limite:
+            time.sleep(INTERVALO_ARQUIVO)
+            job = self._ler(job_id)
+        return job
+
+    def posicao(self, job_id):
+        """Quantos jobs na fila (do mesmo processo) foram submetidos antes deste"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                if job['status'] != NA_FILA:
+                    return 0
+                return sum(1 for j in self._jobs.values()
+                           if j['status'] == NA_FILA and j['criado'] < job['criado'])
+
+        job = self._ler(job_id)
+        if job is None or job['status'] != NA_FILA:
+            return 0
+        fila = (self._ler(caminho.stem) for caminho in self.diretorio.glob('*.json'))
+        return sum(1 for j in fila
+                   if j is not None and j['pid'] == job['pid']
+                   and j['status'] == NA_FILA and j['criado'] < job['criado'])
+
+    def estatisticas(self):
+        with self._cond:
+            por_status = {}
+            for job in self._jobs.values():
+                por_status[job['status']] = por_status.get(job['status'], 0) + 1
+            return {
+                'workers': self.max_workers,
+                'max_fila': self.max_fila,
+                'pendentes': self._pendentes,
+                'recusados': self.recusados,
+                'jobs': por_status,
+            }
@@ -1,18 +1,23 @@
-import geopandas as gpd
 import folium
-from pathlib import Path
 import pandas as pd
-
-# Caminho base dos shapefiles BC25
-BASE_DIR = Path(r"C:\Users\caetanoronan\OneDrive - UFSC\Área de Trabalho\Infra_SC\bc25_sc_shapefile_2020-10-01")
+from branca.colormap import linear
+from branca.element import MacroElement
+from jinja2 import Template
+from dados_bc25 import CAMADAS
+from etapas_bc25 import executar, projetada
+import municipios_bc25
+from quantizacao import reduzir_precisao
 
 # --- Carregar camadas ---
+# Só as colunas usadas nos tooltips/popups; filtros aplicados na leitura e
+# camadas já lidas (e projetadas) reaproveitadas do cache (etapas_bc25) enquanto
+# o shapefile não mudar; a mesma leitura serve ao relatório
 print("📥 Carregando shapefiles BC25...")
-uf = gpd.read_file(BASE_DIR / "lml_unidade_federacao_a.shp").to_crs("EPSG:4326")
-municipios = gpd.read_file(BASE_DIR / "lml_municipio_a.shp").to_crs("EPSG:4326")
-# Calcular area e classificar porte (pequeno/medio/grande) por tercis de area
-muni_merc = municipios.to_crs(3857)
-municipios["area_km2"] = muni_merc.geometry.area / 1e6
+camadas = executar({**CAMADAS, "municipios_sc": projetada("municipios")})
+uf = camadas["uf"]
+municipios = camadas["municipios"]
+# Calcular area (Albers de SC, equivalente) e classificar porte (pequeno/medio/grande) por tercis de area
+municipios["area_km2"] = camadas["municipios_sc"].geometry.area / 1e6
 q1, q2 = municipios["area_km2"].quantile([0.33, 0.66])
 
 def _porte(area):
@@ -24,26 +29,29 @@ def _porte(area):
 
 municipios["porte_area"] = municipios["area_km2"].apply(_porte)
 porte_counts = municipios["porte_area"].value_counts()
-roads = gpd.read_file(BASE_DIR / "rod_via_deslocamento_l.shp").to_crs("EPSG:4326")
-roads_main = roads[roads["jurisdicao"].isin(["Federal", "Estadual/Distrital"])]
-roads_fed = roads[roads["jurisdicao"] == "Federal"]
-roads_est = roads[roads["jurisdicao"] == "Estadual/Distrital"]
-ferrovias = gpd.read_file(BASE_DIR / "fer_trecho_ferroviario_l.shp").to_crs("EPSG:4326")
-aerodromos = gpd.read_file(BASE_DIR / "aer_pista_ponto_pouso_p.shp").to_crs("EPSG:4326")
-helipontos = aerodromos[aerodromos["tipopista"].str.contains("Heliponto", case=False, na=False)]
-# Construções aeroportuárias (terminais, hangares, etc.)
-construcoes_aero = gpd.read_file(BASE_DIR / "edf_edif_constr_aeroportuaria_p.shp").to_crs("EPSG:4326")
-terminais = gpd.read_file(BASE_DIR / "hdv_atracadouro_terminal_p.shp").to_crs("EPSG:4326")
-# Portos em áreas (maiores)
-terminais_area = gpd.read_file(BASE_DIR / "hdv_atracadouro_terminal_a.shp").to_crs("EPSG:4326")
-# Portos em linhas (cais, molhes)
-terminais_linha = gpd.read_file(BASE_DIR / "hdv_atracadouro_terminal_l.shp").to_crs("EPSG:4326")
-# Infra adicional para escoamento
-dutos = gpd.read_file(BASE_DIR / "dut_trecho_duto_l.shp").to_crs("EPSG:4326")
-hidrovias = gpd.read_file(BASE_DIR / "hdv_trecho_hidroviario_l.shp").to_crs("EPSG:4326")
-pontes = gpd.read_file(BASE_DIR / "tra_ponte_l.shp").to_crs("EPSG:4326")
-tuneis = gpd.read_file(BASE_DIR / "tra_tunel_l.shp").to_crs("EPSG:4326")
-viadutos = gpd.read_file(BASE_DIR / "tra_passagem_elevada_viaduto_l.shp").to_crs("EPSG:4326")
+# Infraestrutura por município (municipios_bc25, em cache) para o coroplético: geometria
+# simplificada como no mapa otimizado (0.001) e só as colunas do tooltip
+CAMPOS_DENSIDADE = ["nome", "km_rodovias_100km2", "km_rodovias_federais", "km_rodovias_estaduais", "km_ferrovias",
+                    "pontes", "tuneis", "viadutos", "terminais"]
+agregados = municipios_bc25.obter()
+municipios_infra = municipios[["geocodigo", "geometry"]].merge(agregados, on="geocodigo")[CAMPOS_DENSIDADE + ["geometry"]]
+municipios_infra["geometry"] = municipios_infra.geometry.simplify(0.001, preserve_topology=True)
+municipios_infra = reduzir_precisao(municipios_infra, decimals=5)
+municipios_infra[CAMPOS_DENSIDADE[1:5]] = municipios_infra[CAMPOS_DENSIDADE[1:5]].fillna(0).round(1)
+roads_main = camadas["roads"]
+roads_fed = roads_main[roads_main["jurisdicao"] == "Federal"]
+roads_est = roads_main[roads_main["jurisdicao"] == "Estadual/Distrital"]
+ferrovias = camadas["ferrovias"]
+helipontos = camadas["helipontos"]
+construcoes_aero = camadas["construcoes_aero"]
+terminais = camadas["terminais"]
+terminais_area = camadas["terminais_area"]
+terminais_linha = camadas["terminais_linha"]
+dutos = camadas["dutos"]
+hidrovias = camadas["hidrovias"]
+pontes = camadas["pontes"]
+tuneis = camadas["tuneis"]
+viadutos = camadas["viadutos"]
 
 print(f"   ✓ Rodovias (fed/est): {len(roads_main)}")
 print(f"   ✓ Limite estadual: {len(uf)} | Municípios: {len(municipios)}")
@@ -57,6 +65,27 @@ print(f"   ✓ Hidrovias: {len(hidrovias)}")
 print(f"   ✓ Dutos: {len(dutos)}")
 print(f"   ✓ Pontes: {len(pontes)} | Túneis: {len(tuneis)} | Viadutos: {len(viadutos)}")
 
+class LegendaDaCamada(MacroElement):
+    """Mostra a legenda (colormap do branca) só enquanto a camada estiver ligada no controle de camadas"""
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var mapa = {{ this._parent.get_name() }};
+            var camada = {{ this.camada.get_name() }};
+            var legenda = {{ this.escala.get_name() }}.legend.getContainer();
+            legenda.style.display = mapa.hasLayer(camada) ? '' : 'none';
+            mapa.on('overlayadd', function(e) { if (e.layer === camada) { legenda.style.display = ''; } });
+            mapa.on('overlayremove', function(e) { if (e.layer === camada) { legenda.style.display = 'none'; } });
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, camada, escala):
+        super().__init__()
+        self._name = "LegendaDaCamada"
+        self.camada = camada
+        self.escala = escala
+
 # --- Mapa base ---
 mapa = folium.Map(
     location=[-27.5, -49.5],
@@ -95,6 +124,7 @@ ui_html = """
                 <li>Ferrovias, hidrovias e dutos como linhas dedicadas.</li>
                 <li>Helipontos e construções aeroportuárias (terminais, hangares) como pontos.</li>
                 <li>Limites municipais (porte por area) em camada dedicada; limite estadual sempre visivel.</li>
+                <li>Densidade rodoviaria por municipio (coropletico, tabela de municipios_bc25.py).</li>
                 <li>Pontes, tuneis e viadutos como camadas independentes.</li>
             </ul>
             <div style="margin-top: 8px; font-size: 12px; color: #4a5568;">Use o controle de camadas (canto superior direito) para alternar a visibilidade.</div>
@@ -147,6 +177,31 @@ folium.GeoJson(
     show=False,
 ).add_to(mapa)
 
+# Densidade rodoviária por município (coroplético)
+escala_densidade = linear.YlOrRd_09.scale(0, max(float(municipios_infra["km_rodovias_100km2"].max()), 1.0))
+escala_densidade.caption = "Rodovias federais + estaduais (km por 100 km²)"
+camada_densidade = folium.GeoJson(
+    municipios_infra,
+    name="🌡️ Densidade Rodoviária por Município",
+    style_function=lambda x: {
+        "color": "#555555",
+        "weight": 0.6,
+        "fillColor": escala_densidade(x["properties"]["km_rodovias_100km2"]),
+        "fillOpacity": 0.7,
+    },
+    tooltip=folium.GeoJsonTooltip(
+        fields=CAMPOS_DENSIDADE,
+        aliases=["Municipio", "km/100 km²", "Rod. federais (km)", "Rod. estaduais (km)", "Ferrovias (km)",
+                 "Pontes", "Túneis", "Viadutos", "Terminais"],
+        localize=True,
+        labels=True,
+        sticky=True,
+    ),
+    show=False,
+).add_to(mapa)
+escala_densidade.add_to(mapa)
+LegendaDaCamada(camada_densidade, escala_densidade).add_to(mapa)
+
 # Rodovias Federais
 folium.GeoJson(
     roads_fed,
@@ -1,10 +1,10 @@
-import geopandas as gpd
 import folium
 from pathlib import Path
 import pandas as pd
 import json
-from shapely.geometry import Polygon, LineString, Point, MultiPolygon, MultiLineString
-import numpy as np
+from quantizacao import reduzir_precisao
+from dados_bc25 import CAMADAS
+from etapas_bc25 import executar, projetada
 
 # ==================== FUNÇÕES DE OTIMIZAÇÃO ====================
 
@@ -16,57 +16,6 @@ def simplificar_geometrias(gdf, tolerance=0.001):
     gdf['geometry'] = gdf['geometry'].simplify(tolerance, preserve_topology=True)
     return gdf
 
-def reduzir_precisao(gdf, decimals=5):
-    """Arredonda coordenadas para menos casas decimais"""
-    if gdf.empty:
-        return gdf
-    
-    gdf = gdf.copy()
-    
-    def round_geom(geom):
-        if geom.is_empty:
-            return geom
-            
-        geom_type = geom.geom_type
-        
-        if geom_type == 'Polygon':
-            # Arredonda coordenadas do polígono
-            exterior = np.round(np.array(geom.exterior.coords), decimals)
-            interiors = []
-            for interior in geom.interiors:
-                interiors.append(np.round(np.array(interior.coords), decimals))
-            return Polygon(exterior, interiors)
-            
-        elif geom_type == 'MultiPolygon':
-            polygons = []
-            for poly in geom.geoms:
-                exterior = np.round(np.array(poly.exterior.coords), decimals)
-                interiors = []
-                for interior in poly.interiors:
-                    interiors.append(np.round(np.array(interior.coords), decimals))
-                polygons.append(Polygon(exterior, interiors))
-            return MultiPolygon(polygons)
-            
-        elif geom_type == 'LineString':
-            coords = np.round(np.array(geom.coords), decimals)
-            return LineString(coords)
-            
-        elif geom_type == 'MultiLineString':
-            lines = []
-            for line in geom.geoms:
-                lines.append(np.round(np.array(line.coords), decimals))
-            return MultiLineString(lines)
-            
-        elif geom_type == 'Point':
-            coords = np.round(np.array(geom.coords), decimals)
-            return Point(coords[0])
-            
-        else:
-            return geom
-    
-    gdf['geometry'] = gdf['geometry'].apply(round_geom)
-    return gdf
-
 def filtrar_colunas(gdf, colunas_manter):
     """Mantém apenas colunas essenciais"""
     if gdf.empty:
@@ -77,28 +26,57 @@ def filtrar_colunas(gdf, colunas_manter):
         return gdf[colunas_existentes + ['geometry']]
     return gdf[['geometry']]
 
+def selecionar_jurisdicao(gdf, jurisdicao):
+    return gdf[gdf["jurisdicao"] == jurisdicao]
+
 # ==================== CONFIGURAÇÃO PRINCIPAL ====================
 
 print("🚀 Iniciando otimização do mapa BC25...")
 
-# Caminho base dos shapefiles BC25
-BASE_DIR = Path(r"C:\Users\caetanoronan\OneDrive - UFSC\Área de Trabalho\Infra_SC\bc25_sc_shapefile_2020-10-01")
-
 # --- Carregar e otimizar camadas ---
-print("📥 Carregando shapefiles BC25...")
+# Cada camada é uma cadeia leitura -> etapas; os resultados intermediários ficam
+# em cache (etapas_bc25) e só o que mudou é recalculado na próxima execução.
+# As leituras (e a projeção dos municípios) são as mesmas de mapa_bc25.py e do
+# relatório; as camadas sem tooltip ficam sem atributos
+def otimizar(tolerancia):
+    """Simplificação + redução de precisão (5 casas, ~1 m)"""
+    return [(simplificar_geometrias, {"tolerance": tolerancia}), (reduzir_precisao, {"decimals": 5})]
 
-# 1. Limite estadual
-uf = gpd.read_file(BASE_DIR / "lml_unidade_federacao_a.shp").to_crs("EPSG:4326")
-uf = simplificar_geometrias(uf, tolerance=0.001)
-uf = reduzir_precisao(uf, decimals=5)
-uf = filtrar_colunas(uf, ['nome', 'sigla'])
+def colunas(*manter):
+    return (filtrar_colunas, {"colunas_manter": list(manter)})
 
-# 2. Municípios
-municipios = gpd.read_file(BASE_DIR / "lml_municipio_a.shp").to_crs("EPSG:4326")
+print("📥 Carregando shapefiles BC25...")
+camadas = executar({
+    **CAMADAS,
+    # 1. Limite estadual
+    "uf_otim": ["uf", *otimizar(0.001), colunas('nome', 'sigla')],
+    # 2. Municípios (área medida na geometria original, no Albers de SC)
+    "municipios_sc": projetada("municipios"),
+    "municipios_otim": ["municipios", *otimizar(0.001), colunas('nome', 'geocodigo')],
+    # 3. Rodovias (só federais e estaduais, filtradas na leitura)
+    "roads_fed": ["roads", (selecionar_jurisdicao, {"jurisdicao": "Federal"}), *otimizar(0.0005),
+                  colunas('jurisdicao', 'revestimen', 'operaciona')],
+    "roads_est": ["roads", (selecionar_jurisdicao, {"jurisdicao": "Estadual/Distrital"}), *otimizar(0.0005),
+                  colunas('jurisdicao', 'revestimen', 'operaciona')],
+    # 4. Ferrovias
+    "ferrovias_otim": ["ferrovias", *otimizar(0.0005), colunas('nome', 'tipotrecho', 'bitola', 'eletrifica')],
+    # 5. Pontos (menos otimização necessária)
+    "helipontos_otim": ["helipontos", colunas('nome'), (reduzir_precisao, {"decimals": 5})],
+    "construcoes_aero_otim": ["construcoes_aero", colunas('nome'), (reduzir_precisao, {"decimals": 5})],
+    "terminais_otim": ["terminais", colunas('nome'), (reduzir_precisao, {"decimals": 5})],
+    # 6. Outras camadas (aplicar otimização moderada)
+    "terminais_area_otim": ["terminais_area", colunas(), *otimizar(0.002)],
+    **{nome + "_otim": [nome, colunas(), *otimizar(0.001)]
+       for nome in ("terminais_linha", "dutos", "hidrovias", "pontes", "tuneis", "viadutos")},
+}, nomes=["uf_otim", "municipios_sc", "municipios_otim", "roads_fed", "roads_est", "ferrovias_otim",
+          "helipontos_otim", "construcoes_aero_otim", "terminais_otim", "terminais_area_otim",
+          "terminais_linha_otim", "dutos_otim", "hidrovias_otim", "pontes_otim", "tuneis_otim", "viadutos_otim"])
+
+uf = camadas["uf_otim"]
+municipios = camadas["municipios_otim"]
 
 # Calcular área e classificar porte
-muni_merc = municipios.to_crs(3857)
-municipios["area_km2"] = muni_merc.geometry.area / 1e6
+municipios["area_km2"] = camadas["municipios_sc"].geometry.area / 1e6
 q1, q2 = municipios["area_km2"].quantile([0.33, 0.66])
 
 def _porte(area):
@@ -110,72 +88,18 @@ def _porte(area):
 
 municipios["porte_area"] = municipios["area_km2"].apply(_porte)
 porte_counts = municipios["porte_area"].value_counts()
-
-# Otimizar municípios
-municipios = simplificar_geometrias(municipios, tolerance=0.001)
-municipios = reduzir_precisao(municipios, decimals=5)
-municipios = filtrar_colunas(municipios, ['nome', 'geocodigo', 'porte_area', 'area_km2'])
-
-# 3. Rodovias
-roads = gpd.read_file(BASE_DIR / "rod_via_deslocamento_l.shp").to_crs("EPSG:4326")
-roads_main = roads[roads["jurisdicao"].isin(["Federal", "Estadual/Distrital"])]
-roads_fed = roads[roads["jurisdicao"] == "Federal"]
-roads_est = roads[roads["jurisdicao"] == "Estadual/Distrital"]
-
-# Otimizar rodovias
-roads_fed = simplificar_geometrias(roads_fed, tolerance=0.0005)
-roads_fed = reduzir_precisao(roads_fed, decimals=5)
-roads_fed = filtrar_colunas(roads_fed, ['jurisdicao', 'revestimen', 'operaciona'])
-
-roads_est = simplificar_geometrias(roads_est, tolerance=0.0005)
-roads_est = reduzir_precisao(roads_est, decimals=5)
-roads_est = filtrar_colunas(roads_est, ['jurisdicao', 'revestimen', 'operaciona'])
-
-# 4. Ferrovias
-ferrovias = gpd.read_file(BASE_DIR / "fer_trecho_ferroviario_l.shp").to_crs("EPSG:4326")
-ferrovias = simplificar_geometrias(ferrovias, tolerance=0.0005)
-ferrovias = reduzir_precisao(ferrovias, decimals=5)
-ferrovias = filtrar_colunas(ferrovias, ['nome', 'tipotrecho', 'bitola', 'eletrifica'])
-
-# 5. Pontos (menos otimização necessária)
-aerodromos = gpd.read_file(BASE_DIR / "aer_pista_ponto_pouso_p.shp").to_crs("EPSG:4326")
-helipontos = aerodromos[aerodromos["tipopista"].str.contains("Heliponto", case=False, na=False)]
-helipontos = reduzir_precisao(helipontos, decimals=5)
-
-construcoes_aero = gpd.read_file(BASE_DIR / "edf_edif_constr_aeroportuaria_p.shp").to_crs("EPSG:4326")
-construcoes_aero = reduzir_precisao(construcoes_aero, decimals=5)
-
-terminais = gpd.read_file(BASE_DIR / "hdv_atracadouro_terminal_p.shp").to_crs("EPSG:4326")
-terminais = reduzir_precisao(terminais, decimals=5)
-
-# 6. Outras camadas (aplicar otimização moderada)
-terminais_area = gpd.read_file(BASE_DIR / "hdv_atracadouro_terminal_a.shp").to_crs("EPSG:4326")
-terminais_area = simplificar_geometrias(terminais_area, tolerance=0.002)
-terminais_area = reduzir_precisao(terminais_area, decimals=5)
-
-terminais_linha = gpd.read_file(BASE_DIR / "hdv_atracadouro_terminal_l.shp").to_crs("EPSG:4326")
-terminais_linha = simplificar_geometrias(terminais_linha, tolerance=0.001)
-terminais_linha = reduzir_precisao(terminais_linha, decimals=5)
-
-dutos = gpd.read_file(BASE_DIR / "dut_trecho_duto_l.shp").to_crs("EPSG:4326")
-dutos = simplificar_geometrias(dutos, tolerance=0.001)
-dutos = reduzir_precisao(dutos, decimals=5)
-
-hidrovias = gpd.read_file(BASE_DIR / "hdv_trecho_hidroviario_l.shp").to_crs("EPSG:4326")
-hidrovias = simplificar_geometrias(hidrovias, tolerance=0.001)
-hidrovias = reduzir_precisao(hidrovias, decimals=5)
-
-pontes = gpd.read_file(BASE_DIR / "tra_ponte_l.shp").to_crs("EPSG:4326")
-pontes = simplificar_geometrias(pontes, tolerance=0.001)
-pontes = reduzir_precisao(pontes, decimals=5)
-
-tuneis = gpd.read_file(BASE_DIR / "tra_tunel_l.shp").to_crs("EPSG:4326")
-tuneis = simplificar_geometrias(tuneis, tolerance=0.001)
-tuneis = reduzir_precisao(tuneis, decimals=5)
-
-viadutos = gpd.read_file(BASE_DIR / "tra_passagem_elevada_viaduto_l.shp").to_crs("EPSG:4326")
-viadutos = simplificar_geometrias(viadutos, tolerance=0.001)
-viadutos = reduzir_precisao(viadutos, decimals=5)
+roads_fed, roads_est = camadas["roads_fed"], camadas["roads_est"]
+ferrovias = camadas["ferrovias_otim"]
+helipontos = camadas["helipontos_otim"]
+construcoes_aero = camadas["construcoes_aero_otim"]
+terminais = camadas["terminais_otim"]
+terminais_area = camadas["terminais_area_otim"]
+terminais_linha = camadas["terminais_linha_otim"]
+dutos = camadas["dutos_otim"]
+hidrovias = camadas["hidrovias_otim"]
+pontes = camadas["pontes_otim"]
+tuneis = camadas["tuneis_otim"]
+viadutos = camadas["viadutos_otim"]
 
 # ==================== RESUMO DA OTIMIZAÇÃO ====================
 print("\n📊 RESUMO DAS CAMADAS OTIMIZADAS:")
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Minificador de HTML por tokens
+Separa comentários, tags, texto e elementos de conteúdo bruto (<script>,
+<style>, <pre>, <textarea>): só os espaços do texto entre tags e de dentro
+das tags são colapsados, e atributos (style, data-*) ficam como estão.
+Scripts e estilos passam intactos, exceto os GeoJSON embutidos pelo folium,
+reescritos sem espaços, com acentos em UTF-8 e coordenadas arredondadas.
+"""
+
+import re
+
+CASAS_PADRAO = 6  # ~0,1 m em graus
+
+_ABERTURA_BRUTA = re.compile(r'<(script|style|pre|textarea)(?=[\s>/])(?:"[^"]*"|\'[^\']*\'|[^\'">])*>', re.IGNORECASE)
+_TAG = re.compile(r'</?[a-zA-Z!?](?:"[^"]*"|\'[^\']*\'|[^\'">])*>')
+_INICIO_TAG = re.compile(r'</?[a-zA-Z!?]')
+_TAG_MAXIMA = 64 * 1024  # além disso, um '<' sem '>' é texto
+_ATRIBUTO_OU_ESPACO = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+_ESPACOS = re.compile(r'\s+')
+
+# GeoJSON do folium: objeto JSON literal com chaves ordenadas ({"bbox": ..., {"features": ..., {"type": ...)
+_INICIO_JSON = re.compile(r'\{\s*"(?:bbox|features|type|geometry|coordinates)"\s*:')
+_FIM_CANDIDATO = re.compile(r'\}(?=\s*[);])')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SO_DADOS = re.compile(r'(?:[\s{}\[\],:0-9.eE+\-]+|true|false|null)*')
+_STRING_OU_ESPACO = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")|\s+')
+_ESCAPE_UNICODE = re.compile(r'(\\\\)|\\u([0-9a-fA-F]{4})')
+_COORDENADAS = re.compile(r'"(coordinates|bbox)":(\[[\[\]0-9.eE+\-,]*\])')
+
+
+def _minificar_tag(tag):
+    """Colapsa os espaços entre atributos; valores entre aspas ficam intactos"""
+    tag = _ATRIBUTO_OU_ESPACO.sub(lambda m: m.group(1) or ' ', tag)
+    # ' />' fica: em <a href=x /> o espaço separa o valor sem aspas da barra
+    return tag[:-2] + '>' if tag.endswith(' >') else tag
+
+
+def _desescapar(m):
+    """\\uXXXX -> caractere (só acima de Latin-1 básico; aspas, controles e surrogates ficam)"""
+    if m.group(1):
+        return m.group(1)
+    codigo = int(m.group(2), 16)
+    if codigo < 0xA0 or 0xD800 <= codigo <= 0xDFFF or codigo in (0x2028, 0x2029):
+        return m.group(0)
+    return chr(codigo)
+
+
+def _fim_json(texto, inicio):
+    """Posição após o objeto JSON (só dados) que começa em `inicio`; None se não for um"""
+    for candidato in _FIM_CANDIDATO.finditer(texto, inicio):
+        fim = candidato.end()
+        esqueleto = _STRING.sub('""', texto[inicio:fim])
+        if esqueleto.count('{') == esqueleto.count('}') and esqueleto.count('[') == esqueleto.count(']'):
+            return fim if _SO_DADOS.fullmatch(esqueleto.replace('""', '0')) else None
+    return None
+
+
+def compactar_json(texto, casas=CASAS_PADRAO):
+    """JSON sem espaços, com \\uXXXX em UTF-8 e coordinates/bbox com `casas` decimais"""
+    numero = re.compile(r'-?\d+\.\d{%d}\d+' % casas)
+    formato = '{:.%df}' % casas
+
+    def arredondar(m):
+        valor = formato.format(float(m.group(0))).rstrip('0').rstrip('.')
+        return '0' if valor == '-0' else valor
+
+    texto = _STRING_OU_ESPACO.sub(r'\1', texto)
+    texto = _ESCAPE_UNICODE.sub(_desescapar, texto)
+    return _COORDENADAS.sub(lambda m: '"{}":{}'.format(m.group(1), numero.sub(arredondar, m.group(2))), texto)
+
+
+def compactar_script(js, casas=CASAS_PADRAO):
+    """Reescreve os objetos GeoJSON literais do script; o restante do código fica intacto"""
+    partes = []
+    posicao = busca = 0
+    while True:
+        m = _INICIO_JSON.search(js, busca)
+        if m is None:
+            break
+        fim = _fim_json(js, m.start())
+        if fim is None:
+            busca = m.start() + 1
+            continue
+        partes.append(js[posicao:m.start()])
+        partes.append(compactar_json(js[m.start():fim], casas))
+        posicao = busca = fim
+    partes.append(js[posicao:])
+    return ''.join(partes)
+
+
+class MinificadorHTML:
+    """Minificação incremental: alimentar() recebe pedaços, finalizar() devolve o restante
+
+    Cada pedaço devolvido termina num limite de token; um elemento bruto
+    (<script> etc.) é guardado até o fechamento, então a memória usada é a
+    do maior script do documento, não a do documento inteiro.
+    """
+
+    def __init__(self, casas=CASAS_PADRAO):
+        self.casas = casas
+        self._resto = ''
+        self._bruto = None  # (nome, abertura, [pedaços do conteúdo])
+
+    def alimentar(self, texto):
+        saida = []
+        if self._bruto is not None:
+            texto = self._continuar_bruto(texto, saida)
+            if texto is None:
+                return ''.join(saida)
+        self._resto += texto
+        self._processar(saida, final=False)
+        return ''.join(saida)
+
+    def finalizar(self):
+        saida = []
+        if self._bruto is not None:
+            # Documento truncado: devolve o elemento como veio
+            nome, abertura, pedacos = self._bruto
+            saida.append(abertura + ''.join(pedacos))
+            self._bruto = None
+        self._processar(saida, final=True)
+        return ''.join(saida)
+
+    def _continuar_bruto(self, texto, saida):
+        """Acumula o conteúdo do elemento bruto; devolve o texto após o fechamento (None se não fechou)"""
+        nome, abertura, pedacos = self._bruto
+        anterior = pedacos[-1][-64:] if pedacos else ''
+        fechamento = re.compile(r'</%s\s*>' % nome, re.IGNORECASE).search(anterior + texto)
+        if fechamento is None:
+            # O último pedaço sempre guarda os 64 caracteres finais (início de um fechamento partido)
+            if pedacos and len(pedacos[-1]) > 64:
+                pedacos[-1], cauda = pedacos[-1][:-64], pedacos[-1][-64:]
+                pedacos.append(cauda + texto)
+            elif pedacos:
+                pedacos[-1] += texto
+            else:
+                pedacos.append(texto)
+            return None
+
+        # O fechamento pode começar no fim do pedaço anterior
+        corte = fechamento.start() - len(anterior)
+        if corte < 0:
+            pedacos[-1] = pedacos[-1][:corte]
+            texto = anterior[corte:] + texto
+            corte = 0
+        pedacos.append(texto[:corte])
+        saida.append(self._emitir_bruto(nome, abertura, ''.join(pedacos)))
+        self._bruto = None
+        return texto[corte:]
+
+    def _emitir_bruto(self, nome, abertura, conteudo):
+        abertura = _minificar_tag(abertura)
+        if nome == 'script':
+            conteudo = compactar_script(conteudo, self.casas)
+        return abertura + conteudo
+
+    def _processar(self, saida, final):
+        texto = self._resto
+        posicao = 0
+        tamanho = len(texto)
+        while posicao < tamanho:
+            if texto[posicao] != '<':
+                proxima = texto.find('<', posicao)
+                if proxima == -1:
+                    if not final:
+                        # Espaços no fim podem continuar no próximo pedaço
+                        fim = len(texto.rstrip())
+                        if fim > posicao:
+                            saida.append(_ESPACOS.sub(' ', texto[posicao:fim]))
+                            posicao = fim
+                        break
+                    proxima = tamanho
+                saida.append(_ESPACOS.sub(' ', texto[posicao:proxima]))
+                posicao = proxima
+                continue
+
+            if texto.startswith('<!--', posicao):
+                fim = texto.find('-->', posicao + 4)
+                if fim == -1:
+                    if final:
+                        saida.append(texto[posicao:])
+                        posicao = tamanho
+                    break
+                comentario = texto[posicao:fim + 3]
+                if comentario.startswith('<!--[if') or comentario.endswith('<![endif]-->'):
+                    saida.append(comentario)  # comentários condicionais do IE
+                posicao = fim + 3
+                continue
+
+            bruto = _ABERTURA_BRUTA.match(texto, posicao)
+            if bruto is not None:
+                self._bruto = (bruto.group(1).lower(), bruto.group(0), [])
+                restante = self._continuar_bruto(texto[bruto.end():], saida)
+                if restante is None:
+                    self._resto = ''
+                    return
+                texto = restante
+                posicao = 0
+                tamanho = len(texto)
+                continue
+
+            tag = _TAG.match(texto, posicao)
+            if tag is None:
+                incompleta = not final and tamanho - posicao < _TAG_MAXIMA and (
+                    tamanho - posicao < 3 or _INICIO_TAG.match(texto, posicao))
+                if incompleta:
+                    break  # a tag continua no próximo pedaço
+                # '<' solto no texto (ex.: "a < b")
+                saida.append('<')
+                posicao += 1
+                continue
+            saida.append(_minificar_tag(tag.group(0)))
+            posicao = tag.end()
+
+        self._resto = texto[posicao:]
+
+
+def minificar_html(texto, casas=CASAS_PADRAO):
+    """Minifica um documento HTML inteiro"""
+    minificador = MinificadorHTML(casas)
+    return minificador.alimentar(texto) + minificador.finalizar()
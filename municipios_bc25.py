@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Infraestrutura por município
+Para cada município: km de rodovias federais e estaduais e de ferrovias
+(linhas recortadas pelo limite municipal) e número de pontes, túneis,
+viadutos e terminais. Os pares linha-município vêm de um índice espacial
+(STRtree) e só as linhas que cruzam o limite são recortadas; feições contadas
+vão para o município que contém o seu ponto interior. A tabela fica em cache
+com a chave do conteúdo das camadas (como em estatisticas_bc25) e é exportada
+em Parquet e CSV.
+
+Uso: python municipios_bc25.py [--forcar]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+
+import estatisticas_bc25
+from etapas_bc25 import Pipeline, sha256_json
+
+VERSAO = 1  # mude ao alterar o cálculo: invalida as tabelas já gravadas
+
+BASE_DIR = Path(__file__).resolve().parent
+SAIDA = Path(os.environ.get("BC25_MUNICIPIOS", str(BASE_DIR / "infraestrutura_municipios")))
+
+# Coluna -> camadas (cadeias do cache); as lineares no CRS métrico de SC
+MEDIDAS_KM = {
+    "km_rodovias_federais": ("roads_sc", "Federal"),
+    "km_rodovias_estaduais": ("roads_sc", "Estadual/Distrital"),
+    "km_ferrovias": ("ferrovias_sc", None),
+}
+CONTAGENS = {
+    "pontes": ["pontes"],
+    "tuneis": ["tuneis"],
+    "viadutos": ["viadutos"],
+    "terminais": ["terminais", "terminais_area", "terminais_linha"],
+}
+NOMES = ["municipios", "municipios_sc", "roads_sc", "ferrovias_sc"] + sorted(
+    {nome for nomes in CONTAGENS.values() for nome in nomes})
+
+
+def _geometrias(gdf):
+    return np.asarray(gdf.geometry.values, dtype=object)
+
+
+def km_por_municipio(linhas, poligonos):
+    """km das linhas dentro de cada polígono (CRS em metros)"""
+    arvore = shapely.STRtree(poligonos)
+    i_linha, i_poligono = arvore.query(linhas, predicate="intersects")
+    shapely.prepare(poligonos)
+    comprimentos = shapely.length(linhas[i_linha])
+
+    # Só as linhas que cruzam o limite são recortadas
+    cruzam = ~shapely.contains_properly(poligonos[i_poligono], linhas[i_linha])
+    comprimentos[cruzam] = shapely.length(shapely.intersection(linhas[i_linha[cruzam]], poligonos[i_poligono[cruzam]]))
+    return np.bincount(i_poligono, weights=comprimentos, minlength=len(poligonos)) / 1000
+
+
+def contagem_por_municipio(geometrias, poligonos):
+    """Feições por polígono, pelo ponto interior de cada uma (uma feição conta uma vez só)"""
+    pontos = shapely.point_on_surface(geometrias)
+    i_ponto, i_poligono = shapely.STRtree(poligonos).query(pontos, predicate="intersects")
+    _, primeiro = np.unique(i_ponto, return_index=True)  # ponto na divisa: o primeiro município
+    return np.bincount(i_poligono[primeiro], minlength=len(poligonos))
+
+
+def agregar(camadas):
+    """Tabela com uma linha por município a partir de {nome: GeoDataFrame} (nomes de NOMES)"""
+    municipios = camadas["municipios"]
+    poligonos_sc = _geometrias(camadas["municipios_sc"])
+    tabela = pd.DataFrame({
+        "geocodigo": municipios["geocodigo"].values,
+        "nome": municipios["nome"].values,
+        "area_km2": shapely.area(poligonos_sc) / 1e6,
+    })
+
+    for coluna, (nome, jurisdicao) in MEDIDAS_KM.items():
+        linhas = camadas[nome]
+        if jurisdicao is not None:
+            linhas = linhas[linhas["jurisdicao"] == jurisdicao]
+        tabela[coluna] = km_por_municipio(_geometrias(linhas), poligonos_sc)
+
+    # Camadas contadas estão em EPSG:4326, como os municípios sem projeção
+    poligonos = _geometrias(municipios)
+    for coluna, nomes in CONTAGENS.items():
+        geometrias = np.concatenate([_geometrias(camadas[nome]) for nome in nomes])
+        tabela[coluna] = contagem_por_municipio(geometrias, poligonos)
+
+    km_rodovias = tabela["km_rodovias_federais"] + tabela["km_rodovias_estaduais"]
+    tabela["km_rodovias_100km2"] = np.where(tabela["area_km2"] > 0, 100 * km_rodovias / tabela["area_km2"], 0.0)
+    return tabela
+
+
+def obter(forcar=False, diretorio=None, cache_dir=None):
+    """Tabela do cache ou, se as camadas mudaram, recalculada e gravada"""
+    pipeline = Pipeline(estatisticas_bc25.cadeias(), diretorio, cache_dir)
+    chave = sha256_json('municipios', VERSAO, pipeline.hashes(NOMES))
+    arquivo = pipeline.cache_dir / "municipios_{}.parquet".format(chave[:32])
+
+    if not forcar and arquivo.exists():
+        print("   ♻️ Tabela por município do cache ({})".format(arquivo.name))
+        return pd.read_parquet(arquivo)
+
+    inicio = time.perf_counter()
+    tabela = agregar(pipeline.executar(NOMES))
+    print("   ⚙️ {} municípios agregados em {:.2f}s".format(len(tabela), time.perf_counter() - inicio))
+    temporario = arquivo.with_name("{}.{}.tmp".format(arquivo.name, os.getpid()))
+    tabela.to_parquet(temporario, index=False)
+    os.replace(temporario, arquivo)
+    return tabela
+
+
+def exportar(tabela, saida=SAIDA):
+    """Grava saida.parquet e saida.csv; devolve os caminhos"""
+    caminhos = []
+    for sufixo, gravar in ((".parquet", tabela.to_parquet), (".csv", tabela.to_csv)):
+        destino = Path(str(saida) + sufixo)
+        temporario = destino.with_name("{}.{}.tmp".format(destino.name, os.getpid()))
+        gravar(temporario, index=False)
+        os.replace(temporario, destino)
+        caminhos.append(destino)
+    return caminhos
+
+
+if __name__ == "__main__":
+    print("🏘️ Agregando infraestrutura por município...")
+    tabela = obter(forcar='--forcar' in sys.argv[1:])
+    for caminho in exportar(tabela):
+        print("   ✓ {}".format(caminho.name))
+    print("\n🔝 Maior densidade rodoviária (km/100 km²):")
+    for linha in tabela.nlargest(5, "km_rodovias_100km2").itertuples():
+        print("   • {}: {:.1f}".format(linha.nome, linha.km_rodovias_100km2))
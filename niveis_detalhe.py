@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Níveis de detalhe (LOD) por zoom para camadas de linhas e polígonos
+A tolerância de cada nível vem da resolução no solo do zoom (metros por
+pixel na latitude de Santa Catarina): em zoom baixo um vértice a menos de
+meio pixel do traço não aparece, então pode ser removido. Acima do último
+nível usa-se a camada base, com o detalhe completo.
+"""
+
+import math
+
+import geopandas as gpd
+import shapely
+
+RAIO_TERRA = 6378137.0
+METROS_POR_GRAU = 2 * math.pi * RAIO_TERRA / 360
+LATITUDE_REFERENCIA = -27.5  # centro de Santa Catarina
+PIXELS_TOLERANCIA = 0.5
+TAMANHO_TILE = 256
+
+
+def resolucao_solo(zoom, latitude=LATITUDE_REFERENCIA):
+    """Metros por pixel no zoom (Web Mercator, tiles de 256 px)"""
+    return 2 * math.pi * RAIO_TERRA * math.cos(math.radians(latitude)) / (TAMANHO_TILE * 2 ** zoom)
+
+
+def tolerancia_zoom(zoom, latitude=LATITUDE_REFERENCIA, pixels=PIXELS_TOLERANCIA):
+    """Tolerância de simplificação (graus) equivalente a `pixels` de tela no zoom"""
+    return resolucao_solo(zoom, latitude) * pixels / METROS_POR_GRAU
+
+
+def zooms_com_ganho(tolerancia_base, zoom_min=5, zoom_max=18):
+    """Zooms cuja tolerância supera a da camada base (abaixo disso o nível seria igual à base)"""
+    return tuple(z for z in range(zoom_min, zoom_max + 1) if tolerancia_zoom(z) > tolerancia_base)
+
+
+def nivel_para_zoom(niveis, zoom):
+    """Nível a usar no zoom: o mais detalhado que não passa do zoom; None = camada base"""
+    if not niveis or zoom > max(niveis):
+        return None
+    candidatos = [n for n in niveis if n <= zoom]
+    return max(candidatos) if candidatos else min(niveis)
+
+
+def simplificar_nivel(gdf, zoom):
+    """Cópia da camada simplificada para o zoom; feições que somem são descartadas"""
+    geometrias = shapely.simplify(gdf.geometry.values, tolerancia_zoom(zoom), preserve_topology=True)
+    nivel = gdf.copy()
+    nivel[gdf.geometry.name] = gpd.GeoSeries(geometrias, index=gdf.index, crs=gdf.crs)
+    return nivel[~nivel.geometry.is_empty].reset_index(drop=True)
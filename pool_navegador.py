@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Pool persistente de navegadores headless (Playwright/Chromium) para exportar PNG
+Cada worker é uma thread dona do seu Chromium (a API síncrona do Playwright
+não pode ser usada fora da thread que a criou) com uma página já aberta.
+O navegador é reciclado após N renderizações ou quando falha.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Tarefa:
+    def __init__(self, url, png_path, timeout_ms):
+        self.url = url
+        self.png_path = png_path
+        self.timeout_ms = timeout_ms
+        self.enfileirada = time.perf_counter()
+        self.future = Future()
+
+
+class PoolNavegadores:
+    """Mantém `tamanho` Chromiums aquecidos e distribui as capturas entre eles"""
+
+    def __init__(self, tamanho=1, max_renders=50, viewport=(1920, 1080), timeout_ms=60000,
+                 espera_pronto_ms=15000):
+        self.tamanho = tamanho
+        self.max_renders = max_renders
+        self.espera_pronto_ms = espera_pronto_ms
+        self.viewport = {'width': viewport[0], 'height': viewport[1]}
+        self.timeout_ms = timeout_ms
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._metricas = {
+            'renders': 0,
+            'erros': 0,
+            'reciclagens': 0,
+            'lancamentos': 0,
+            'sem_sinal': 0,
+            'espera_total_s': 0.0,
+            'espera_max_s': 0.0,
+            'render_total_s': 0.0,
+            'render_max_s': 0.0,
+        }
+
+    def _iniciar_workers(self):
+        # Sob demanda: importar o app (ex.: scripts de build) não abre Chromium
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.tamanho):
+                t = threading.Thread(target=self._worker, name='chromium-{}'.format(i), daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def renderizar(self, url, png_path, timeout_ms=None):
+        """Captura a página `url` em `png_path`; bloqueia até terminar"""
+        self._iniciar_workers()
+        tarefa = _Tarefa(url, png_path, timeout_ms or self.timeout_ms)
+        self._fila.put(tarefa)
+        return tarefa.future.result()
+
+    def _registrar(self, chave, valor):
+        with self._lock:
+            self._metricas[chave] += valor
+
+    def _registrar_tempo(self, nome, segundos):
+        with self._lock:
+            self._metricas[nome + '_total_s'] += segundos
+            self._metricas[nome + '_max_s'] = max(self._metricas[nome + '_max_s'], segundos)
+
+    def _worker(self):
+        try:
+            from playwright.sync_api import sync_playwright
+            p = sync_playwright().start()
+            erro_inicial = None
+        except Exception as e:
+            # Sem Playwright/Chromium: cada tarefa recebe o erro em vez de travar
+            p = None
+            erro_inicial = e
+
+        browser = page = None
+        renders = 0
+
+        while True:
+            tarefa = self._fila.get()
+            if tarefa is None:
+                break
+            self._registrar_tempo('espera', time.perf_counter() - tarefa.enfileirada)
+
+            if p is None:
+                self._registrar('erros', 1)
+                tarefa.future.set_exception(erro_inicial)
+                continue
+
+            try:
+                if browser is None or not browser.is_connected():
+                    browser, page = self._lancar(p, browser)
+                    renders = 0
+
+                inicio = time.perf_counter()
+                self._capturar(page, tarefa)
+                self._registrar_tempo('render', time.perf_counter() - inicio)
+                self._registrar('renders', 1)
+                renders += 1
+                tarefa.future.set_result(tarefa.png_path)
+            except Exception as e:
+                # Página/navegador em estado desconhecido: recicla antes da próxima tarefa
+                self._registrar('erros', 1)
+                if browser is not None:
+                    self._registrar('reciclagens', 1)
+                    self._fechar(browser)
+                browser = page = None
+                tarefa.future.set_exception(e)
+                continue
+
+            if renders >= self.max_renders:
+                self._registrar('reciclagens', 1)
+                self._fechar(browser)
+                browser = page = None
+
+        self._fechar(browser)
+        if p is not None:
+            p.stop()
+
+    def _lancar(self, p, anterior):
+        if anterior is not None:
+            self._registrar('reciclagens', 1)
+            self._fechar(anterior)
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page(viewport=self.viewport)
+        self._registrar('lancamentos', 1)
+        print("[BROWSER] Chromium launched ({})".format(threading.current_thread().name))
+        return browser, page
+
+    @staticmethod
+    def _fechar(browser):
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception:
+            pass
+
+    def _capturar(self, page, tarefa):
+        page.set_default_timeout(tarefa.timeout_ms)  # aumenta timeout para redes lentas
+
+        # Abrir página servida pelo Flask (garante acesso a tiles remotos)
+        page.goto(tarefa.url, wait_until="load")
+
+        # Aguardar o sinal de renderização do mapa (window.mapaPronto)
+        if not self._aguardar_pronto(page):
+            self._registrar('sem_sinal', 1)
+            print("[WARN] Render-ready signal not received in {} ms: {}".format(
+                self.espera_pronto_ms, tarefa.url))
+
+        # Tirar screenshot
+        page.screenshot(path=str(tarefa.png_path), full_page=True)
+
+    def _aguardar_pronto(self, page):
+        """Espera window.mapaPronto em qualquer frame (o mapa fica num iframe)"""
+        prazo = time.monotonic() + self.espera_pronto_ms / 1000
+        while True:
+            for frame in page.frames:
+                try:
+                    if frame.evaluate("() => window.mapaPronto === true"):
+                        return True
+                except Exception:
+                    # Frame ainda navegando ou já destacado
+                    pass
+            if time.monotonic() >= prazo:
+                return False
+            page.wait_for_timeout(50)
+
+    def encerrar(self):
+        for _ in self._threads:
+            self._fila.put(None)
+
+    def estatisticas(self):
+        with self._lock:
+            m = dict(self._metricas)
+            ativos = len(self._threads)
+        concluidas = m['renders'] + m['erros']
+        return {
+            'tamanho': self.tamanho,
+            'ativos': ativos,
+            'max_renders': self.max_renders,
+            'fila': self._fila.qsize(),
+            'renders': m['renders'],
+            'erros': m['erros'],
+            'reciclagens': m['reciclagens'],
+            'lancamentos': m['lancamentos'],
+            'sem_sinal': m['sem_sinal'],
+            'espera_media_ms': round(1000 * m['espera_total_s'] / concluidas, 1) if concluidas else 0,
+            'espera_max_ms': round(1000 * m['espera_max_s'], 1),
+            'render_medio_ms': round(1000 * m['render_total_s'] / m['renders'], 1) if m['renders'] else 0,
+            'render_max_ms': round(1000 * m['render_max_s'], 1),
+        }
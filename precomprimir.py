@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Variantes pré-comprimidas (.br e .gz) de mapas, relatórios e camadas GeoJSON
+Gravadas uma única vez (no build ou ao gerar o mapa) ao lado do arquivo
+original; o app escolhe a variante pelo Accept-Encoding e envia os bytes
+prontos, sem comprimir nada por requisição.
+
+Uso: python precomprimir.py [--forcar] [arquivo ...]
+     (padrão: *.html da raiz e geojson_layers/*.geojson|*.topojson)
+"""
+
+import gzip
+import os
+import sys
+import time
+from pathlib import Path
+
+import brotli
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# codificação HTTP -> sufixo da variante, na ordem de preferência do servidor
+SUFIXOS = {'br': '.br', 'gzip': '.gz'}
+
+# Build: compressão máxima; na geração de mapas o app usa níveis mais rápidos
+QUALIDADE_BROTLI = 11
+NIVEL_GZIP = 9
+
+
+def caminho_variante(caminho, codificacao):
+    caminho = Path(caminho)
+    return caminho.with_name(caminho.name + SUFIXOS[codificacao])
+
+
+def variantes(caminho):
+    """{codificação: Path} das variantes atualizadas (não mais antigas que o original)"""
+    caminho = Path(caminho)
+    try:
+        mtime = caminho.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    disponiveis = {}
+    for codificacao in SUFIXOS:
+        variante = caminho_variante(caminho, codificacao)
+        try:
+            if variante.stat().st_mtime_ns >= mtime:
+                disponiveis[codificacao] = variante
+        except FileNotFoundError:
+            pass
+    return disponiveis
+
+
+def _gravar(destino, dados):
+    temporario = destino.with_name('{}.{}.tmp'.format(destino.name, os.getpid()))
+    temporario.write_bytes(dados)
+    os.replace(temporario, destino)
+
+
+def gravar_variantes(caminho, qualidade_brotli=QUALIDADE_BROTLI, nivel_gzip=NIVEL_GZIP, forcar=False):
+    """Grava as variantes que faltam ou estão desatualizadas; retorna {codificação: bytes gravados}"""
+    caminho = Path(caminho)
+    atualizadas = variantes(caminho)
+    pendentes = [c for c in SUFIXOS if forcar or c not in atualizadas]
+    if not pendentes:
+        return {}
+
+    dados = caminho.read_bytes()
+    gravadas = {}
+    for codificacao in pendentes:
+        if codificacao == 'br':
+            comprimido = brotli.compress(dados, quality=qualidade_brotli)
+        else:
+            comprimido = gzip.compress(dados, compresslevel=nivel_gzip, mtime=0)
+        _gravar(caminho_variante(caminho, codificacao), comprimido)
+        gravadas[codificacao] = len(comprimido)
+    return gravadas
+
+
+def arquivos_padrao():
+    """Páginas e relatórios da raiz e as camadas de geojson_layers/"""
+    arquivos = sorted(BASE_DIR.glob('*.html'))
+    for padrao in ('*.geojson', '*.topojson'):
+        arquivos.extend(sorted((BASE_DIR / 'geojson_layers').glob(padrao)))
+    return arquivos
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    forcar = '--forcar' in args
+    arquivos = [Path(a) for a in args if not a.startswith('--')] or arquivos_padrao()
+
+    print("=" * 78)
+    print("[BUILD] Variantes pré-comprimidas (brotli {} / gzip {})".format(QUALIDADE_BROTLI, NIVEL_GZIP))
+    print("=" * 78)
+    print("{:<44} {:>10} {:>9} {:>9} {:>8}".format('arquivo', 'orig. KB', 'br KB', 'gz KB', 'tempo'))
+
+    total = [0, 0, 0]
+    for arquivo in arquivos:
+        if not arquivo.is_file():
+            print("[WARN] Arquivo não encontrado: {}".format(arquivo))
+            continue
+        inicio = time.perf_counter()
+        gravadas = gravar_variantes(arquivo, forcar=forcar)
+        if not gravadas:
+            print("[SKIP] {}: variantes atualizadas".format(arquivo.name))
+            continue
+
+        tamanhos = [arquivo.stat().st_size] + [caminho_variante(arquivo, c).stat().st_size for c in SUFIXOS]
+        total = [t + v for t, v in zip(total, tamanhos)]
+        print("{:<44} {:>10.1f} {:>9.1f} {:>9.1f} {:>7.2f}s".format(
+            arquivo.name[:44], tamanhos[0] / 1024, tamanhos[1] / 1024, tamanhos[2] / 1024,
+            time.perf_counter() - inicio))
+
+    if total[0]:
+        print("-" * 78)
+        print("[STAT] Total: {:.0f} KB -> brotli {:.0f} KB ({:.1f}x) | gzip {:.0f} KB ({:.1f}x)".format(
+            total[0] / 1024, total[1] / 1024, total[0] / total[1], total[2] / 1024, total[0] / total[2]))
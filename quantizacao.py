@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Quantização vetorizada de coordenadas
+Arredonda todas as coordenadas de uma GeoSeries em uma única passada NumPy
+"""
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+
+def quantizar_geometrias(geometrias, decimals=5):
+    """Arredonda as coordenadas de um array de geometrias em lote
+
+    Extrai todas as coordenadas com shapely.get_coordinates, aplica np.round
+    uma única vez e devolve as geometrias reconstruídas pelo GEOS. Funciona
+    com qualquer tipo (inclusive MultiPoint e GeometryCollection); geometrias
+    vazias e nulas são preservadas.
+    """
+    geometrias = np.asarray(geometrias, dtype=object)
+    if geometrias.size == 0:
+        return geometrias.copy()
+
+    # Só inclui Z quando alguma geometria é 3D (evita Z=NaN em camadas 2D)
+    include_z = bool(shapely.has_z(geometrias).any())
+    coords = shapely.get_coordinates(geometrias, include_z=include_z)
+    if len(coords) == 0:
+        return geometrias.copy()
+
+    return shapely.set_coordinates(geometrias.copy(), np.round(coords, decimals))
+
+
+def reduzir_precisao(gdf, decimals=5):
+    """Reduz precisão das coordenadas de um GeoDataFrame"""
+    if gdf.empty:
+        return gdf
+
+    gdf = gdf.copy()
+    gdf[gdf.geometry.name] = gpd.GeoSeries(
+        quantizar_geometrias(gdf.geometry.values, decimals),
+        index=gdf.index,
+        crs=gdf.crs,
+    )
+    return gdf
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Renderizador PNG estático (sem navegador)
+Desenha as camadas já carregadas (GeoDataFrames em EPSG:4326) direto em
+raster com Pillow, em Web Mercator como o Leaflet, usando as mesmas cores,
+espessuras e opacidades do mapa interativo. O mapa base é opcional e vem de
+um arquivo MBTiles raster local, então funciona em container sem rede.
+"""
+
+import math
+import sqlite3
+from io import BytesIO
+
+import numpy as np
+import shapely
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+# Extensão padrão (Santa Catarina) em graus: lon_min, lat_min, lon_max, lat_max
+BBOX_SC = (-53.9, -29.4, -48.3, -25.9)
+RAIO_TERRA = 6378137.0
+FUNDO = (250, 250, 248)
+SUPERAMOSTRAGEM = 2
+
+
+def _mercator(lon, lat):
+    """Graus -> metros Web Mercator (EPSG:3857), vetorizado"""
+    lat = np.clip(lat, -85.05112878, 85.05112878)
+    x = RAIO_TERRA * np.radians(lon)
+    y = RAIO_TERRA * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    return x, y
+
+
+class _Transformacao:
+    """Converte graus em pixels para uma bbox encaixada no tamanho da imagem"""
+
+    def __init__(self, bbox, largura, altura, margem=0.03):
+        x0, y0 = _mercator(bbox[0], bbox[1])
+        x1, y1 = _mercator(bbox[2], bbox[3])
+        dx, dy = (x1 - x0) * (1 + 2 * margem), (y1 - y0) * (1 + 2 * margem)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+
+        # Mesma escala nos dois eixos: a bbox cabe inteira na imagem
+        self.escala = min(largura / dx, altura / dy)
+        self.x_min = cx - largura / 2 / self.escala
+        self.y_max = cy + altura / 2 / self.escala
+        self.largura = largura
+        self.altura = altura
+
+    def pixels(self, coords):
+        x, y = _mercator(coords[:, 0], coords[:, 1])
+        return np.column_stack([(x - self.x_min) * self.escala, (self.y_max - y) * self.escala])
+
+    def metros(self, px, py):
+        return self.x_min + px / self.escala, self.y_max - py / self.escala
+
+
+def _rgba(cor, opacidade):
+    r, g, b = ImageColor.getrgb(cor)[:3]
+    return (r, g, b, int(round(255 * max(0.0, min(1.0, opacidade)))))
+
+
+def _caminhos(geometrias, transf):
+    """Lista de arrays de pixels, um por anel/linha, em uma passada vetorizada"""
+    if len(geometrias) == 0:
+        return []
+    coords, indice = shapely.get_coordinates(geometrias, return_index=True)
+    if len(coords) == 0:
+        return []
+    pixels = transf.pixels(coords)
+    cortes = np.flatnonzero(np.diff(indice)) + 1
+    return np.split(pixels, cortes)
+
+
+def _tracejar(pts, traco, espaco):
+    """Divide uma polilinha (pixels) em traços, como o dashArray do Leaflet"""
+    segmentos = np.diff(pts, axis=0)
+    dist = np.concatenate([[0.0], np.cumsum(np.hypot(segmentos[:, 0], segmentos[:, 1]))])
+    if dist[-1] == 0:
+        return []
+    inicios = np.arange(0, dist[-1], traco + espaco)
+    tracos = []
+    for ini in inicios:
+        fim = min(ini + traco, dist[-1])
+        dentro = (dist > ini) & (dist < fim)
+        xs = np.concatenate([[ini], dist[dentro], [fim]])
+        tracos.append(np.column_stack([np.interp(xs, dist, pts[:, 0]), np.interp(xs, dist, pts[:, 1])]))
+    return tracos
+
+
+def _desenhar_linhas(img, geoms, cor, largura, opacidade, transf, tracejado=None):
+    linhas = shapely.get_parts(shapely.get_parts(geoms))
+    camada = Image.new('RGBA', img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(camada)
+    largura_px = max(1, int(round(largura * SUPERAMOSTRAGEM)))
+    rgba = _rgba(cor, 1.0)
+    for pts in _caminhos(linhas, transf):
+        if len(pts) < 2:
+            continue
+        if tracejado:
+            partes = _tracejar(pts, *(v * SUPERAMOSTRAGEM for v in tracejado))
+        else:
+            partes = [pts]
+        for parte in partes:
+            draw.line([tuple(p) for p in parte], fill=rgba, width=largura_px, joint='curve')
+    _compor(img, camada, opacidade)
+
+
+def _desenhar_poligonos(img, geoms, cor, largura, opacidade_borda, opacidade_fundo, transf):
+    poligonos = shapely.get_parts(geoms)
+
+    if opacidade_fundo > 0:
+        # Máscara com furos: exterior pinta, anéis internos apagam
+        mascara = Image.new('L', img.size, 0)
+        draw = ImageDraw.Draw(mascara)
+        for poligono in poligonos:
+            aneis = _caminhos(shapely.get_rings(poligono), transf)
+            for i, pts in enumerate(aneis):
+                if len(pts) >= 3:
+                    draw.polygon([tuple(p) for p in pts], fill=0 if i else 255)
+        fundo = Image.new('RGBA', img.size, _rgba(cor, 1.0))
+        fundo.putalpha(mascara.point(lambda v: int(v * opacidade_fundo)))
+        img.alpha_composite(fundo)
+
+    _desenhar_linhas(img, shapely.boundary(poligonos), cor, largura, opacidade_borda, transf)
+
+
+def _desenhar_pontos(img, geoms, cor, raio, opacidade, transf):
+    pontos = shapely.get_parts(geoms)
+    coords = shapely.get_coordinates(pontos)
+    if len(coords) == 0:
+        return
+    pixels = transf.pixels(coords)
+    r = raio * SUPERAMOSTRAGEM
+    camada = Image.new('RGBA', img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(camada)
+    preenchimento = _rgba(cor, opacidade)
+    contorno = _rgba(cor, 1.0)
+    for x, y in pixels:
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=preenchimento, outline=contorno,
+                     width=SUPERAMOSTRAGEM * 3)
+    img.alpha_composite(camada)
+
+
+def _compor(img, camada, opacidade):
+    if opacidade < 1.0:
+        alfa = camada.getchannel('A').point(lambda v: int(v * opacidade))
+        camada.putalpha(alfa)
+    img.alpha_composite(camada)
+
+
+def _mapa_base(img, transf, mbtiles_path, zoom=None):
+    """Cola os tiles de um MBTiles raster local que cobrem a área da imagem"""
+    con = sqlite3.connect('file:{}?mode=ro'.format(mbtiles_path), uri=True)
+    try:
+        if zoom is None:
+            # Zoom cuja resolução é a mais próxima da escala da imagem
+            metros_px = 1 / transf.escala * SUPERAMOSTRAGEM
+            zoom = int(round(math.log2(2 * math.pi * RAIO_TERRA / 256 / metros_px)))
+            linha = con.execute("SELECT MIN(zoom_level), MAX(zoom_level) FROM tiles").fetchone()
+            if linha[0] is not None:
+                zoom = max(linha[0], min(linha[1], zoom))
+
+        mundo = 2 * math.pi * RAIO_TERRA
+        n = 2 ** zoom
+        tamanho_tile = mundo / n
+
+        x0, y1 = transf.metros(0, 0)
+        x1, y0 = transf.metros(img.size[0], img.size[1])
+        col_ini = int((x0 + mundo / 2) // tamanho_tile)
+        col_fim = int((x1 + mundo / 2) // tamanho_tile)
+        lin_ini = int((mundo / 2 - y1) // tamanho_tile)
+        lin_fim = int((mundo / 2 - y0) // tamanho_tile)
+
+        lado_px = int(math.ceil(tamanho_tile * transf.escala))
+        for col in range(max(col_ini, 0), min(col_fim, n - 1) + 1):
+            for lin in range(max(lin_ini, 0), min(lin_fim, n - 1) + 1):
+                # MBTiles usa esquema TMS (linha invertida)
+                registro = con.execute(
+                    "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                    (zoom, col, n - 1 - lin),
+                ).fetchone()
+                if registro is None:
+                    continue
+                tile = Image.open(BytesIO(registro[0])).convert('RGBA').resize((lado_px, lado_px))
+                mx = col * tamanho_tile - mundo / 2
+                my = mundo / 2 - lin * tamanho_tile
+                px = int(round((mx - transf.x_min) * transf.escala))
+                py = int(round((transf.y_max - my) * transf.escala))
+                # paste aceita deslocamento negativo (tile cortado na borda)
+                img.paste(tile, (px, py), tile)
+    finally:
+        con.close()
+
+
+def _legenda(img, titulo, creditos):
+    draw = ImageDraw.Draw(img)
+    try:
+        fonte_titulo = ImageFont.load_default(size=16 * SUPERAMOSTRAGEM)
+        fonte = ImageFont.load_default(size=11 * SUPERAMOSTRAGEM)
+    except TypeError:
+        # Pillow < 10.1 não aceita tamanho na fonte padrão
+        fonte_titulo = fonte = ImageFont.load_default()
+
+    m = 10 * SUPERAMOSTRAGEM
+    caixa = draw.textbbox((0, 0), titulo, font=fonte_titulo)
+    x = (img.size[0] - (caixa[2] - caixa[0])) // 2
+    draw.rectangle([x - m, m, x + caixa[2] + m, m + caixa[3] + m], fill=(255, 255, 255, 235))
+    draw.text((x, m + m // 2), titulo, fill=(31, 41, 51, 255), font=fonte_titulo)
+
+    caixa = draw.multiline_textbbox((0, 0), creditos, font=fonte)
+    x = img.size[0] - caixa[2] - 2 * m
+    y = img.size[1] - caixa[3] - 2 * m
+    draw.rectangle([x - m, y - m, img.size[0] - m, img.size[1] - m], fill=(255, 255, 255, 242))
+    draw.multiline_text((x, y), creditos, fill=(31, 41, 51, 255), font=fonte)
+
+
+def renderizar_png(camadas, destino, largura=1920, altura=1080, bbox=None, mbtiles_path=None,
+                   titulo="Mapa de Infraestrutura Logistica - Santa Catarina",
+                   creditos="Datum: WGS84\nFonte: IBGE BC25 2020\nAutor: Ronan A. Caetano"):
+    """Desenha as camadas e salva o PNG
+
+    camadas: lista de (layer_id, gdf, cor, peso, opacidade) na ordem de desenho
+    bbox: (lon_min, lat_min, lon_max, lat_max); padrão = extensão de Santa Catarina
+    mbtiles_path: MBTiles raster opcional para o mapa base (offline)
+    """
+    w, h = largura * SUPERAMOSTRAGEM, altura * SUPERAMOSTRAGEM
+    transf = _Transformacao(bbox or BBOX_SC, w, h)
+    img = Image.new('RGBA', (w, h), FUNDO + (255,))
+
+    if mbtiles_path:
+        _mapa_base(img, transf, mbtiles_path)
+
+    for layer_id, gdf, cor, peso, opacidade in camadas:
+        if gdf is None or gdf.empty:
+            continue
+        geoms = gdf.geometry.values
+        geoms = np.asarray(geoms[~(shapely.is_empty(geoms) | shapely.is_missing(geoms))], dtype=object)
+        tipo = shapely.get_type_id(geoms)
+
+        # Mesmos estilos do criar_mapa_customizado
+        pontos = np.isin(tipo, (0, 4))
+        linhas = np.isin(tipo, (1, 2, 5))
+        poligonos = np.isin(tipo, (3, 6))
+
+        if pontos.any():
+            _desenhar_pontos(img, geoms[pontos], cor, peso, opacidade, transf)
+        if linhas.any():
+            tracejado = (6, 4) if layer_id == 'dutos' else None
+            _desenhar_linhas(img, geoms[linhas], cor, peso, opacidade, transf, tracejado)
+        if poligonos.any():
+            if layer_id == 'municipios':
+                _desenhar_poligonos(img, geoms[poligonos], cor, peso, 1.0, opacidade, transf)
+            elif layer_id == 'limite-uf':
+                _desenhar_poligonos(img, geoms[poligonos], cor, peso, 1.0, 0, transf)
+            else:
+                _desenhar_poligonos(img, geoms[poligonos], cor, peso, opacidade, 0.2, transf)
+
+    _legenda(img, titulo, creditos)
+
+    img = img.resize((largura, altura), Image.LANCZOS).convert('RGB')
+    img.save(str(destino), optimize=False)
+    return destino
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Negociação de compressão e validação condicional (ETag) das respostas HTTP
+Escolhe br/gzip pelo Accept-Encoding do cliente e comprime respostas em
+fluxo pedaço a pedaço (flush a cada pedaço: o cliente já pode processar o
+que chegou), sem montar o corpo inteiro na memória.
+"""
+
+import zlib
+
+import brotli
+
+# Ordem de preferência do servidor em caso de empate no q do cliente
+CODIFICACOES = ('br', 'gzip')
+NIVEL_GZIP = 6
+QUALIDADE_BROTLI = 5  # dinâmico: compressão boa sem custar muita CPU por pedido
+
+
+def escolher_codificacao(accept_encoding, disponiveis=CODIFICACOES):
+    """Melhor codificação de `disponiveis` aceita pelo cliente; None = sem compressão"""
+    pesos = {}
+    for item in (accept_encoding or '').split(','):
+        nome, _, parametros = item.partition(';')
+        nome = nome.strip().lower()
+        if not nome:
+            continue
+        q = 1.0
+        for parametro in parametros.split(';'):
+            chave, _, valor = parametro.partition('=')
+            if chave.strip().lower() == 'q':
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        pesos[nome] = q
+
+    aceitas = [c for c in disponiveis if pesos.get(c, pesos.get('*', 0)) > 0]
+    if not aceitas:
+        return None
+    # max devolve o primeiro empatado: vale a ordem de preferência do servidor
+    return max(aceitas, key=lambda c: pesos.get(c, pesos.get('*', 0)))
+
+
+def comprimir_fluxo(pedacos, codificacao=None):
+    """Bytes de cada pedaço (str ou bytes) comprimidos em fluxo com `codificacao`"""
+    pedacos = (p.encode('utf-8') if isinstance(p, str) else p for p in pedacos)
+
+    if codificacao is None:
+        yield from pedacos
+        return
+
+    if codificacao == 'gzip':
+        compressor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 31)
+        for pedaco in pedacos:
+            dados = compressor.compress(pedaco) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if dados:
+                yield dados
+        yield compressor.flush()
+    elif codificacao == 'br':
+        compressor = brotli.Compressor(quality=QUALIDADE_BROTLI)
+        for pedaco in pedacos:
+            dados = compressor.process(pedaco) + compressor.flush()
+            if dados:
+                yield dados
+        yield compressor.finish()
+    else:
+        raise ValueError("Codificação não suportada: {}".format(codificacao))
+
+
+def etag_confere(if_none_match, etag):
+    """If-None-Match casa com o ETag (comparação fraca, aceita lista e '*')"""
+    if not if_none_match:
+        return False
+    alvo = etag[2:] if etag.startswith('W/') else etag
+    for candidato in if_none_match.split(','):
+        candidato = candidato.strip()
+        if candidato == '*':
+            return True
+        if (candidato[2:] if candidato.startswith('W/') else candidato) == alvo:
+            return True
+    return False
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de carga da coalescência de requisições
+Dispara N POSTs idênticos e simultâneos em /api/gerar-mapa e mostra quantas
+vezes o mapa foi de fato gerado e quantas camadas foram lidas da fonte.
+Com a coalescência, N requisições custam ~1 geração.
+
+Uso:
+    python teste_carga_coalescencia.py [N] [camada ...]
+    python teste_carga_coalescencia.py --url http://localhost:5000 [N] [camada ...]
+"""
+
+import json
+import sys
+import threading
+import time
+import urllib.request
+
+DEFAULT_LAYERS = ['rodovias-federais', 'ferrovias', 'municipios']
+
+
+def disparar(enviar, n):
+    """Executa enviar() em n threads liberadas ao mesmo tempo; retorna os tempos"""
+    barreira = threading.Barrier(n)
+    tempos = [None] * n
+    erros = []
+
+    def worker(i):
+        barreira.wait()
+        inicio = time.perf_counter()
+        try:
+            enviar()
+        except Exception as e:
+            erros.append(e)
+        tempos[i] = time.perf_counter() - inicio
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return tempos, erros
+
+
+def teste_local(n, layers):
+    """Roda contra o app em processo, contando as gerações reais"""
+    import app_gerador_mapas_final as app_mod
+
+    if app_mod.CACHE_COMPARTILHADO is not None:
+        print("[WARN] SHARED_CACHE_DIR definido: camadas podem vir do cache compartilhado")
+
+    # Chave nova para forçar a geração e cache de camadas frio
+    app_mod.MAP_RENDER_VERSION = 'carga-{}'.format(time.time())
+    app_mod.CACHE_LAYERS.clear()
+    app_mod.CACHE_TIMESTAMP.clear()
+
+    contagem = {'mapas': 0, 'camadas': 0}
+    criar_original = app_mod.criar_mapa_customizado
+    fonte_original = app_mod._carregar_camada_fonte
+
+    def criar_contando(*args, **kwargs):
+        contagem['mapas'] += 1
+        return criar_original(*args, **kwargs)
+
+    def fonte_contando(*args, **kwargs):
+        contagem['camadas'] += 1
+        return fonte_original(*args, **kwargs)
+
+    app_mod.criar_mapa_customizado = criar_contando
+    app_mod._carregar_camada_fonte = fonte_contando
+
+    def enviar():
+        resposta = app_mod.app.test_client().post(
+            '/api/gerar-mapa', json={'layers': layers, 'nome': 'teste_carga'}
+        )
+        if resposta.status_code != 200:
+            raise RuntimeError(resposta.get_json())
+
+    try:
+        tempos, erros = disparar(enviar, n)
+    finally:
+        app_mod.criar_mapa_customizado = criar_original
+        app_mod._carregar_camada_fonte = fonte_original
+
+    return tempos, erros, contagem
+
+
+def teste_remoto(url, n, layers):
+    """Roda contra um servidor em execução, usando os contadores do /api/status"""
+    def status():
+        with urllib.request.urlopen(url + '/api/status') as r:
+            return json.load(r)['coalescencia']
+
+    def enviar():
+        corpo = json.dumps({'layers': layers, 'nome': 'teste_carga'}).encode('utf-8')
+        req = urllib.request.Request(
+            url + '/api/gerar-mapa', data=corpo, headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(req) as r:
+            r.read()
+
+    antes = status()
+    tempos, erros = disparar(enviar, n)
+    depois = status()
+    contagem = {
+        'mapas': depois['mapas']['execucoes'] - antes['mapas']['execucoes'],
+        'camadas': depois['camadas']['execucoes'] - antes['camadas']['execucoes'],
+    }
+    return tempos, erros, contagem
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    url = None
+    if args and args[0] == '--url':
+        url = args[1].rstrip('/')
+        args = args[2:]
+    n = int(args[0]) if args else 10
+    layers = args[1:] or DEFAULT_LAYERS
+
+    print("=" * 60)
+    print("[LOAD TEST] {} requisições simultâneas: {}".format(n, layers))
+    print("=" * 60)
+
+    if url:
+        tempos, erros, contagem = teste_remoto(url, n, layers)
+    else:
+        tempos, erros, contagem = teste_local(n, layers)
+
+    validos = sorted(t for t in tempos if t is not None)
+    print("\n[STAT] Requisições: {} | erros: {}".format(n, len(erros)))
+    if url:
+        print("[STAT] Execuções (mapas/camadas): {} / {} (só a primeira requisição gera)".format(
+            contagem['mapas'], contagem['camadas']))
+    else:
+        print("[STAT] Mapas gerados: {} | camadas lidas da fonte: {} (de {})".format(
+            contagem['mapas'], contagem['camadas'], len(layers)))
+    if validos:
+        print("[STAT] Latência: min {:.2f} s | mediana {:.2f} s | max {:.2f} s".format(
+            validos[0], validos[len(validos) // 2], validos[-1]))
+    for e in erros[:3]:
+        print("[ERROR] {}".format(e))
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Tiles vetoriais (Mapbox Vector Tiles) das camadas BC25 por z/x/y
+O tile é recortado das camadas já pré-processadas usando o índice espacial
+(STRtree) de indice_espacial.py e gravado em disco; os pedidos seguintes do
+mesmo tile são só leitura de arquivo. Assim o peso da página não cresce com a camada:
+o navegador baixa apenas os tiles visíveis.
+"""
+
+import math
+import os
+import threading
+from pathlib import Path
+
+import mapbox_vector_tile
+import numpy as np
+import shapely
+
+from coalescencia import SingleFlight
+
+RAIO_TERRA = 6378137.0
+EXTENT = 4096
+BUFFER = 64  # borda extra (em unidades do tile) para não cortar traços na emenda
+
+
+def limites_tile(z, x, y):
+    """(lon_min, lat_min, lon_max, lat_max) do tile XYZ"""
+    n = 2 ** z
+
+    def lat(linha):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * linha / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def limites_tile_mercator(z, x, y):
+    """Mesmos limites em metros Web Mercator (EPSG:3857)"""
+    mundo = 2 * math.pi * RAIO_TERRA
+    lado = mundo / 2 ** z
+    x_min = x * lado - mundo / 2
+    y_max = mundo / 2 - y * lado
+    return (x_min, y_max - lado, x_min + lado, y_max)
+
+
+def tile_valido(z, x, y, zoom_max=20):
+    return 0 <= z <= zoom_max and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def _para_mercator(coords):
+    lon = coords[:, 0]
+    lat = np.clip(coords[:, 1], -85.05112878, 85.05112878)
+    return np.column_stack([
+        RAIO_TERRA * np.radians(lon),
+        RAIO_TERRA * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)),
+    ])
+
+
+def _valor(v):
+    """Converte valores do pandas/numpy em tipos aceitos pelo encoder (None = omitir)"""
+    if v is None:
+        return None
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, (str, int, float, bool)):
+        return v
+    return str(v)
+
+
+class GeradorTiles:
+    """Recorta e codifica tiles MVT com cache em disco
+
+    indices: IndiceCamadas (indice_espacial.py) com o STRtree de cada camada/nível
+    colunas: atributos mantidos nos tiles
+    """
+
+    def __init__(self, indices, diretorio, colunas=None):
+        self.indices = indices
+        self.versao = indices.versao
+        self.diretorio = Path(diretorio)
+        self.colunas = colunas
+        self._lock = threading.Lock()
+        self._geracoes = SingleFlight()
+        self.hits = 0
+        self.gerados = 0
+
+    def caminho(self, layer_id, z, x, y):
+        return self.diretorio / self.versao(layer_id) / layer_id / str(z) / str(x) / "{}.pbf".format(y)
+
+    def obter(self, layer_id, z, x, y):
+        """Bytes do tile (vazio se não há feições); usa o cache em disco"""
+        caminho = self.caminho(layer_id, z, x, y)
+        try:
+            dados = caminho.read_bytes()
+            with self._lock:
+                self.hits += 1
+            return dados
+        except FileNotFoundError:
+            pass
+
+        dados, _ = self._geracoes.executar(str(caminho), self._gerar_e_gravar, layer_id, z, x, y, caminho)
+        return dados
+
+    def _gerar_e_gravar(self, layer_id, z, x, y, caminho):
+        dados = self.gerar(layer_id, z, x, y)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        tmp = caminho.with_name('{}.{}.{}.tmp'.format(caminho.name, os.getpid(), threading.get_ident()))
+        tmp.write_bytes(dados)
+        os.replace(str(tmp), str(caminho))
+        with self._lock:
+            self.gerados += 1
+        return dados
+
+    def gerar(self, layer_id, z, x, y):
+        """Recorta a camada no tile (com borda) e codifica em MVT"""
+        gdf, arvore, geometrias = self.indices.obter(layer_id, z)
+        if gdf is None or gdf.empty:
+            return b''
+
+        lon_min, lat_min, lon_max, lat_max = limites_tile(z, x, y)
+        margem_lon = (lon_max - lon_min) * BUFFER / EXTENT
+        margem_lat = (lat_max - lat_min) * BUFFER / EXTENT
+        caixa = (lon_min - margem_lon, lat_min - margem_lat, lon_max + margem_lon, lat_max + margem_lat)
+
+        indices = arvore.query(shapely.box(*caixa), predicate='intersects')
+        if len(indices) == 0:
+            return b''
+        indices.sort()
+
+        geometrias = shapely.clip_by_rect(geometrias[indices], *caixa)
+        geometrias = shapely.transform(geometrias, _para_mercator)
+        validas = ~shapely.is_empty(geometrias)
+
+        colunas = [c for c in (self.colunas or []) if c in gdf.columns]
+        linhas = gdf.iloc[indices][colunas].to_dict('records') if colunas else [{}] * len(indices)
+
+        feicoes = []
+        for geometria, linha, valida in zip(geometrias, linhas, validas):
+            if not valida:
+                continue
+            propriedades = {k: _valor(v) for k, v in linha.items()}
+            propriedades = {k: v for k, v in propriedades.items() if v is not None}
+            # MVT não tem GeometryCollection (make_valid/recorte podem gerar): uma feição por parte
+            if geometria.geom_type == 'GeometryCollection':
+                partes = [p for p in shapely.get_parts(geometria) if not p.is_empty]
+            else:
+                partes = [geometria]
+            for parte in partes:
+                feicoes.append({'geometry': parte, 'properties': propriedades})
+        if not feicoes:
+            return b''
+
+        return mapbox_vector_tile.encode(
+            [{'name': layer_id, 'features': feicoes}],
+            default_options={
+                'quantize_bounds': limites_tile_mercator(z, x, y),
+                'extents': EXTENT,
+            },
+        )
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'indices': len(self.indices),
+                'hits_disco': self.hits,
+                'gerados': self.gerados,
+            }
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Topologia de arcos compartilhados (estilo TopoJSON) para camadas de polígonos
+Cada divisa entre dois municípios vira um único arco, simplificado uma vez e
+usado pelos dois lados: a simplificação não abre frestas nem sobreposições e
+a divisa não é armazenada em dobro. O limite estadual entra na mesma
+topologia e reaproveita os arcos do contorno dos municípios.
+
+Uso: python topologia.py entrada.(shp|geojson) saida.topojson [--tolerancia 0.0005]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+PASSO_PADRAO = 1e-7  # grade (graus) que une vértices coincidentes (~1 cm)
+QUANTIZACAO_PADRAO = 100000
+
+
+def _mais_distante(pontos, a, b):
+    """Índice do ponto de `pontos` mais distante do segmento a-b"""
+    d = b - a
+    comprimento = np.hypot(d[0], d[1])
+    if comprimento == 0:
+        return int(np.argmax(np.hypot(*(pontos - a).T)))
+    return int(np.argmax(np.abs(d[0] * (pontos[:, 1] - a[1]) - d[1] * (pontos[:, 0] - a[0]))))
+
+
+def _garantir_minimo(original, simplificado):
+    """Evita que o arco colapse: aberto >= 3 pontos, fechado >= 4 (se o original tiver)"""
+    fechado = len(original) > 2 and np.array_equal(original[0], original[-1])
+    minimo = 4 if fechado else 3
+    if len(simplificado) >= minimo or len(original) < minimo:
+        return simplificado
+    if not fechado:
+        meio = 1 + _mais_distante(original[1:-1], original[0], original[-1])
+        return original[[0, meio, -1]]
+    # Triângulo: ponto mais longe do início e o mais longe dessa corda
+    i = 1 + _mais_distante(original[1:-1], original[0], original[0])
+    j = 1 + _mais_distante(original[1:-1], original[0], original[i])
+    if i == j:
+        return simplificado
+    return original[[0, min(i, j), max(i, j), -1]]
+
+
+class Topologia:
+    """Arcos compartilhados de uma ou mais camadas de polígonos (EPSG:4326)"""
+
+    def __init__(self, camadas, passo=PASSO_PADRAO):
+        self.camadas = list(camadas)
+        self.passo = passo
+
+        # ---- anéis de todas as camadas (vetorizado) ----
+        estrutura = []   # por camada: lista por feição de partes [[anel, ...], ...]
+        todos_aneis = []
+        for gdf in self.camadas:
+            geoms = np.asarray(gdf.geometry.values, dtype=object)
+            tipos = shapely.get_type_id(geoms)
+            if np.isin(tipos, (3, 6, -1), invert=True).any():
+                raise ValueError("Topologia suporta apenas polígonos")
+
+            partes, feicao_da_parte = shapely.get_parts(geoms, return_index=True)
+            aneis, parte_do_anel = shapely.get_rings(partes, return_index=True)
+
+            feicoes = [[] for _ in range(len(geoms))]
+            indice_parte = {}
+            for k, p in enumerate(parte_do_anel):
+                if p not in indice_parte:
+                    indice_parte[p] = []
+                    feicoes[feicao_da_parte[p]].append(indice_parte[p])
+                indice_parte[p].append(len(todos_aneis) + k)
+            todos_aneis.extend(aneis)
+            estrutura.append(feicoes)
+        self._estrutura = estrutura
+
+        # ---- vértices quantizados na grade, sem o ponto de fechamento ----
+        coords, anel = shapely.get_coordinates(np.array(todos_aneis, dtype=object), return_index=True)
+        q = np.round(coords / passo).astype(np.int64)
+        ultimo = np.r_[anel[1:] != anel[:-1], True]
+        repetido = np.r_[False, (anel[1:] == anel[:-1]) & (q[1:] == q[:-1]).all(axis=1)]
+        manter = ~ultimo & ~repetido
+        q, anel = q[manter], anel[manter]
+
+        # id único por vértice (chave de 63 bits: x << 31 | y)
+        chave = ((q[:, 0] + 1800000000) << 31) | (q[:, 1] + 900000000)
+        unicos, ids = np.unique(chave, return_inverse=True)
+        self._vertices = np.column_stack([
+            ((unicos >> 31) - 1800000000) * passo,
+            ((unicos & ((1 << 31) - 1)) - 900000000) * passo,
+        ])
+
+        n_aneis = len(todos_aneis)
+        tamanhos = np.bincount(anel, minlength=n_aneis)
+        inicios = np.r_[0, np.cumsum(tamanhos)[:-1]]
+
+        # ---- junções: vértice visitado com vizinhos diferentes ----
+        posicao = np.arange(len(ids)) - inicios[anel]
+        anterior = ids[inicios[anel] + (posicao - 1) % tamanhos[anel]]
+        seguinte = ids[inicios[anel] + (posicao + 1) % tamanhos[anel]]
+        visitas = np.unique(np.column_stack([
+            ids, np.minimum(anterior, seguinte), np.maximum(anterior, seguinte)
+        ]), axis=0)
+        juncao = np.bincount(visitas[:, 0], minlength=len(unicos)) > 1
+
+        # ---- corte dos anéis em arcos e deduplicação (arco reverso = ~índice) ----
+        self._arcos = []
+        indice_arco = {}
+        self._aneis = []
+        for r in range(n_aneis):
+            pontos = ids[inicios[r]:inicios[r] + tamanhos[r]]
+            if len(pontos) < 3:
+                self._aneis.append(None)
+                continue
+
+            cortes = np.flatnonzero(juncao[pontos])
+            if len(cortes) == 0:
+                # Anel sem junção: arco fechado em forma canônica (menor id, menor sentido)
+                pontos = np.roll(pontos, -int(np.argmin(pontos)))
+                reverso = np.r_[pontos[0], pontos[1:][::-1]]
+                if tuple(reverso) < tuple(pontos):
+                    pedacos, sinais = [np.r_[reverso, reverso[0]]], [True]
+                else:
+                    pedacos, sinais = [np.r_[pontos, pontos[0]]], [False]
+            else:
+                pontos = np.roll(pontos, -int(cortes[0]))
+                cortes = np.r_[cortes - cortes[0], len(pontos)]
+                fechado = np.r_[pontos, pontos[0]]
+                pedacos = [fechado[a:b + 1] for a, b in zip(cortes[:-1], cortes[1:])]
+                sinais = [False] * len(pedacos)
+
+            referencias = []
+            for pedaco, invertido in zip(pedacos, sinais):
+                chave_arco = tuple(pedaco)
+                if chave_arco in indice_arco:
+                    i = indice_arco[chave_arco]
+                elif chave_arco[::-1] in indice_arco:
+                    i = ~indice_arco[chave_arco[::-1]]
+                else:
+                    i = len(self._arcos)
+                    indice_arco[chave_arco] = i
+                    self._arcos.append(pedaco)
+                referencias.append(~i if invertido else i)
+            self._aneis.append(referencias)
+
+    @property
+    def n_arcos(self):
+        return len(self._arcos)
+
+    def arcos(self, tolerancia=None):
+        """Coordenadas de cada arco, simplificado uma única vez (Douglas-Peucker)"""
+        originais = [self._vertices[a] for a in self._arcos]
+        if not tolerancia:
+            return originais
+        linhas = shapely.linestrings(np.concatenate(originais),
+                                     indices=np.repeat(np.arange(len(originais)), [len(a) for a in originais]))
+        simplificados = shapely.simplify(linhas, tolerancia, preserve_topology=False)
+        return [_garantir_minimo(o, shapely.get_coordinates(s)) for o, s in zip(originais, simplificados)]
+
+    def _anel(self, referencias, arcos):
+        partes = []
+        for i in referencias:
+            pontos = arcos[i] if i >= 0 else arcos[~i][::-1]
+            partes.append(pontos if not partes else pontos[1:])
+        return np.concatenate(partes)
+
+    def simplificar(self, tolerancia=None):
+        """GeoDataFrames das camadas reconstruídos a partir dos arcos simplificados"""
+        arcos = self.arcos(tolerancia)
+        resultado = []
+        for gdf, feicoes in zip(self.camadas, self._estrutura):
+            geometrias = []
+            for partes in feicoes:
+                poligonos = []
+                for aneis in partes:
+                    coords = [self._anel(self._aneis[r], arcos) if self._aneis[r] else None for r in aneis]
+                    if coords[0] is None or len(coords[0]) < 4:
+                        continue
+                    furos = [c for c in coords[1:] if c is not None and len(c) >= 4]
+                    poligonos.append(shapely.Polygon(coords[0], furos))
+                if not poligonos:
+                    geometrias.append(shapely.Polygon())
+                elif len(poligonos) == 1:
+                    geometrias.append(poligonos[0])
+                else:
+                    geometrias.append(shapely.MultiPolygon(poligonos))
+
+            geometrias = np.array(geometrias, dtype=object)
+            invalidas = ~shapely.is_valid(geometrias)
+            if invalidas.any():
+                geometrias[invalidas] = shapely.make_valid(geometrias[invalidas])
+
+            saida = gdf.copy()
+            saida[gdf.geometry.name] = gpd.GeoSeries(geometrias, index=gdf.index, crs=gdf.crs)
+            resultado.append(saida)
+        return resultado
+
+    def topojson(self, nomes, tolerancia=None, quantizacao=QUANTIZACAO_PADRAO):
+        """Documento TopoJSON (arcos quantizados e codificados em delta)"""
+        arcos = self.arcos(tolerancia)
+        todos = np.concatenate(arcos)
+        x0, y0 = todos.min(axis=0)
+        x1, y1 = todos.max(axis=0)
+        escala = [(x1 - x0) / (quantizacao - 1) or 1.0, (y1 - y0) / (quantizacao - 1) or 1.0]
+
+        arcos_delta = []
+        for pontos in arcos:
+            q = np.round((pontos - [x0, y0]) / escala).astype(np.int64)
+            mudou = np.r_[True, (q[1:] != q[:-1]).any(axis=1)]
+            mudou[-1] = True
+            q = q[mudou]
+            arcos_delta.append(np.vstack([q[:1], np.diff(q, axis=0)]).tolist())
+
+        objetos = {}
+        for nome, gdf, feicoes in zip(nomes, self.camadas, self._estrutura):
+            propriedades = json.loads(gdf.drop(columns=gdf.geometry.name).to_json(orient='records'))
+            geometrias = []
+            for partes, props in zip(feicoes, propriedades):
+                poligonos = [[self._aneis[r] for r in aneis if self._aneis[r]] for aneis in partes]
+                poligonos = [p for p in poligonos if p]
+                if not poligonos:
+                    geometria = {'type': None}
+                elif len(poligonos) == 1:
+                    geometria = {'type': 'Polygon', 'arcs': poligonos[0]}
+                else:
+                    geometria = {'type': 'MultiPolygon', 'arcs': poligonos}
+                geometria['properties'] = {k: v for k, v in props.items() if v is not None}
+                geometrias.append(geometria)
+            objetos[nome] = {'type': 'GeometryCollection', 'geometries': geometrias}
+
+        return {
+            'type': 'Topology',
+            'bbox': [float(x0), float(y0), float(x1), float(y1)],
+            'transform': {'scale': escala, 'translate': [float(x0), float(y0)]},
+            'objects': objetos,
+            'arcs': arcos_delta,
+        }
+
+
+def simplificar_topologia(camadas, tolerancia, passo=PASSO_PADRAO):
+    """Simplifica as camadas em conjunto, preservando as divisas compartilhadas"""
+    return Topologia(camadas, passo).simplificar(tolerancia)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    tolerancia = None
+    if '--tolerancia' in args:
+        i = args.index('--tolerancia')
+        tolerancia = float(args[i + 1])
+        del args[i:i + 2]
+    if len(args) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    entrada, saida = args
+    gdf = gpd.read_file(entrada).to_crs("EPSG:4326")
+    topologia = Topologia([gdf])
+    documento = topologia.topojson([Path(entrada).stem], tolerancia=tolerancia)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(documento, f, ensure_ascii=False, separators=(',', ':'))
+    print("[OK] {}: {} feições, {} arcos -> {}".format(entrada, len(gdf), topologia.n_arcos, saida))